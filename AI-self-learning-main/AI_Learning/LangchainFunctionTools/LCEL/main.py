@@ -4,7 +4,6 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'utils')))
 from ll_config import AzureOpenAIConfig as LLMConfig
-from langchain_openai import AzureChatOpenAI
 from dotenv import load_dotenv
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.output_parser import StrOutputParser
@@ -22,13 +21,7 @@ if not MODEL_NAME or not API_VERSION or not AZURE_ENDPOINT or not API_KEY:
 
 # Initialize the LLM with Azure OpenAI
 try:
-    llm = AzureChatOpenAI(
-        azure_deployment=MODEL_NAME,
-        api_version=API_VERSION,
-        azure_endpoint=AZURE_ENDPOINT,
-        api_key=API_KEY,
-        temperature=0
-    )
+    llm = LLMConfig().get_chat_model(temperature=0)
     print("✅ Successfully initialized Azure OpenAI")
 except Exception as e:
     print(f"Error initializing Azure OpenAI: {e}")
@@ -1,8 +1,11 @@
 import asyncio
 import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'utils')))
+from ll_config import AzureOpenAIConfig as LLMConfig
+from rate_limiter import RateLimitedScheduler, estimate_tokens
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import AzureChatOpenAI
 
 
 load_dotenv()
@@ -23,20 +26,17 @@ if not all([azure_api_key, azure_api_base, azure_api_version, deployment_name]):
     )
 
 # === Define LLMs ===
-llm1 = AzureChatOpenAI(
-    azure_deployment=deployment_name,
-    api_version=azure_api_version,
-    azure_endpoint=azure_api_base,
-    api_key=azure_api_key,
-    temperature=0
-)
+# Both models share the process-wide connection pool; 429s are retried by the scheduler below
+llm_config = LLMConfig()
+llm1 = llm_config.get_chat_model(temperature=0, max_retries=0)
 #user different llm for followup
-llm2 = AzureChatOpenAI(
-    azure_deployment=deployment_name,
-    api_version=azure_api_version,
-    azure_endpoint=azure_api_base,
-    api_key=azure_api_key,
-    temperature=0
+llm2 = llm_config.get_chat_model(temperature=0, max_retries=0)
+
+# Quota of the deployment (Azure portal -> Deployments -> Rate limit)
+scheduler = RateLimitedScheduler(
+    requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+    tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", "60000")),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
 )
 
 # === Prompts ===
@@ -55,19 +55,24 @@ followup_chain = followup_prompt | llm2
 # === Main Async Logic ===
 async def run_async_chains(user_text: str, instructions: list[str]):
     # Step 1: Summarize using ainvoke
-    summary = await summary_chain.ainvoke({"text": user_text})
+    summary = await scheduler.run(lambda: summary_chain.ainvoke({"text": user_text}),
+                                  estimate_tokens(summary_prompt.format(text=user_text)), deployment_name)
     print("🔹 Summary:\n", summary)
 
-    # Step 2: Run multiple follow-up chains in parallel using asyncio.gather
-    tasks = [
-        followup_chain.ainvoke({"summary": summary, "instruction": instruction})
-        for instruction in instructions
-    ]
-    results = await asyncio.gather(*tasks)
+    # Step 2: Run the follow-up chains concurrently, within the deployment's RPM/TPM budget
+    calls = []
+    for instruction in instructions:
+        inputs = {"summary": summary, "instruction": instruction}
+        calls.append((lambda inputs=inputs: followup_chain.ainvoke(inputs),
+                      estimate_tokens(followup_prompt.format(**inputs))))
 
-    # Display Results
-    for i, output in enumerate(results):
-        print(f"\n🔸 Output {i+1} for instruction: {instructions[i]}\n{output.content}")
+    # Display results as they complete instead of waiting for the slowest one
+    async for i, output, error in scheduler.as_completed(calls, deployment_name):
+        if error is not None:
+            print(f"\n❌ Output {i+1} for instruction: {instructions[i]} failed: {error}")
+        else:
+            print(f"\n🔸 Output {i+1} for instruction: {instructions[i]}\n{output.content}")
+    print(f"\nScheduler: {scheduler.stats}")
 
 # === Run It ===
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+"""
+Bulk tagging: streams records from a JSONL or CSV file through an async tagging
+call and appends one JSON line per record to an output file.
+
+Only a bounded window of records is in flight, so memory stays flat on inputs
+with millions of lines. Progress is checkpointed: <output>.checkpoint holds the
+index below which every record is done, and on restart the records after it
+that already reached the output are skipped, so a crashed job resumes where it
+stopped without duplicates. Records whose call fails are written to
+<output>.errors.jsonl with their original fields, so that file can be fed back
+in as the input of a retry run.
+"""
+import asyncio
+import csv
+import json
+import os
+import statistics
+import time
+from array import array
+
+
+def read_records(path, text_field="text", id_field="id"):
+    """
+    Yields (id, text, record) from a .jsonl or .csv file, one line at a time.
+    Records without `id_field` are identified by their line number.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for number, record in enumerate(rows):
+            yield record.get(id_field, number), record[text_field], record
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class BulkRunner:
+    def __init__(self, process, output_path, max_in_flight=64, checkpoint_every=1000, report_every=10.0):
+        """
+        Args:
+            process: async function text -> dict (e.g. the tagging chain's `ainvoke`, wrapped in a
+                RateLimitedScheduler so concurrency and quota are bounded).
+            output_path (str): JSONL file results are appended to.
+            max_in_flight (int): Records read ahead and awaiting a result.
+            checkpoint_every (int): Completed records between checkpoints.
+            report_every (float): Seconds between progress lines.
+        """
+        self.process = process
+        self.output_path = output_path
+        self.checkpoint_path = output_path + ".checkpoint"
+        self.errors_path = os.path.splitext(output_path)[0] + ".errors.jsonl"
+        self.max_in_flight = max_in_flight
+        self.checkpoint_every = checkpoint_every
+        self.report_every = report_every
+        self.latencies = array("d")
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def _resume_point(self):
+        """
+        Returns (watermark, indexes >= watermark already in the output) from a previous run.
+        """
+        watermark = 0
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                watermark = json.load(f)["watermark"]
+        finished = set()
+        for path in (self.output_path, self.errors_path):
+            if not os.path.exists(path):
+                continue
+            self._drop_partial_line(path)
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    index = json.loads(line)["index"]
+                    if index >= watermark:
+                        finished.add(index)
+        return watermark, finished
+
+    @staticmethod
+    def _drop_partial_line(path):
+        # A crash in the middle of a write leaves half a line at the end of the file
+        with open(path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                f.seek(position - step)
+                block = f.read(step)
+                newline = block.rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(position - step + newline + 1)
+                    return
+                position -= step
+            f.truncate(0)
+
+    def _checkpoint(self, watermark, *files):
+        for f in files:
+            f.flush()
+            os.fsync(f.fileno())
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"watermark": watermark}, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _report(self, start, final=False):
+        elapsed = time.perf_counter() - start
+        line = f"{self.done} done, {self.failed} failed, {self.skipped} skipped, " \
+               f"{self.done / elapsed if elapsed else 0.0:.1f} items/s"
+        if self.latencies:
+            line += f", latency p50 {statistics.median(self.latencies) * 1000:.0f} ms, " \
+                    f"p95 {percentile(self.latencies, 0.95) * 1000:.0f} ms, " \
+                    f"p99 {percentile(self.latencies, 0.99) * 1000:.0f} ms"
+        print(("Finished: " if final else "") + line)
+
+    async def _one(self, index, item_id, text, record):
+        start = time.perf_counter()
+        try:
+            result = await self.process(text)
+        except Exception as error:
+            return index, {**record, "index": index, "error": str(error)}, None
+        self.latencies.append(time.perf_counter() - start)
+        return index, None, {"index": index, "id": item_id, **result}
+
+    async def run(self, records):
+        """
+        Processes `records` (an iterable of (id, text, record), e.g. `read_records(path)`).
+        Returns:
+            dict: done, failed, skipped, items_per_second, p50/p95/p99 latency in seconds.
+        """
+        watermark, finished = self._resume_point()
+        start = last_report = time.perf_counter()
+        pending = {}  # task -> index
+        since_checkpoint = 0
+        read = 0
+        records = iter(enumerate(records))
+        exhausted = False
+
+        with open(self.output_path, "a", encoding="utf-8") as out, \
+                open(self.errors_path, "a", encoding="utf-8") as errors:
+            while pending or not exhausted:
+                while not exhausted and len(pending) < self.max_in_flight:
+                    try:
+                        index, (item_id, text, record) = next(records)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    read = index + 1
+                    if index < watermark or index in finished:
+                        self.skipped += 1
+                        continue
+                    task = asyncio.create_task(self._one(index, item_id, text, record))
+                    pending[task] = index
+                if not pending:
+                    break
+
+                completed, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in completed:
+                    del pending[task]
+                    _, error, result = task.result()
+                    if error is not None:
+                        self.failed += 1
+                        errors.write(json.dumps(error, ensure_ascii=False) + "\n")
+                    else:
+                        self.done += 1
+                        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    since_checkpoint += 1
+
+                if since_checkpoint >= self.checkpoint_every:
+                    # Everything below the oldest record still in flight is done
+                    self._checkpoint(min(pending.values()) if pending else read, out, errors)
+                    since_checkpoint = 0
+                if time.perf_counter() - last_report >= self.report_every:
+                    self._report(start)
+                    last_report = time.perf_counter()
+
+            self._checkpoint(read, out, errors)
+
+        self._report(start, final=True)
+        elapsed = time.perf_counter() - start
+        return {
+            "done": self.done,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "items_per_second": self.done / elapsed if elapsed else 0.0,
+            "p50": statistics.median(self.latencies) if self.latencies else None,
+            "p95": percentile(self.latencies, 0.95) if self.latencies else None,
+            "p99": percentile(self.latencies, 0.99) if self.latencies else None,
+        }
@@ -1,11 +1,11 @@
 import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'utils')))
+from ll_config import AzureOpenAIConfig as LLMConfig
+from tagging import Tagging, prompt, bind_tagging, build_chain, tag_file
+import argparse
+import asyncio
 from dotenv import load_dotenv
-from langchain_openai import AzureChatOpenAI
-from typing import List
-from pydantic import BaseModel, Field
-from langchain_core.utils.function_calling import convert_to_openai_function
-from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers.openai_functions import JsonOutputFunctionsParser
 
 # Load environment variables from .env file
 load_dotenv()
@@ -25,51 +25,47 @@ if not all([azure_api_key, azure_api_base, azure_api_version, deployment_name]):
         "DOCUMENT_MODEL=your-deployment-name\n"
     )
 
-# Define Pydantic model for tagging
-class Tagging(BaseModel):
-    """Tag the piece of text with particular information."""
-    sentiment: str = Field(description="Sentiment of the text, e.g., positive, negative, neutral")
-    language: str = Field(description="Language of the text (ISO 639-1 code, e.g., 'en' for English)")
-
-# Convert the Pydantic model into OpenAI-compatible function spec
-tagging_functions = [convert_to_openai_function(Tagging)]
-
 # os.environ.pop("OPENAI_API_BASE", None)
 # Connect to Azure OpenAI with correct parameter names
-llm = AzureChatOpenAI(
-    azure_deployment=deployment_name,
-    api_version=azure_api_version,
-    azure_endpoint=azure_api_base,
-    api_key=azure_api_key,
-    temperature=0
-)
+llm = LLMConfig().get_chat_model(temperature=0)
 
-llm_with_function = llm.bind_tools(tagging_functions)
-
-# Create a prompt template
-prompt = ChatPromptTemplate.from_messages([
-    ("system", "You are a helpful assistant that tags text with sentiment and language."),
-    ("user", "{input}"),
-])
+llm_with_function = bind_tagging(llm)
 
 import json
 # Create the full chain: prompt -> model -> parser
-chain = prompt | llm_with_function | JsonOutputFunctionsParser()
+chain = build_chain(llm)
+
+
+def tag_one(text):
+    # Invoke the chain with a test input
+    try:
+        result = chain.invoke({"input": text})
+        # Print the parsed result
+        print(result)
+    except Exception as e:
+        print(f"Error: {e}\nTrying to print raw tool calls...")
+        # Try to get raw tool calls if parsing fails
+        raw_result = (prompt | llm_with_function).invoke({"input": text})
+        tool_calls = raw_result.additional_kwargs.get('tool_calls', [])
+        for call in tool_calls:
+            args = json.loads(call['function']['arguments'])
+            print(f"Function: {call['function']['name']}, Sentiment: {args['sentiment']}, Language: {args['language']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tag text with sentiment and language.")
+    parser.add_argument("--input", help="JSONL or CSV file to tag in bulk (omit to tag one example sentence)")
+    parser.add_argument("--output", default="tags.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--max-in-flight", type=int, default=64)
+    parser.add_argument("--pack", type=int, default=1, help="Texts tagged per model call (packed extraction)")
+    args = parser.parse_args()
 
-# Invoke the chain with a test input
-try:
-    result = chain.invoke({
-        "input": "I love earning money by being a software engineer."
-    })
-    # Print the parsed result
-    print(result)
-except Exception as e:
-    print(f"Error: {e}\nTrying to print raw tool calls...")
-    # Try to get raw tool calls if parsing fails
-    raw_result = (prompt | llm_with_function).invoke({
-        "input": "I love earning money by being a software engineer."
-    })
-    tool_calls = raw_result.additional_kwargs.get('tool_calls', [])
-    for call in tool_calls:
-        args = json.loads(call['function']['arguments'])
-        print(f"Function: {call['function']['name']}, Sentiment: {args['sentiment']}, Language: {args['language']}")
+    if args.input:
+        # 429s are retried by the bulk scheduler, which knows the deployment's quota
+        bulk_llm = LLMConfig().get_chat_model(temperature=0, max_retries=0)
+        asyncio.run(tag_file(args.input, args.output, bulk_llm, deployment_name, args.text_field, args.id_field,
+                             args.max_in_flight, args.pack))
+    else:
+        tag_one("I love earning money by being a software engineer.")
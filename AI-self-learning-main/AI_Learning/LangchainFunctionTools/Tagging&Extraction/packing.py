@@ -0,0 +1,188 @@
+"""
+Packed function-calling extraction: many texts per model call instead of one.
+
+For short texts most of a request is the fixed system prompt and function
+schema. PackedExtractor wraps an item schema (e.g. Tagging) in a list-of-items
+function whose items carry the index of the text they belong to, sends up to
+`batch_size` numbered texts per call, and maps the validated items back to
+their inputs. Texts with a missing or invalid item are retried on their own.
+If a whole call fails (e.g. one text trips the content filter), the batch is
+split in half and each half is retried.
+
+Callers still tag one text at a time (`await extractor.extract(text)`): calls
+arriving within `max_wait` seconds of each other are packed together, so the
+extractor drops into BulkRunner like the single-text chain.
+"""
+import asyncio
+from typing import List
+
+from pydantic import Field, create_model
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.utils.function_calling import convert_to_openai_function
+
+from rate_limiter import estimate_tokens, is_rate_limit_error
+
+PACKED_INSTRUCTIONS = (
+    "The user message contains several texts, each starting with its number in brackets, e.g. [0]. "
+    "Call the function once, with one item per text, and set each item's index to the text's number."
+)
+
+
+def packed_schema(item_schema):
+    """
+    List-of-items model around `item_schema`, with an `index` field on every item.
+    """
+    indexed = create_model(
+        f"Indexed{item_schema.__name__}",
+        __base__=item_schema,
+        index=(int, Field(description="Number of the text this item belongs to, e.g. 0 for [0]")),
+    )
+    return create_model(
+        f"{item_schema.__name__}Batch",
+        __doc__=f"{(item_schema.__doc__ or '').strip()} Return one item for every numbered text.",
+        items=(List[indexed], Field(description="One item per numbered text")),
+    )
+
+
+def pack(texts):
+    # Line breaks inside a text would make the numbering ambiguous
+    return "\n".join(f"[{i}] {' '.join(text.split())}" for i, text in enumerate(texts))
+
+
+class PackedExtractor:
+    def __init__(self, llm, item_schema, system_prompt, batch_size=20, max_wait=0.05, scheduler=None,
+                 deployment="default", output_tokens_per_item=32):
+        """
+        Args:
+            llm: LangChain chat model (built with max_retries=0 when a scheduler is used).
+            item_schema (BaseModel): Schema of the result for one text.
+            system_prompt (str): Task description; the packing instructions are appended.
+            batch_size (int): Texts per model call.
+            max_wait (float): Seconds a partial batch waits for more texts before it is sent.
+            scheduler (RateLimitedScheduler): Optional; bounds concurrency and quota and retries 429s.
+            output_tokens_per_item (int): Completion tokens reserved per text in the TPM estimate.
+        """
+        self.item_schema = item_schema
+        self.schema = packed_schema(item_schema)
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", f"{system_prompt} {PACKED_INSTRUCTIONS}"),
+            ("user", "{input}"),
+        ])
+        self.chain = prompt | llm.bind_tools([convert_to_openai_function(self.schema)],
+                                             tool_choice=self.schema.__name__)
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.scheduler = scheduler
+        self.deployment = deployment
+        self.output_tokens_per_item = output_tokens_per_item
+        self._queue = []  # (text, future)
+        self._timer = None
+        self._batches = set()
+        self.stats = {"requests": 0, "items": 0, "tokens": 0, "retried": 0, "split": 0}
+
+    async def extract(self, text):
+        """
+        Result (dict) for one text, computed in a packed call together with concurrent callers.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((text, future))
+        if len(self._queue) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch):
+        try:
+            results = await self.extract_many([text for text, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def extract_many(self, texts):
+        """
+        Results for `texts` in input order: a dict per text, or the exception that text failed with.
+        """
+        try:
+            message = await self._call(texts)
+        except Exception as error:
+            if len(texts) == 1 or is_rate_limit_error(error):
+                raise
+            self.stats["split"] += 1
+            half = len(texts) // 2
+            left, right = await asyncio.gather(self._extract_part(texts[:half]),
+                                               self._extract_part(texts[half:]))
+            return left + right
+
+        results = self._unpack(message, len(texts))
+        if len(texts) == 1:
+            return [results[0] if results[0] is not None else ValueError("No valid item in the model's answer")]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            self.stats["retried"] += len(missing)
+            retried = await asyncio.gather(*(self._extract_part([texts[i]]) for i in missing))
+            for i, (result,) in zip(missing, retried):
+                results[i] = result
+        return results
+
+    async def _extract_part(self, texts):
+        try:
+            return await self.extract_many(texts)
+        except Exception as error:
+            return [error] * len(texts)
+
+    async def _call(self, texts):
+        inputs = {"input": pack(texts)}
+        tokens = estimate_tokens(inputs["input"], max_output_tokens=self.output_tokens_per_item * len(texts))
+        self.stats["requests"] += 1
+        self.stats["items"] += len(texts)
+        if self.scheduler is not None:
+            message = await self.scheduler.run(lambda: self.chain.ainvoke(inputs), tokens, self.deployment)
+        else:
+            message = await self.chain.ainvoke(inputs)
+        self.stats["tokens"] += (getattr(message, "usage_metadata", None) or {}).get("total_tokens", 0)
+        return message
+
+    def _unpack(self, message, count):
+        results = [None] * count
+        for call in message.tool_calls:
+            items = call["args"].get("items", [])
+            for item in items if isinstance(items, list) else []:
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    index = int(item.get("index"))
+                    parsed = self.item_schema.model_validate(item)
+                except (TypeError, ValueError):
+                    # pydantic's ValidationError is a ValueError
+                    continue
+                # The first item for an index wins; out-of-range indexes are ignored
+                if 0 <= index < count and results[index] is None:
+                    results[index] = parsed.model_dump()
+        return results
+
+    def report(self):
+        requests = self.stats["requests"] or 1
+        items = self.stats["items"] or 1
+        return (f"{self.stats['items'] / requests:.1f} items/request, {self.stats['tokens'] / items:.0f} tokens/item, "
+                f"{self.stats['retried']} retried individually, {self.stats['split']} batches split")
@@ -0,0 +1,85 @@
+"""
+Tagging schema, chain and bulk driver, kept free of credentials so they can be
+used (and tested) with any LangChain chat model; main.py wires in Azure OpenAI.
+"""
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'utils')))
+from rate_limiter import RateLimitedScheduler, estimate_tokens
+from bulk import BulkRunner, read_records
+from packing import PackedExtractor
+from pydantic import BaseModel, Field
+from langchain_core.utils.function_calling import convert_to_openai_function
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers.openai_tools import JsonOutputKeyToolsParser
+
+SYSTEM_PROMPT = "You are a helpful assistant that tags text with sentiment and language."
+
+
+# Define Pydantic model for tagging
+class Tagging(BaseModel):
+    """Tag the piece of text with particular information."""
+    sentiment: str = Field(description="Sentiment of the text, e.g., positive, negative, neutral")
+    language: str = Field(description="Language of the text (ISO 639-1 code, e.g., 'en' for English)")
+
+
+# Convert the Pydantic model into OpenAI-compatible function spec
+tagging_functions = [convert_to_openai_function(Tagging)]
+
+# Create a prompt template
+prompt = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    ("user", "{input}"),
+])
+
+
+def bind_tagging(llm):
+    # bind_tools answers in `tool_calls`; forcing the tool makes every answer a Tagging call
+    return llm.bind_tools(tagging_functions, tool_choice="Tagging")
+
+
+def build_chain(llm):
+    """
+    prompt -> model -> parser, returning the Tagging arguments as a dict.
+    """
+    return prompt | bind_tagging(llm) | JsonOutputKeyToolsParser(key_name="Tagging", first_tool_only=True)
+
+
+async def tag_file(input_path, output_path, llm, deployment="default", text_field="text", id_field="id",
+                   max_in_flight=64, pack=1, scheduler=None):
+    """
+    Tags every record of a JSONL/CSV file; see bulk.py for the output, checkpoint and resume behaviour.
+    With `pack` > 1, that many texts are tagged per model call (see packing.py).
+    Args:
+        llm: Chat model, built with max_retries=0 so 429s reach the scheduler.
+        scheduler (RateLimitedScheduler): Defaults to the LLM_* quota settings of the environment.
+    """
+    if scheduler is None:
+        scheduler = RateLimitedScheduler(
+            requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+            tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", "60000")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+        )
+    chain = build_chain(llm)
+
+    async def tag(text):
+        result = await scheduler.run(lambda: chain.ainvoke({"input": text}),
+                                     estimate_tokens(text, max_output_tokens=32), deployment)
+        if result is None:
+            raise ValueError("The model did not call Tagging")
+        return result
+
+    extractor = None
+    if pack > 1:
+        extractor = PackedExtractor(llm, Tagging, SYSTEM_PROMPT, batch_size=pack, scheduler=scheduler,
+                                    deployment=deployment)
+        tag = extractor.extract
+        # Enough texts in flight to fill a batch for every concurrent call
+        max_in_flight = max(max_in_flight, pack * scheduler.max_concurrency)
+
+    runner = BulkRunner(tag, output_path, max_in_flight=max_in_flight)
+    stats = await runner.run(read_records(input_path, text_field, id_field))
+    print(f"Scheduler: {scheduler.stats}")
+    if extractor is not None:
+        print(f"Packing: {extractor.report()}")
+    return stats
@@ -2,7 +2,9 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'utils')))
 from ll_config import AzureOpenAIConfig as LLMConfig
+from tool_registry import ToolRegistry
 import json
+from typing import Literal
 from dotenv import load_dotenv
 import gradio as gr
 
@@ -12,10 +14,22 @@ if not modelName:
     print("Model name not specified !!")
     exit(1)
 
+# One pooled client for the whole process, reused by every message
+client = LLMConfig().get_client()
+
+
+# Tools are registered once; their JSON schema is built from the signatures below
+registry = ToolRegistry()
+
 
 # Example dummy function hard coded to return the same weather
 # In production, this could be your backend API or an external API
-def get_current_weather(location, unit="fahrenheit"):
+@registry.register(
+    description="Get the current weather in a given location, example 'what is the weather in San Francisco, CA?'",
+    params={"location": "The city and state, e.g. San Francisco, CA"},
+    pure=True, ttl=600,
+)
+def get_current_weather(location: str, unit: Literal["celsius", "fahrenheit"] = "fahrenheit"):
     """Get the current weather in a given location"""
     weather_info = {
         "location": location,
@@ -27,7 +41,11 @@ def get_current_weather(location, unit="fahrenheit"):
 
 # Example dummy function hard coded to return the same user details
 # In production, this could be your backend API or an external API
-def get_my_personal_details(name=None, age="24"):
+@registry.register(
+    description="Use this tool to get details about user , example give me my personal details or what do you know about me ",
+    params={"name": "Your name", "age": "Your age"},
+)
+def get_my_personal_details(name: str, age: str = "24"):
     """Get my personal details"""
     if not name or name.lower() != "aditya":
         return json.dumps({"error": "Personal details of the user not found."})
@@ -40,58 +58,16 @@ def get_my_personal_details(name=None, age="24"):
     return json.dumps(personal_info)
 
 
-
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "get_current_weather",
-            "description": "Get the current weather in a given location, example 'what is the weather in San Francisco, CA?'",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "The city and state, e.g. San Francisco, CA",
-                    },
-                    "unit": {"type": "string", "enum": ["celsius", "fahrenheit"]},
-                },
-                "required": ["location"],
-            },
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name":"get_my_personal_details",
-            "description": "Use this tool to get details about user , example give me my personal details or what do you know about me ",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Your name",
-                    },
-                    "age": {
-                        "type": "string",
-                        "description": "Your age",
-                    },
-                },
-                "required": ["name"],
-            },
-        }
-    }
-]
+tools = registry.schemas()
 
 system_prompt = """You are a helpful assistant. If you receive tool results, you must use them as the source of truth and share the information with the user. Do not refuse to answer if a tool result is available."""
 
 def chatWithUser(user_input, history=None):
     """
     Function to chat with the user and call tools based on the input.
+    Every tool call of the assistant's reply runs concurrently, and all results go back to
+    the model in one follow-up request.
     """
-    llm_config = LLMConfig()
-    client = llm_config.get_client()
-
     messages = [{"role": "system", "content": system_prompt}]
     if history:
         for h in history:
@@ -108,55 +84,39 @@ def chatWithUser(user_input, history=None):
         temperature=0.7,
     )
 
-    print(f"Response: {response.choices[0].message}")
-
-    tool_calls = getattr(response.choices[0].message, "tool_calls", None)
-    if tool_calls:
-        tool_call = tool_calls[0]
-        function_name = tool_call.function.name
-        arguments = json.loads(tool_call.function.arguments)
-        if function_name == "get_current_weather":
-            result = get_current_weather(**arguments)
-            weather = json.loads(result)
-            # Format the weather information as a readable message
-            tool_result_json = f"""Here is the current weather information:
-                Location: {weather["location"]}
-                Temperature: {weather["temperature"]} {weather["unit"]}
-                Forecast: {weather["forecast"]}"""
-        elif function_name == "get_my_personal_details":
-            print("Tool call arguments:", arguments)  # Debug line
-            result = get_my_personal_details(**arguments)
-            info = json.loads(result)
-            if "error" in info:
-                tool_result_json = f"Sorry, {info['error']}"
-            else:
-                tool_result_json = f"""Here are some details of yours :
-                    Name: {info.get('name')}
-                    Age: {info.get('age')}
-                    Location: {info.get('location')}
-                    Hobbies: {', '.join(info.get('hobbies', []))}"""
-        else:
-            tool_result_json = json.dumps({
-                "id": tool_call.id,
-                "type": "unknown_tool",
-                "message": "Tool result: Unknown tool."
-            })
-
-        # Add the tool result as an assistant message
-        # messages.append({"role": "assistant", "content": tool_result_json})
-
-        # # Send updated messages back to LLM for a natural response
-        # final_response = client.chat.completions.create(
-        #     model=modelName,
-        #     messages=messages,
-        #     max_tokens=1000,
-        #     temperature=0.7,
-        # )
-        # return final_response.choices[0].message.content if final_response.choices[0].message.content is not None else tool_result_json
-
-        return tool_result_json
-    # If no tool call, return the assistant's message content
-    return response.choices[0].message.content if response.choices[0].message.content is not None else ""
+    message = response.choices[0].message
+    print(f"Response: {message}")
+
+    tool_calls = getattr(message, "tool_calls", None)
+    if not tool_calls:
+        # If no tool call, return the assistant's message content
+        return message.content if message.content is not None else ""
+
+    messages.append({
+        "role": "assistant",
+        "content": message.content,
+        "tool_calls": [
+            {"id": call.id, "type": "function",
+             "function": {"name": call.function.name, "arguments": call.function.arguments}}
+            for call in tool_calls
+        ],
+    })
+    tool_messages = registry.execute(tool_calls)
+    print(f"Ran {len(tool_messages)} tool call(s): {[call.function.name for call in tool_calls]}")
+    messages.extend(tool_messages)
+
+    # Send all tool results back to the LLM for a natural response; same tools so the
+    # prompt prefix stays identical, but no further tool calls this turn
+    final_response = client.chat.completions.create(
+        model=modelName,
+        messages=messages,
+        tools=tools,
+        tool_choice="none",
+        max_tokens=1000,
+        temperature=0.7,
+    )
+    content = final_response.choices[0].message.content
+    return content if content is not None else "\n".join(m["content"] for m in tool_messages)
 
 def gradio_chat(user_input, history=[]):
     """
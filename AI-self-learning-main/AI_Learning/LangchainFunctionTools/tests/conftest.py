@@ -0,0 +1,55 @@
+import os
+import re
+import sys
+
+import pytest
+
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for folder in ("utils", "Tagging&Extraction"):
+    path = os.path.join(root, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class FakeTaggingModel(BaseChatModel):
+    """
+    Answers like an OpenAI chat model with a forced tool: the result is in `tool_calls`.
+    Single texts get a Tagging call, numbered texts ("[0] ...") a TaggingBatch call.
+    """
+    calls: list = []
+    fail_on: str = "FAIL"
+
+    @property
+    def _llm_type(self):
+        return "fake-tagging"
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        return self.bind(tools=tools, tool_choice=tool_choice, **kwargs)
+
+    @staticmethod
+    def _tags(text):
+        return {"sentiment": "positive" if "love" in text else "negative", "language": "en"}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        text = messages[-1].content
+        self.calls.append(text)
+        if self.fail_on in text:
+            raise ValueError("content filter")
+        numbered = re.findall(r"^\[(\d+)\] (.*)$", text, flags=re.MULTILINE)
+        if numbered:
+            items = [{"index": int(i), **self._tags(t)} for i, t in numbered if "skip" not in t or len(numbered) == 1]
+            call = {"name": "TaggingBatch", "args": {"items": items}, "id": "call_0"}
+        else:
+            call = {"name": "Tagging", "args": self._tags(text), "id": "call_0"}
+        message = AIMessage(content="", tool_calls=[call],
+                            usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@pytest.fixture
+def fake_model():
+    return FakeTaggingModel(calls=[])
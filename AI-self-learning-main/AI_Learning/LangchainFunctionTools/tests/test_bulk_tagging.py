@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+from bulk import BulkRunner, read_records
+from rate_limiter import RateLimitedScheduler
+from tagging import build_chain, tag_file
+
+
+def write_jsonl(path, texts):
+    with open(path, "w", encoding="utf-8") as f:
+        for i, text in enumerate(texts):
+            f.write(json.dumps({"id": f"m{i}", "text": text}) + "\n")
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_chain_parses_tool_calls(fake_model):
+    assert build_chain(fake_model).invoke({"input": "I love it"}) == {"sentiment": "positive", "language": "en"}
+
+
+def test_tag_file_tags_every_record(tmp_path, fake_model):
+    source = tmp_path / "messages.jsonl"
+    output = tmp_path / "tags.jsonl"
+    write_jsonl(source, ["I love it", "I hate it", "meh"])
+    scheduler = RateLimitedScheduler(requests_per_minute=6000, tokens_per_minute=10 ** 7)
+
+    stats = asyncio.run(tag_file(str(source), str(output), fake_model, scheduler=scheduler))
+
+    assert stats["done"] == 3 and stats["failed"] == 0
+    results = {row["id"]: row for row in read_jsonl(output)}
+    assert results["m0"]["sentiment"] == "positive"
+    assert results["m1"]["sentiment"] == "negative"
+    assert not (tmp_path / "tags.errors.jsonl").read_text()
+
+
+def test_tag_file_packed(tmp_path, fake_model):
+    source = tmp_path / "messages.jsonl"
+    output = tmp_path / "tags.jsonl"
+    write_jsonl(source, [f"I love item {i}" for i in range(30)])
+    scheduler = RateLimitedScheduler(requests_per_minute=6000, tokens_per_minute=10 ** 7, max_concurrency=2)
+
+    stats = asyncio.run(tag_file(str(source), str(output), fake_model, pack=10, scheduler=scheduler))
+
+    assert stats["done"] == 30
+    assert len(fake_model.calls) == 3
+    assert sorted(row["index"] for row in read_jsonl(output)) == list(range(30))
+
+
+def test_bulk_runner_resumes_without_duplicates(tmp_path):
+    source = tmp_path / "messages.jsonl"
+    output = str(tmp_path / "out.jsonl")
+    write_jsonl(source, [f"message {i}" for i in range(500)])
+    remaining = [200]
+
+    async def crashing(text):
+        await asyncio.sleep(0)
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            raise KeyboardInterrupt
+        return {"length": len(text)}
+
+    runner = BulkRunner(crashing, output, max_in_flight=20, checkpoint_every=25, report_every=60)
+    try:
+        asyncio.run(runner.run(read_records(str(source))))
+    except KeyboardInterrupt:
+        pass
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"index": 1')  # torn write
+
+    async def tag(text):
+        return {"length": len(text)}
+
+    stats = asyncio.run(BulkRunner(tag, output, max_in_flight=20, report_every=60).run(read_records(str(source))))
+
+    indexes = [row["index"] for row in read_jsonl(output)]
+    assert sorted(indexes) == list(range(500))
+    assert stats["skipped"] > 0
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from fake_openai_server import QuotaWindow, make_handler
+from ll_config import AzureOpenAIConfig
+from rate_limiter import RateLimitedScheduler
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    # Two requests per 0.3 s window, so the scheduler's own budget never holds anything back
+    window = QuotaWindow(requests_per_minute=2, seconds=0.3)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(window, latency=0.01))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_API_BASE", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    monkeypatch.setenv("OPENAI_API_VERSION", "2024-06-01")
+    monkeypatch.setenv("DOCUMENT_MODEL", "fake")
+    yield window
+    server.shutdown()
+    server.server_close()
+
+
+def test_scheduler_retries_429s_from_the_fake_server(fake_openai):
+    scheduler = RateLimitedScheduler(requests_per_minute=6000, tokens_per_minute=10 ** 7)
+    questions = [f"Question {i}" for i in range(5)]
+
+    async def ask_all():
+        llm = AzureOpenAIConfig().get_chat_model(temperature=0, max_retries=0)
+        calls = [((lambda q=q: llm.ainvoke(q)), 20) for q in questions]
+        return [item async for item in scheduler.as_completed(calls)]
+
+    results = asyncio.run(ask_all())
+
+    assert sorted(index for index, _, _ in results) == list(range(5))
+    assert all(error is None for _, _, error in results)
+    for index, message, _ in results:
+        assert message.content.endswith(questions[index])
+    assert scheduler.stats["completed"] == 5 and scheduler.stats["failed"] == 0
+    assert scheduler.stats["rate_limited"] == fake_openai.rejected > 0
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel, Field
+
+from packing import PackedExtractor, pack, packed_schema
+
+SYSTEM_PROMPT = "You are a helpful assistant that tags text with sentiment and language."
+
+
+class Tagging(BaseModel):
+    """Tag the piece of text with particular information."""
+    sentiment: str = Field(description="Sentiment of the text, e.g., positive, negative, neutral")
+    language: str = Field(description="Language of the text (ISO 639-1 code, e.g., 'en' for English)")
+
+
+@pytest.fixture
+def extractor(fake_model):
+    return PackedExtractor(fake_model, Tagging, SYSTEM_PROMPT, batch_size=4, max_wait=0.01)
+
+
+def test_packed_schema_adds_index():
+    schema = packed_schema(Tagging).model_json_schema()
+
+    item = schema["$defs"]["IndexedTagging"]
+    assert schema["title"] == "TaggingBatch"
+    assert set(item["required"]) == {"sentiment", "language", "index"}
+
+
+def test_pack_numbers_texts_on_single_lines():
+    assert pack(["I love\nit", "meh"]) == "[0] I love it\n[1] meh"
+
+
+def test_extract_many_keeps_input_order(extractor, fake_model):
+    results = asyncio.run(extractor.extract_many(["I love it", "I hate it", "love again"]))
+
+    assert [result["sentiment"] for result in results] == ["positive", "negative", "positive"]
+    assert len(fake_model.calls) == 1
+
+
+def test_missing_item_is_retried_alone(extractor, fake_model):
+    results = asyncio.run(extractor.extract_many(["I love it", "please skip me", "I hate it"]))
+
+    assert results[1] == {"sentiment": "negative", "language": "en"}
+    assert len(fake_model.calls) == 2 and extractor.stats["retried"] == 1
+
+
+def test_failed_batch_is_split(extractor, fake_model):
+    results = asyncio.run(extractor.extract_many(["I love it", "FAIL", "I hate it", "love"]))
+
+    assert isinstance(results[1], ValueError)
+    assert [results[i]["sentiment"] for i in (0, 2, 3)] == ["positive", "negative", "positive"]
+    assert extractor.stats["split"] == 2
+
+
+def test_concurrent_extract_calls_are_packed(extractor, fake_model):
+    async def run():
+        return await asyncio.gather(*(extractor.extract(f"I love item {i}") for i in range(10)))
+
+    results = asyncio.run(run())
+
+    assert all(result["sentiment"] == "positive" for result in results)
+    # Two full batches of 4 and a partial batch of 2 sent after max_wait
+    assert len(fake_model.calls) == 3
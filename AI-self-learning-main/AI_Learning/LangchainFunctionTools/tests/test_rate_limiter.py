@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import pytest
+
+from rate_limiter import RateLimitedScheduler, TokenBucket, estimate_tokens, is_rate_limit_error, retry_after
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = Response(status_code, headers)
+
+
+def test_estimate_tokens_counts_prompt_and_completion():
+    assert estimate_tokens("x" * 400, max_output_tokens=32) == 132
+    assert estimate_tokens("", max_output_tokens=0) == 0
+
+
+def test_retry_after_headers():
+    assert retry_after(APIError(429, {"retry-after-ms": "1500", "retry-after": "9"})) == 1.5
+    assert retry_after(APIError(429, {"retry-after": "2"})) == 2.0
+    assert retry_after(APIError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) is None
+    assert retry_after(APIError(429)) is None
+    assert retry_after(ValueError("no response")) is None
+
+
+def test_is_rate_limit_error():
+    assert is_rate_limit_error(APIError(429))
+    assert not is_rate_limit_error(APIError(500))
+    assert not is_rate_limit_error(ValueError("content filter"))
+
+
+def test_run_retries_after_429():
+    scheduler = RateLimitedScheduler(requests_per_minute=6000, tokens_per_minute=10 ** 7)
+    attempts = []
+
+    async def call():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise APIError(429, {"retry-after-ms": "20"})
+        return "ok"
+
+    assert asyncio.run(scheduler.run(call, tokens=100)) == "ok"
+    assert len(attempts) == 3
+    assert attempts[2] - attempts[1] >= 0.015
+    assert scheduler.stats == {"requests": 3, "completed": 1, "rate_limited": 2, "failed": 0}
+
+
+def test_run_gives_up_after_max_retries():
+    scheduler = RateLimitedScheduler(requests_per_minute=6000, tokens_per_minute=10 ** 7, max_retries=1)
+
+    async def call():
+        raise APIError(429, {"retry-after": "0"})
+
+    with pytest.raises(APIError):
+        asyncio.run(scheduler.run(call))
+    assert scheduler.stats["requests"] == 2 and scheduler.stats["failed"] == 1
+
+
+def test_run_does_not_retry_other_errors():
+    scheduler = RateLimitedScheduler(requests_per_minute=6000, tokens_per_minute=10 ** 7)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise ValueError("content filter")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(call))
+    assert len(attempts) == 1
+
+
+def test_as_completed_yields_in_completion_order():
+    scheduler = RateLimitedScheduler(requests_per_minute=6000, tokens_per_minute=10 ** 7)
+
+    def call(delay, fail=False):
+        async def run():
+            await asyncio.sleep(delay)
+            if fail:
+                raise ValueError("bad input")
+            return delay
+        return run
+
+    async def collect():
+        calls = [(call(0.06), 10), (call(0.0), 10), (call(0.03, fail=True), 10)]
+        return [item async for item in scheduler.as_completed(calls)]
+
+    results = asyncio.run(collect())
+
+    assert [index for index, _, _ in results] == [1, 2, 0]
+    assert results[0][1] == 0.0 and results[2][1] == 0.06
+    assert isinstance(results[1][2], ValueError)
+
+
+def test_token_bucket_paces_after_burst():
+    async def acquire_all():
+        # 10 per second with a burst of 5: the last 5 wait about half a second
+        bucket = TokenBucket(per_minute=600, capacity=5)
+        start = time.monotonic()
+        for _ in range(10):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert 0.4 <= asyncio.run(acquire_all()) < 1.0
+
+
+def test_token_bucket_lets_oversized_requests_through():
+    async def acquire():
+        bucket = TokenBucket(per_minute=60, capacity=10)
+        await asyncio.wait_for(bucket.acquire(1000), timeout=0.5)
+        return bucket.tokens
+
+    assert asyncio.run(acquire()) < 1e-3
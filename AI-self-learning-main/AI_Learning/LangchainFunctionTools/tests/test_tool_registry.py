@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+from typing import Literal, Optional
+
+from tool_registry import ToolRegistry
+
+
+def tool_call(call_id, name, arguments):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+def test_schema_from_signature():
+    registry = ToolRegistry()
+
+    @registry.register(params={"location": "The city and state"})
+    def get_current_weather(location: str, unit: Literal["celsius", "fahrenheit"] = "fahrenheit",
+                            days: Optional[int] = None):
+        """Get the current weather in a given location"""
+
+    (schema,) = registry.schemas()
+    function = schema["function"]
+    assert schema["type"] == "function"
+    assert function["name"] == "get_current_weather"
+    assert function["description"] == "Get the current weather in a given location"
+    assert function["parameters"] == {
+        "type": "object",
+        "properties": {
+            "location": {"type": "string", "description": "The city and state"},
+            "unit": {"type": "string", "enum": ["celsius", "fahrenheit"]},
+            "days": {"type": "integer"},
+        },
+        "required": ["location"],
+    }
+
+
+def test_pure_results_are_cached_until_ttl():
+    registry = ToolRegistry()
+    calls = []
+
+    @registry.register(pure=True, ttl=0.05)
+    def square(x: int):
+        calls.append(x)
+        return {"value": x * x}
+
+    assert registry.call("square", {"x": 3}) == '{"value": 9}'
+    assert registry.call("square", {"x": 3}) == '{"value": 9}'
+    assert calls == [3] and registry.stats["cache_hits"] == 1
+    time.sleep(0.06)
+    registry.call("square", {"x": 3})
+    assert calls == [3, 3]
+
+
+def test_impure_results_are_not_cached():
+    registry = ToolRegistry()
+    calls = []
+
+    @registry.register()
+    def now():
+        calls.append(1)
+        return "tick"
+
+    registry.call("now", {})
+    registry.call("now", {})
+    assert len(calls) == 2
+
+
+def test_cache_drops_oldest_entry():
+    registry = ToolRegistry(max_cache_entries=2)
+
+    @registry.register(pure=True)
+    def echo(x: int):
+        return x
+
+    for x in (1, 2, 3):
+        registry.call("echo", {"x": x})
+    assert [json.loads(key[1])["x"] for key in registry._cache] == [2, 3]
+
+
+def test_errors_become_tool_messages():
+    registry = ToolRegistry()
+
+    @registry.register()
+    def divide(a: int, b: int):
+        return a / b
+
+    messages = registry.execute([tool_call("c1", "divide", {"a": 1, "b": 0})])
+    assert messages[0]["role"] == "tool" and messages[0]["tool_call_id"] == "c1"
+    assert json.loads(messages[0]["content"]) == {"error": "ZeroDivisionError: division by zero"}
+    assert registry.stats["errors"] == 1
+
+    (unknown,) = registry.execute([tool_call("c2", "missing", {})])
+    assert json.loads(unknown["content"]) == {"error": "Unknown tool: missing"}
+
+
+def test_execute_runs_concurrently_in_call_order():
+    registry = ToolRegistry(max_workers=3)
+    barrier = threading.Barrier(3, timeout=2)
+
+    @registry.register()
+    def wait(delay: float):
+        # Deadlocks (and times out) unless all three calls run at once
+        barrier.wait()
+        time.sleep(delay)
+        return str(delay)
+
+    calls = [tool_call(f"c{i}", "wait", {"delay": delay}) for i, delay in enumerate((0.03, 0.0, 0.01))]
+    messages = registry.execute(calls)
+
+    assert [message["tool_call_id"] for message in messages] == ["c0", "c1", "c2"]
+    assert [message["content"] for message in messages] == ["0.03", "0.0", "0.01"]
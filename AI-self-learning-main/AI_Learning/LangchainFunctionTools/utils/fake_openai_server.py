@@ -0,0 +1,108 @@
+"""
+Local stand-in for an Azure OpenAI chat deployment that enforces its own RPM
+quota and answers with 429 + Retry-After once it is exceeded. It exists to try
+out the rate limiter (rate_limiter.py) without spending real quota.
+
+    python fake_openai_server.py --port 8089 --rpm 120 --latency-ms 300
+
+Then point the examples at it, e.g. for MultipleChains:
+    OPENAI_API_BASE=http://127.0.0.1:8089 OPENAI_API_KEY=fake OPENAI_API_VERSION=2024-06-01 \
+    DOCUMENT_MODEL=fake python main.py
+"""
+import argparse
+import collections
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class QuotaWindow:
+    """
+    Sliding window of accepted requests (one minute unless `seconds` says otherwise).
+    """
+    def __init__(self, requests_per_minute, seconds=60):
+        self.requests_per_minute = requests_per_minute
+        self.seconds = seconds
+        self.accepted = collections.deque()
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def admit(self):
+        """
+        Returns 0 if the request is accepted, else the seconds until a slot frees up.
+        """
+        with self._lock:
+            now = time.monotonic()
+            while self.accepted and now - self.accepted[0] >= self.seconds:
+                self.accepted.popleft()
+            if len(self.accepted) < self.requests_per_minute:
+                self.accepted.append(now)
+                return 0
+            self.rejected += 1
+            return self.seconds - (now - self.accepted[0])
+
+
+def make_handler(window, latency):
+    class ChatCompletionsHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.split("?")[0].endswith("/chat/completions"):
+                return self._send(404, {"error": {"code": "404", "message": "Not found"}})
+            wait = window.admit()
+            if wait:
+                return self._send(429, {"error": {"code": "429", "message": "Rate limit exceeded."}},
+                                  {"retry-after": str(max(1, round(wait))), "retry-after-ms": str(int(wait * 1000))})
+            time.sleep(latency)
+            prompt = " ".join(str(message.get("content", "")) for message in body.get("messages", []))
+            prompt_tokens = len(prompt) // 4
+            completion_tokens = 8
+            self._send(200, {
+                "id": "fake-completion", "object": "chat.completion", "created": int(time.time()),
+                "model": "fake",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"Fake answer to: {prompt[-60:]}"}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens},
+            })
+
+        def _send(self, status, payload, headers=None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ChatCompletionsHandler
+
+
+def serve(port=8089, requests_per_minute=120, latency=0.3):
+    """
+    Starts the server in a background thread; returns (server, quota window).
+    """
+    window = QuotaWindow(requests_per_minute)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(window, latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, window
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--rpm", type=int, default=120)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    args = parser.parse_args()
+    server, window = serve(args.port, args.rpm, args.latency_ms / 1000)
+    print(f"Fake Azure OpenAI on http://127.0.0.1:{args.port} ({args.rpm} RPM), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"rejected {window.rejected} requests with 429")
+        server.shutdown()
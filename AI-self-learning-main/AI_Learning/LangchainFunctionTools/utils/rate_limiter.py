@@ -0,0 +1,234 @@
+"""
+Rate-limit-aware scheduling of async LLM calls.
+
+Azure OpenAI enforces a requests-per-minute (RPM) and a tokens-per-minute
+(TPM) quota per deployment and answers with 429 once either is exceeded.
+RateLimitedScheduler keeps a token bucket for each budget and reserves the
+estimated tokens of a call before sending it. After a 429 it pauses the whole
+deployment for the time given by Retry-After, or an exponential backoff if the
+header is missing, and lowers its request rate, so the batch slows down
+instead of hammering the endpoint.
+
+    scheduler = RateLimitedScheduler(requests_per_minute=60, tokens_per_minute=30000)
+    calls = [(lambda p=p: chain.ainvoke(p), estimate_tokens(str(p))) for p in inputs]
+    async for index, result, error in scheduler.as_completed(calls):
+        ...
+
+Let the scheduler do the retrying: build LangChain models with max_retries=0.
+Otherwise the client retries 429s internally, and the scheduler never sees them.
+"""
+import asyncio
+import math
+import random
+import time
+
+DEFAULT_OUTPUT_TOKENS = 256
+
+
+def estimate_tokens(text, max_output_tokens=DEFAULT_OUTPUT_TOKENS):
+    """
+    Rough token count of a request before it is sent: about 4 characters per prompt token,
+    plus the completion tokens the deployment may produce (Azure counts max_tokens against TPM).
+    """
+    return math.ceil(len(text) / 4) + max_output_tokens
+
+
+def is_rate_limit_error(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+def retry_after(error):
+    """
+    Seconds to wait, according to the Retry-After(-ms) header of a 429 response, or None.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return float(value) / scale
+        except ValueError:
+            # HTTP-date form; fall back to the exponential backoff
+            return None
+    return None
+
+
+def used_tokens(result):
+    """
+    Tokens actually consumed by a call, if the result reports them (LangChain AIMessage or an
+    openai ChatCompletion), else None.
+    """
+    usage = getattr(result, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens")
+    usage = getattr(result, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+class TokenBucket:
+    """
+    Holds up to `capacity` units, refilled continuously at `per_minute` units per minute.
+    Waiters are served in arrival order. The default capacity is ten seconds' worth, because
+    Azure checks the per-minute quota over short windows and rejects a full-minute burst.
+    """
+    def __init__(self, per_minute, capacity=None):
+        self.rate = self.max_rate = per_minute / 60
+        self.capacity = capacity or max(1, per_minute / 6)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return now
+
+    async def acquire(self, amount=1):
+        # A request larger than the whole bucket could never be served; let it through on a full bucket
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = self._refill()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                elif self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                else:
+                    await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount):
+        """
+        Charges (positive) or refunds (negative) `amount` once the real usage is known.
+        """
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+    def pause(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def slow_down(self, factor=0.5):
+        # After a 429 the saved-up burst is not really available
+        self._refill()
+        self.tokens = min(self.tokens, 0)
+        self.rate = max(self.max_rate / 60, self.rate * factor)
+
+    def speed_up(self, fraction=0.05):
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate * fraction)
+
+
+class DeploymentBudget:
+    """
+    RPM and TPM buckets of one deployment. The configured budgets are upper bounds: every 429
+    halves the request rate and each success wins back 5% of it, so a budget set above the real
+    quota converges to what the deployment accepts.
+    """
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    async def acquire(self, tokens):
+        await self.requests.acquire(1)
+        if tokens:
+            await self.tokens.acquire(tokens)
+
+    def reconcile(self, estimated, actual):
+        if actual is not None:
+            self.tokens.adjust(actual - estimated)
+
+    def throttle(self, seconds):
+        # Calls sent in the same burst are rejected together; slow down once per burst
+        if time.monotonic() >= self.requests.blocked_until:
+            self.requests.slow_down()
+        self.requests.pause(seconds)
+        self.tokens.pause(seconds)
+
+    def succeeded(self):
+        self.requests.speed_up()
+
+
+class RateLimitedScheduler:
+    def __init__(self, requests_per_minute=60, tokens_per_minute=60000, max_concurrency=16, max_retries=6,
+                 base_delay=1.0, max_delay=60.0, limits=None):
+        """
+        Args:
+            requests_per_minute (int): RPM budget of deployments not listed in `limits`.
+            tokens_per_minute (int): TPM budget of deployments not listed in `limits`.
+            max_concurrency (int): Calls in flight at once, across deployments.
+            max_retries (int): Retries of a call after 429 responses before its error is returned.
+            base_delay (float): First backoff in seconds when a 429 carries no Retry-After; doubles per retry.
+            max_delay (float): Upper bound of that backoff.
+            limits (dict): deployment -> (requests_per_minute, tokens_per_minute).
+        """
+        self.default_limits = (requests_per_minute, tokens_per_minute)
+        self.limits = dict(limits or {})
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._budgets = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats = {"requests": 0, "completed": 0, "rate_limited": 0, "failed": 0}
+
+    def budget(self, deployment):
+        if deployment not in self._budgets:
+            self._budgets[deployment] = DeploymentBudget(*self.limits.get(deployment, self.default_limits))
+        return self._budgets[deployment]
+
+    def _backoff(self, attempt):
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        # Jitter keeps retried calls from arriving together again
+        return delay * random.uniform(0.5, 1.0)
+
+    async def run(self, call, tokens=0, deployment="default"):
+        """
+        Awaits `call()` (a zero-argument function returning a coroutine) once the deployment's
+        budget allows `tokens` more tokens, retrying on 429.
+        """
+        budget = self.budget(deployment)
+        for attempt in range(self.max_retries + 1):
+            await budget.acquire(tokens)
+            async with self._semaphore:
+                self.stats["requests"] += 1
+                try:
+                    result = await call()
+                except Exception as error:
+                    if not is_rate_limit_error(error) or attempt == self.max_retries:
+                        self.stats["failed"] += 1
+                        raise
+                    self.stats["rate_limited"] += 1
+                    # Rejected calls do not count against the quota
+                    budget.reconcile(tokens, 0)
+                    delay = retry_after(error)
+                    budget.throttle(delay if delay is not None else self._backoff(attempt))
+                    continue
+            budget.reconcile(tokens, used_tokens(result))
+            budget.succeeded()
+            self.stats["completed"] += 1
+            return result
+
+    async def as_completed(self, calls, deployment="default"):
+        """
+        Schedules every (call, estimated_tokens) pair and yields (index, result, error) in
+        completion order, so fast answers are available before the slowest one finishes.
+        """
+        async def indexed(index, call, tokens):
+            try:
+                return index, await self.run(call, tokens, deployment), None
+            except Exception as error:
+                return index, None, error
+
+        tasks = [asyncio.create_task(indexed(i, call, tokens)) for i, (call, tokens) in enumerate(calls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,145 @@
+"""
+Registry of Python functions exposed to the model as tools.
+
+The `tools` JSON schema is built from each function's signature (type hints,
+Literal[...] for enums, defaults for optional parameters) and docstring. All
+tool calls of one assistant message are executed concurrently on a thread
+pool, and the results come back as `tool` messages in call order, ready for a
+single follow-up request. Results of pure tools (same arguments -> same result)
+are cached for `ttl` seconds.
+
+    registry = ToolRegistry()
+
+    @registry.register(pure=True, ttl=600, params={"location": "The city and state"})
+    def get_current_weather(location: str, unit: Literal["celsius", "fahrenheit"] = "fahrenheit"):
+        \"\"\"Get the current weather in a given location\"\"\"
+"""
+import inspect
+import json
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+
+
+def _json_schema(annotation):
+    if typing.get_origin(annotation) is typing.Literal:
+        values = list(typing.get_args(annotation))
+        return {"type": _JSON_TYPES.get(type(values[0]), "string"), "enum": values}
+    if typing.get_origin(annotation) is typing.Union:
+        # Optional[X] -> X
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _json_schema(args[0]) if len(args) == 1 else {"type": "string"}
+    origin = typing.get_origin(annotation) or annotation
+    return {"type": _JSON_TYPES.get(origin, "string")}
+
+
+class ToolRegistry:
+    def __init__(self, max_workers=8, max_cache_entries=1024):
+        """
+        Args:
+            max_workers (int): Tool calls executed at once.
+            max_cache_entries (int): Cached results kept before the oldest are dropped.
+        """
+        self.max_cache_entries = max_cache_entries
+        self._tools = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.stats = {"calls": 0, "cache_hits": 0, "errors": 0}
+
+    def register(self, description=None, params=None, pure=False, ttl=300.0):
+        """
+        Decorator exposing a function as a tool.
+        Args:
+            description (str): Tool description; defaults to the docstring.
+            params (dict): Parameter name -> description.
+            pure (bool): The result depends only on the arguments, so it may be cached.
+            ttl (float): Seconds a cached result of a pure tool stays valid.
+        """
+        def decorator(function):
+            hints = typing.get_type_hints(function)
+            properties, required = {}, []
+            for name, parameter in inspect.signature(function).parameters.items():
+                schema = _json_schema(hints.get(name, str))
+                if params and name in params:
+                    schema["description"] = params[name]
+                properties[name] = schema
+                if parameter.default is inspect.Parameter.empty:
+                    required.append(name)
+            self._tools[function.__name__] = {
+                "function": function,
+                "pure": pure,
+                "ttl": ttl,
+                "schema": {
+                    "type": "function",
+                    "function": {
+                        "name": function.__name__,
+                        "description": description or inspect.getdoc(function) or "",
+                        "parameters": {"type": "object", "properties": properties, "required": required},
+                    },
+                },
+            }
+            return function
+        return decorator
+
+    def schemas(self):
+        """
+        The `tools` argument of chat.completions.create.
+        """
+        return [tool["schema"] for tool in self._tools.values()]
+
+    def call(self, name, arguments):
+        """
+        Runs one tool with parsed `arguments` and returns its result as a string.
+        """
+        tool = self._tools.get(name)
+        if tool is None:
+            return json.dumps({"error": f"Unknown tool: {name}"})
+        key = (name, json.dumps(arguments, sort_keys=True))
+        if tool["pure"]:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] > time.monotonic():
+                    self.stats["cache_hits"] += 1
+                    return cached[1]
+        with self._lock:
+            self.stats["calls"] += 1
+        result = tool["function"](**arguments)
+        if not isinstance(result, str):
+            result = json.dumps(result)
+        if tool["pure"]:
+            with self._lock:
+                self._cache.pop(key, None)
+                self._cache[key] = (time.monotonic() + tool["ttl"], result)
+                if len(self._cache) > self.max_cache_entries:
+                    # Dicts keep insertion order, so the first entry is the oldest
+                    del self._cache[next(iter(self._cache))]
+        return result
+
+    def _run(self, tool_call):
+        try:
+            arguments = json.loads(tool_call.function.arguments or "{}")
+            content = self.call(tool_call.function.name, arguments)
+        except Exception as error:
+            # The model gets the error as the tool result instead of the whole turn failing
+            with self._lock:
+                self.stats["errors"] += 1
+            content = json.dumps({"error": f"{type(error).__name__}: {error}"})
+        return {"role": "tool", "tool_call_id": tool_call.id, "content": content}
+
+    def execute(self, tool_calls):
+        """
+        Executes every tool call of an assistant message concurrently.
+        Returns:
+            list: One `tool` message per call, in call order.
+        """
+        if len(tool_calls) == 1:
+            return [self._run(tool_calls[0])]
+        return list(self._executor.map(self._run, tool_calls))
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,131 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache backed by SQLite.
+    Vectors are stored as packed float32 blobs keyed by sha256(deployment, text).
+    """
+    def __init__(self, path=".embedding_cache.sqlite", max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            path (str): SQLite file holding the cache.
+            max_bytes (int): Size cap for stored vectors; least recently used entries are evicted above it.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(deployment, text):
+        return hashlib.sha256(f"{deployment}\0{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _pack(vector):
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _unpack(blob):
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+    def get_many(self, keys):
+        """
+        Returns a dict of key -> vector for the keys found in the cache.
+        """
+        found = {}
+        if not keys:
+            return found
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(unique_keys), 500):
+                part = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = self._unpack(blob)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        hits = sum(1 for key in keys if key in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items):
+        """
+        Stores (key, vector) pairs and evicts old entries if the cache grew past `max_bytes`.
+        """
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            blob = self._pack(vector)
+            rows.append((key, blob, len(blob), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM embeddings ORDER BY last_used ASC"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+        self._conn.commit()
+        print(f"Embedding cache evicted {len(victims)} entries ({freed} bytes)")
+
+    def stats(self):
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
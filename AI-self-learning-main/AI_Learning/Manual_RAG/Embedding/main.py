@@ -1,23 +1,149 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.embeddings import Embeddings
 from langchain_openai import AzureOpenAIEmbeddings
 from dotenv import load_dotenv
 import os
+from Embedding.cache import EmbeddingCache
 
 # Load environment variables from .env
 load_dotenv()
 
-class EmbeddingManager:
-    def __init__(self):
+class EmbeddingManager(Embeddings):
+    def __init__(self, batch_size=64, max_workers=4, max_retries=3, retry_backoff=1.0,
+                 cache_path=".embedding_cache.sqlite", cache_max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            batch_size (int): Number of chunks sent per embedding request.
+            max_workers (int): Maximum number of embedding requests in flight at once.
+            max_retries (int): Attempts per batch before the error is raised.
+            retry_backoff (float): Base delay in seconds, doubled after every failed attempt.
+            cache_path (str): SQLite file for the persistent embedding cache, or None to disable caching.
+            cache_max_bytes (int): Size cap of the cache before least recently used vectors are evicted.
+        """
         os.environ.pop("OPENAI_API_BASE", None)
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(1, max_retries)
+        self.retry_backoff = retry_backoff
+        self.last_stats = {}
+        self.deployment = os.getenv("EMBEDDING_MODEL")
+        self.cache = EmbeddingCache(cache_path, cache_max_bytes) if cache_path else None
         self.embeddings = AzureOpenAIEmbeddings(
             model=os.getenv("EMBEDDING_MODEL"),      # Azure deployment name
             azure_endpoint=os.getenv("EMBEDDING_OPENAI_API_BASE"),  # instead of openai_api_base
             openai_api_key=os.getenv("EMBEDDING_OPENAI_API_KEY"),
             openai_api_version=os.getenv("EMBEDDING_OPENAI_API_VERSION"),
-            chunk_size=1
+            chunk_size=self.batch_size
         )
 
+    def _embed_batch(self, batch):
+        # One request per batch; retried with exponential backoff
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return self.embeddings.embed_documents(batch)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                print(f"Embedding batch failed (attempt {attempt}/{self.max_retries}): {e}. Retrying in {delay:.1f}s")
+                time.sleep(delay)
+
     def embed_documents(self, documents):
-        return self.embeddings.embed_documents(documents)
+        """
+        Returns one vector per document. Vectors found in the cache are reused;
+        only the misses are sent to the embedding deployment.
+        """
+        documents = list(documents)
+        if self.cache is None:
+            return self._embed_uncached(documents)
+
+        keys = [EmbeddingCache.make_key(self.deployment, doc) for doc in documents]
+        cached = self.cache.get_many(keys)
+        # Deduplicate misses so repeated chunks are embedded once
+        missing = {}
+        for key, doc in zip(keys, documents):
+            if key not in cached and key not in missing:
+                missing[key] = doc
+        if missing:
+            new_vectors = self._embed_uncached(list(missing.values()))
+            fresh = list(zip(missing.keys(), new_vectors))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+        print(f"Embedding cache: {len(documents) - len(missing)} reused, {len(missing)} embedded")
+        return [cached[key] for key in keys]
+
+    def _embed_uncached(self, documents):
+        """
+        Embeds documents in batches of `batch_size`, running up to `max_workers`
+        requests concurrently. Vectors are returned in the same order as the input.
+        Throughput of the last call is kept in `last_stats`.
+        """
+        documents = list(documents)
+        if not documents:
+            return []
+        batches = [documents[i:i + self.batch_size] for i in range(0, len(documents), self.batch_size)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            # executor.map yields results in submission order
+            results = list(executor.map(self._embed_batch, batches))
+        elapsed = time.perf_counter() - start
+
+        vectors = [vec for batch_vectors in results for vec in batch_vectors]
+        self.last_stats = {
+            "chunks": len(documents),
+            "batches": len(batches),
+            "seconds": elapsed,
+            "chunks_per_second": len(documents) / elapsed if elapsed > 0 else float("inf"),
+        }
+        print(f"Embedded {len(documents)} chunks in {len(batches)} batches "
+              f"({elapsed:.2f}s, {self.last_stats['chunks_per_second']:.1f} chunks/s)")
+        return vectors
+
+    def embed_stream(self, items, batch_size=None, get_text=None):
+        """
+        Embeds an iterable lazily, yielding (item, vector) pairs one batch at a time
+        so only a single batch is held in memory.
+        Args:
+            items (iterable): Texts, or arbitrary records if `get_text` is given.
+            batch_size (int): Items embedded per call; defaults to enough to keep every worker busy.
+            get_text (callable): Extracts the text to embed from an item.
+        """
+        batch_size = batch_size or self.batch_size * self.max_workers
+        get_text = get_text or (lambda item: item)
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield from zip(batch, self.embed_documents([get_text(i) for i in batch]))
+                batch = []
+        if batch:
+            yield from zip(batch, self.embed_documents([get_text(i) for i in batch]))
 
     def embed_query(self, query):
-        return self.embeddings.embed_query(query)
\ No newline at end of file
+        if self.cache is None:
+            return self.embeddings.embed_query(query)
+        key = EmbeddingCache.make_key(self.deployment, query)
+        cached = self.cache.get_many([key])
+        if key in cached:
+            return cached[key]
+        vector = self.embeddings.embed_query(query)
+        self.cache.put_many([(key, vector)])
+        return vector
+
+    async def aembed_query(self, query):
+        """
+        Async embed_query: the request is awaited, so many queries can be embedded concurrently.
+        The SQLite cache is read and written on worker threads to keep the event loop free.
+        """
+        if self.cache is None:
+            return await self.embeddings.aembed_query(query)
+        key = EmbeddingCache.make_key(self.deployment, query)
+        cached = await asyncio.to_thread(self.cache.get_many, [key])
+        if key in cached:
+            return cached[key]
+        vector = await self.embeddings.aembed_query(query)
+        await asyncio.to_thread(self.cache.put_many, [(key, vector)])
+        return vector
@@ -0,0 +1,326 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict, namedtuple
+from itertools import groupby
+
+import numpy as np
+
+# Same fields the code reads from Qdrant's ScoredPoint
+ScoredPoint = namedtuple("ScoredPoint", ["id", "score", "payload"])
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_POSTINGS_TABLE = (
+    "CREATE TABLE IF NOT EXISTS {} ("
+    " term TEXT NOT NULL,"
+    " segment INTEGER NOT NULL,"
+    " rows BLOB NOT NULL,"
+    " tfs BLOB NOT NULL,"
+    " PRIMARY KEY (term, segment))"
+)
+
+
+def tokenize(text):
+    """
+    Lower-cased word tokens; identifiers such as get_current_weather stay whole.
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index stored in SQLite next to a vector collection.
+    Postings are kept per term as two packed arrays (uint32 document rows and
+    uint16 term frequencies, 6 bytes per posting) that decode with
+    np.frombuffer, so scoring a term is one vectorised add.
+    Documents added since the last `flush` are buffered in memory. Each flush
+    writes its postings as a new segment, so existing blobs are never rewritten;
+    `compact` merges the segments into one and drops deleted or re-indexed rows.
+    It runs on its own once there are `max_segments` segments or a quarter of
+    the rows are dead.
+    """
+    def __init__(self, path, k1=1.5, b=0.75, flush_every=10000, max_segments=16, max_dead_fraction=0.25):
+        """
+        Args:
+            path (str): SQLite file of the index (e.g. .lexical_index/Employee_data.sqlite).
+            k1 (float): BM25 term-frequency saturation.
+            b (float): BM25 document-length normalisation.
+            flush_every (int): Buffered documents written out per flush.
+            max_segments (int): Segments kept before they are merged.
+            max_dead_fraction (float): Share of dead rows that triggers a compaction.
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.flush_every = flush_every
+        self.max_segments = max_segments
+        self.max_dead_fraction = max_dead_fraction
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " row INTEGER PRIMARY KEY,"
+            " id TEXT UNIQUE NOT NULL,"
+            " length INTEGER NOT NULL,"
+            " deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [c[1] for c in self._conn.execute("PRAGMA table_info(postings)")]
+        if columns and "segment" not in columns:
+            # Indexes written before segments: their postings become segment 0
+            self._conn.execute("ALTER TABLE postings RENAME TO postings_unsegmented")
+        self._conn.execute(_POSTINGS_TABLE.format("postings"))
+        if columns and "segment" not in columns:
+            self._conn.execute("INSERT INTO postings SELECT term, 0, rows, tfs FROM postings_unsegmented")
+            self._conn.execute("DROP TABLE postings_unsegmented")
+        self._conn.commit()
+
+        self._row_of = {}
+        self._key_of = {}
+        count = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM docs").fetchone()[0]
+        self._lengths = np.zeros(count, dtype=np.float32)
+        self._live = np.zeros(count, dtype=bool)
+        for row, point_id, length, deleted in self._conn.execute("SELECT row, id, length, deleted FROM docs"):
+            self._row_of[point_id] = row
+            self._key_of[row] = point_id
+            self._lengths[row] = length
+            self._live[row] = not deleted
+        self._segments = self._conn.execute("SELECT COUNT(DISTINCT segment) FROM postings").fetchone()[0]
+        self._next_segment = self._conn.execute("SELECT COALESCE(MAX(segment) + 1, 0) FROM postings").fetchone()[0]
+        self._pending_docs = []
+        self._pending_postings = defaultdict(list)
+
+    @property
+    def count(self):
+        return len(self._lengths)
+
+    @staticmethod
+    def _key(point_id):
+        return json.dumps(point_id)
+
+    def _grow(self, size):
+        if size > len(self._lengths):
+            extra = size - len(self._lengths)
+            self._lengths = np.concatenate([self._lengths, np.zeros(extra, dtype=np.float32)])
+            self._live = np.concatenate([self._live, np.zeros(extra, dtype=bool)])
+
+    def add(self, point_id, text):
+        """
+        Indexes (or re-indexes) the text of one point.
+        """
+        with self._lock:
+            key = self._key(point_id)
+            old_row = self._row_of.get(key)
+            if old_row is not None:
+                # Postings are append-only: retire the old row and index the text under a new one
+                self._live[old_row] = False
+                self._key_of.pop(old_row, None)
+            row = self.count
+            tokens = tokenize(text)
+            self._grow(row + 1)
+            self._lengths[row] = len(tokens)
+            self._live[row] = True
+            self._row_of[key] = row
+            self._key_of[row] = key
+            self._pending_docs.append((row, key, len(tokens)))
+            for term, tf in Counter(tokens).items():
+                self._pending_postings[term].append((row, min(tf, 65535)))
+            if len(self._pending_docs) >= self.flush_every:
+                self.flush()
+
+    def add_points(self, points):
+        for point in points:
+            self.add(point["id"], (point.get("payload") or {}).get("text", ""))
+
+    def delete(self, point_ids):
+        with self._lock:
+            self.flush()
+            rows = [self._row_of[self._key(i)] for i in point_ids if self._key(i) in self._row_of]
+            self._live[rows] = False
+            self._conn.executemany("UPDATE docs SET deleted = 1 WHERE row = ?", [(r,) for r in rows])
+            self._conn.commit()
+            self._maybe_compact()
+
+    def flush(self):
+        with self._lock:
+            self._write_pending()
+            self._maybe_compact()
+
+    def _write_pending(self):
+        with self._lock:
+            if not self._pending_docs:
+                return
+            for row, key, length in self._pending_docs:
+                # Drops the previous row of a re-indexed point, whether flushed earlier or in this batch
+                self._conn.execute("DELETE FROM docs WHERE id = ?", (key,))
+                self._conn.execute("INSERT INTO docs (row, id, length) VALUES (?, ?, ?)", (row, key, length))
+            segment = self._next_segment
+            self._conn.executemany(
+                "INSERT INTO postings (term, segment, rows, tfs) VALUES (?, ?, ?, ?)",
+                [(term,
+                  segment,
+                  np.array([p[0] for p in postings], dtype=np.uint32).tobytes(),
+                  np.array([p[1] for p in postings], dtype=np.uint16).tobytes())
+                 for term, postings in self._pending_postings.items()]
+            )
+            self._conn.commit()
+            self._next_segment += 1
+            self._segments += 1
+            self._pending_docs = []
+            self._pending_postings = defaultdict(list)
+
+    def _maybe_compact(self):
+        dead = self.count - int(self._live.sum())
+        if self._segments > self.max_segments or (dead and dead >= self.max_dead_fraction * self.count):
+            self.compact()
+
+    def compact(self):
+        """
+        Merges all segments into one, renumbering the live rows densely and dropping
+        the postings of deleted and re-indexed rows.
+        """
+        with self._lock:
+            self._write_pending()
+            live_rows = np.flatnonzero(self._live)
+            new_row = np.full(self.count, -1, dtype=np.int64)
+            new_row[live_rows] = np.arange(len(live_rows))
+
+            self._conn.execute("DELETE FROM docs WHERE deleted = 1")
+            # Ascending order: every live row moves down into a row number that is already free
+            self._conn.executemany("UPDATE docs SET row = ? WHERE row = ?",
+                                   [(int(new_row[r]), int(r)) for r in live_rows if new_row[r] != r])
+            self._conn.execute("DROP TABLE IF EXISTS postings_compacted")
+            self._conn.execute(_POSTINGS_TABLE.format("postings_compacted"))
+            cursor = self._conn.execute("SELECT term, rows, tfs FROM postings ORDER BY term, segment")
+            for term, parts in groupby(cursor, key=lambda part: part[0]):
+                parts = list(parts)
+                rows = np.concatenate([np.frombuffer(p[1], dtype=np.uint32) for p in parts]).astype(np.int64)
+                tfs = np.concatenate([np.frombuffer(p[2], dtype=np.uint16) for p in parts])
+                keep = new_row[rows] >= 0
+                if keep.any():
+                    self._conn.execute(
+                        "INSERT INTO postings_compacted (term, segment, rows, tfs) VALUES (?, 0, ?, ?)",
+                        (term, new_row[rows[keep]].astype(np.uint32).tobytes(), tfs[keep].tobytes())
+                    )
+            self._conn.execute("DROP TABLE postings")
+            self._conn.execute("ALTER TABLE postings_compacted RENAME TO postings")
+            self._conn.commit()
+
+            self._lengths = self._lengths[live_rows].copy()
+            self._live = np.ones(len(live_rows), dtype=bool)
+            self._key_of = {int(new_row[row]): key for row, key in self._key_of.items() if new_row[row] >= 0}
+            self._row_of = {key: row for row, key in self._key_of.items()}
+            self._segments = 1 if len(live_rows) else 0
+            self._next_segment = 1
+
+    def _postings(self, term):
+        parts = self._conn.execute("SELECT rows, tfs FROM postings WHERE term = ?", (term,)).fetchall()
+        if not parts:
+            return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint16)
+        if len(parts) == 1:
+            return np.frombuffer(parts[0][0], dtype=np.uint32), np.frombuffer(parts[0][1], dtype=np.uint16)
+        return (np.concatenate([np.frombuffer(p[0], dtype=np.uint32) for p in parts]),
+                np.concatenate([np.frombuffer(p[1], dtype=np.uint16) for p in parts]))
+
+    def search(self, query, limit=10):
+        """
+        BM25 top-k for a text query.
+        Returns:
+            list: (point_id, score) tuples, best first.
+        """
+        with self._lock:
+            self.flush()
+            live_count = int(self._live.sum())
+            if live_count == 0:
+                return []
+            avg_length = float(self._lengths[self._live].mean()) or 1.0
+            # Only rows containing a query term are scored, not every row of the index
+            matched_rows, contributions = [], []
+            for term in set(tokenize(query)):
+                rows, tfs = self._postings(term)
+                if len(rows) == 0:
+                    continue
+                rows = rows.astype(np.int64)
+                live = self._live[rows]
+                rows = rows[live]
+                df = len(rows)
+                if df == 0:
+                    continue
+                tfs = tfs[live].astype(np.float32)
+                idf = np.log(1 + (live_count - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[rows] / avg_length)
+                matched_rows.append(rows)
+                contributions.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+            if not matched_rows:
+                return []
+            rows, inverse = np.unique(np.concatenate(matched_rows), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+            top_k = min(limit, int(np.count_nonzero(scores)))
+            if top_k == 0:
+                return []
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top])]
+            return [(json.loads(self._key_of[int(rows[i])]), float(scores[i])) for i in top]
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+
+def reciprocal_rank_fusion(ranked_lists, k=60):
+    """
+    Fuses ranked lists of point IDs: score(id) = sum over lists of 1 / (k + rank).
+    Returns:
+        list: (point_id, fused_score) tuples, best first.
+    """
+    fused = defaultdict(float)
+    for ranked in ranked_lists:
+        for rank, point_id in enumerate(ranked, start=1):
+            fused[point_id] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def hybrid_search(vector_store, collection_name, query_vector, query_text, lexical_index,
+                  limit=10, candidates=50, rrf_k=60):
+    """
+    Dense + BM25 retrieval fused with reciprocal rank fusion.
+    Args:
+        vector_store: QdrantClientManager or LocalIndexManager.
+        candidates (int): Results taken from each retriever before fusion.
+        rrf_k (int): RRF constant; larger values flatten the rank weights.
+    Returns:
+        List of ScoredPoint (id, fused score, payload), best first.
+    """
+    dense = vector_store.search(collection_name, query_vector, limit=candidates)
+    lexical = lexical_index.search(query_text, limit=candidates)
+    fused = reciprocal_rank_fusion([[p.id for p in dense], [point_id for point_id, _ in lexical]], k=rrf_k)[:limit]
+
+    payloads = {p.id: p.payload for p in dense}
+    missing = [point_id for point_id, _ in fused if point_id not in payloads]
+    if missing:
+        payloads.update(vector_store.retrieve(collection_name, missing))
+    return [ScoredPoint(id=point_id, score=score, payload=payloads.get(point_id)) for point_id, score in fused]
+
+
+async def ahybrid_search(vector_store, collection_name, query_vector, query_text, lexical_index,
+                         limit=10, candidates=50, rrf_k=60):
+    """
+    Async hybrid_search: the vector search is awaited while BM25 scoring runs in a worker thread.
+    `vector_store` must provide `asearch` and `aretrieve`.
+    """
+    dense, lexical = await asyncio.gather(
+        vector_store.asearch(collection_name, query_vector, limit=candidates),
+        asyncio.to_thread(lexical_index.search, query_text, candidates),
+    )
+    fused = reciprocal_rank_fusion([[p.id for p in dense], [point_id for point_id, _ in lexical]], k=rrf_k)[:limit]
+
+    payloads = {p.id: p.payload for p in dense}
+    missing = [point_id for point_id, _ in fused if point_id not in payloads]
+    if missing:
+        payloads.update(await vector_store.aretrieve(collection_name, missing))
+    return [ScoredPoint(id=point_id, score=score, payload=payloads.get(point_id)) for point_id, score in fused]
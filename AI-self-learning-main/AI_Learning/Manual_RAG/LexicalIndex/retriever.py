@@ -0,0 +1,30 @@
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    LangChain retriever over `hybrid_search`: dense results from the vector store
+    and BM25 results from a LexicalIndex, fused with reciprocal rank fusion.
+    """
+    vector_store: Any
+    collection_name: str
+    embeddings: Any
+    lexical_index: Any
+    k: int = 4
+    candidates: int = 50
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        query_vector = self.embeddings.embed_query(query)
+        results = self.vector_store.hybrid_search(
+            self.collection_name, query_vector, query, self.lexical_index,
+            limit=self.k, candidates=self.candidates
+        )
+        return [
+            Document(page_content=(r.payload or {}).get("text", ""),
+                     metadata={**(r.payload or {}).get("meta", {}), "id": r.id, "score": r.score})
+            for r in results
+        ]
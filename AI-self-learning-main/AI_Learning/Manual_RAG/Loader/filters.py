@@ -0,0 +1,49 @@
+"""
+Backend-neutral payload filters.
+
+A filter is a dict mapping a dotted payload field to a condition:
+    {"meta.source": "pdf_text"}                        exact match
+    {"meta.source": ["pdf_text", "web_text"]}          match any
+    {"meta.chunk_index": {"gte": 10, "lt": 20}}        range (gt, gte, lt, lte)
+All conditions must hold. QdrantClientManager turns the dict into a Qdrant
+Filter; LocalIndexManager evaluates it on its in-memory payload columns.
+"""
+
+# Field -> index type created with every collection:
+#   "keyword": exact / any-of matches on strings
+#   "integer": exact / any-of matches and ranges on integers
+#   "range":   ranges only (no lookup table, smaller index)
+PAYLOAD_INDEXES = {
+    "meta.source": "keyword",
+    "meta.chunk_index": "integer",
+    "meta.length": "range",
+}
+
+RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+
+
+def field_value(payload, field):
+    """
+    Value of a dotted field in a nested payload, or None if it is missing.
+    """
+    value = payload
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def parse_condition(field, condition):
+    """
+    Returns:
+        tuple: ("match", value), ("any", values) or ("range", {operator: bound}).
+    """
+    if isinstance(condition, dict):
+        unknown = set(condition) - set(RANGE_OPERATORS)
+        if unknown or not condition:
+            raise ValueError(f"Invalid range for '{field}': expected keys from {RANGE_OPERATORS}, got {sorted(condition)}.")
+        return "range", condition
+    if isinstance(condition, (list, tuple, set)):
+        return "any", list(condition)
+    return "match", condition
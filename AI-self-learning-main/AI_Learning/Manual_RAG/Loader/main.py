@@ -1,11 +1,48 @@
 import sys
 import os
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from LexicalIndex.main import ahybrid_search, hybrid_search
+from Loader.filters import PAYLOAD_INDEXES, parse_condition
+from qdrant_client.models import (
+    Distance, FieldCondition, Filter, IntegerIndexParams, IntegerIndexType, MatchAny, MatchValue,
+    PayloadSchemaType, PointIdsList, Range, SearchRequest, SetPayload, SetPayloadOperation, VectorParams
+)
+
+
+def to_qdrant_filter(query_filter):
+    """
+    Converts a filter dict (see Loader.filters) into a Qdrant Filter; Filter objects and None pass through.
+    """
+    if query_filter is None or isinstance(query_filter, Filter):
+        return query_filter
+    must = []
+    for field, condition in query_filter.items():
+        kind, value = parse_condition(field, condition)
+        if kind == "range":
+            must.append(FieldCondition(key=field, range=Range(**value)))
+        elif kind == "any":
+            must.append(FieldCondition(key=field, match=MatchAny(any=value)))
+        else:
+            must.append(FieldCondition(key=field, match=MatchValue(value=value)))
+    return Filter(must=must)
+
+
+def _payload_schema(index_type):
+    if index_type == "keyword":
+        return PayloadSchemaType.KEYWORD
+    if index_type == "integer":
+        return IntegerIndexParams(type=IntegerIndexType.INTEGER, lookup=True, range=True)
+    if index_type == "range":
+        return IntegerIndexParams(type=IntegerIndexType.INTEGER, lookup=False, range=True)
+    raise ValueError(f"Unknown payload index type '{index_type}'.")
 
 
 class QdrantClientManager:
     _client = None
+    _async_client = None
 
     @classmethod
     def initialize_client(cls, host='localhost', port=6333):
@@ -14,7 +51,29 @@ class QdrantClientManager:
         return cls._client
 
     @classmethod
-    def create_collection(cls, collection_name, vector_size=1536):
+    def initialize_async_client(cls, host='localhost', port=6333):
+        """
+        Client for the async query path (asearch / aretrieve); shared by all coroutines.
+        """
+        if cls._async_client is None:
+            cls._async_client = AsyncQdrantClient(host=host, port=port)
+        return cls._async_client
+
+    @classmethod
+    def collection_exists(cls, collection_name):
+        client = cls._client
+        if client is None:
+            client = cls.initialize_client()
+        return collection_name in [c.name for c in client.get_collections().collections]
+
+    @classmethod
+    def create_collection(cls, collection_name, vector_size=1536, payload_indexes=None):
+        """
+        Creates the collection if needed and makes sure its payload indexes exist.
+        Args:
+            payload_indexes (dict): Field -> "keyword", "integer" or "range" (default Loader.filters.PAYLOAD_INDEXES).
+                With an index, Qdrant resolves selective filters from the index before scoring any vector.
+        """
         existing_collections = [c.name for c in cls._client.get_collections().collections]
         if collection_name not in existing_collections:
             print(f"Creating collection: {collection_name}")
@@ -24,36 +83,174 @@ class QdrantClientManager:
             )
         else:
             print(f"Collection {collection_name} already exists.")
+        cls.create_payload_indexes(collection_name, payload_indexes)
+
+    @classmethod
+    def create_payload_indexes(cls, collection_name, payload_indexes=None):
+        """
+        Creates the missing payload indexes; collections made before indexing existed are backfilled.
+        """
+        payload_indexes = PAYLOAD_INDEXES if payload_indexes is None else payload_indexes
+        existing = cls._client.get_collection(collection_name).payload_schema or {}
+        for field, index_type in payload_indexes.items():
+            if field in existing:
+                continue
+            cls._client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=_payload_schema(index_type)
+            )
+            print(f"Created {index_type} payload index on '{field}' in collection '{collection_name}'.")
 
     
     @classmethod
-    def upload_data(cls, collection_name, data):
+    def _upsert_batch(cls, client, collection_name, batch, wait, max_retries, retry_backoff):
+        # Retries one batch with exponential backoff; raises once the attempts are used up
+        for attempt in range(1, max_retries + 1):
+            try:
+                client.upsert(
+                    collection_name=collection_name,
+                    points=batch,
+                    wait=wait
+                )
+                return len(batch)
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                delay = retry_backoff * (2 ** (attempt - 1))
+                print(f"Upsert of {len(batch)} points failed (attempt {attempt}/{max_retries}): {e}. Retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    @classmethod
+    def upload_data(cls, collection_name, data, batch_size=256, max_workers=4, wait=True,
+                    max_retries=3, retry_backoff=1.0):
         """
         Uploads data (list of dicts or points) to the specified Qdrant collection.
         Args:
             collection_name (str): Name of the collection.
             data (list): List of points to upload. Each point should be a dict with 'id', 'vector', and optionally 'payload'.
+            batch_size (int): Number of points sent per upsert request.
+            max_workers (int): Number of upsert requests in flight at once.
+            wait (bool): Wait for each batch to be applied; False only waits for the server to accept it.
+            max_retries (int): Attempts per batch before it is counted as failed.
+            retry_backoff (float): Base delay in seconds, doubled after every failed attempt.
+        Returns:
+            int: Number of points uploaded.
+        """
+        return cls.upload_stream(collection_name, data, batch_size=batch_size, max_workers=max_workers,
+                                 wait=wait, max_retries=max_retries, retry_backoff=retry_backoff)
+
+    @classmethod
+    def upload_stream(cls, collection_name, points, batch_size=256, max_workers=4, wait=True,
+                      max_retries=3, retry_backoff=1.0):
+        """
+        Uploads points from an iterable in batches, so the full dataset is never held in memory.
+        At most `max_workers` batches are in flight; reading from `points` pauses until one finishes.
+        Takes the same options as `upload_data`.
+        Raises:
+            RuntimeError: If any batch still fails after all retries (the other batches are uploaded).
+        Returns:
+            int: Number of points uploaded.
+        """
+        client = cls._client
+        if client is None:
+            client = cls.initialize_client()
+
+        uploaded = 0
+        failed = 0
+        start = time.perf_counter()
+
+        def collect(done):
+            nonlocal uploaded, failed
+            for future in done:
+                try:
+                    uploaded += future.result()
+                except Exception as e:
+                    failed += pending.pop(future)
+                    print(f"Error uploading batch: {e}")
+                    continue
+                pending.pop(future)
+            elapsed = time.perf_counter() - start
+            rate = uploaded / elapsed if elapsed > 0 else float("inf")
+            print(f"Uploaded {uploaded} points to '{collection_name}' ({rate:.1f} points/s)")
+
+        pending = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            def submit(batch):
+                if len(pending) >= max_workers:
+                    done, _ = wait_futures(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = executor.submit(cls._upsert_batch, client, collection_name, batch,
+                                         wait, max_retries, retry_backoff)
+                pending[future] = len(batch)
+
+            batch = []
+            for point in points:
+                batch.append(point)
+                if len(batch) >= batch_size:
+                    submit(batch)
+                    batch = []
+            if batch:
+                submit(batch)
+            if pending:
+                done, _ = wait_futures(list(pending))
+                collect(done)
+
+        elapsed = time.perf_counter() - start
+        print(f"Uploaded {uploaded} points to collection '{collection_name}' in {elapsed:.2f}s.")
+        if failed:
+            raise RuntimeError(f"{failed} points could not be uploaded to collection '{collection_name}'.")
+        return uploaded
+
+    @classmethod
+    def delete_points(cls, collection_name, point_ids, batch_size=1000):
+        """
+        Deletes points by ID from the specified collection.
+        """
+        client = cls._client
+        if client is None:
+            client = cls.initialize_client()
+        point_ids = list(point_ids)
+        for i in range(0, len(point_ids), batch_size):
+            client.delete(
+                collection_name=collection_name,
+                points_selector=PointIdsList(points=point_ids[i:i + batch_size])
+            )
+        if point_ids:
+            print(f"Deleted {len(point_ids)} points from collection '{collection_name}'.")
+
+    @classmethod
+    def set_payloads(cls, collection_name, payloads, batch_size=1000):
+        """
+        Overwrites the given top-level payload keys of existing points without touching their vectors.
+        Args:
+            collection_name (str): Name of the collection.
+            payloads (dict): Mapping of point ID -> payload keys to set.
         """
         client = cls._client
         if client is None:
             client = cls.initialize_client()
-        try:
-            client.upsert(
+        items = list(payloads.items())
+        for i in range(0, len(items), batch_size):
+            client.batch_update_points(
                 collection_name=collection_name,
-                points=data
+                update_operations=[
+                    SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[point_id]))
+                    for point_id, payload in items[i:i + batch_size]
+                ]
             )
-            print(f"Uploaded {len(data)} points to collection '{collection_name}'.")
-        except Exception as e:
-            print(f"Error uploading data: {e}")
+        if items:
+            print(f"Updated payload of {len(items)} points in collection '{collection_name}'.")
 
     @classmethod
-    def search(cls, collection_name, query_vector, limit=10):
+    def search(cls, collection_name, query_vector, limit=10, query_filter=None):
         """
         Searches for the nearest neighbors of a query vector in the specified collection.
         Args:
             collection_name (str): Name of the collection.
             query_vector (list): The vector to search for.
             limit (int): Number of nearest neighbors to return.
+            query_filter (dict): Optional payload filter, e.g. {"meta.source": "pdf_text"} (see Loader.filters).
         Returns:
             List of points that are the nearest neighbors.
         """
@@ -63,6 +260,117 @@ class QdrantClientManager:
         results = client.search(
             collection_name=collection_name,
             query_vector=query_vector,
+            query_filter=to_qdrant_filter(query_filter),
+            limit=limit
+        )
+        return results
+
+    @classmethod
+    async def asearch(cls, collection_name, query_vector, limit=10, query_filter=None):
+        """
+        Async counterpart of `search`, using AsyncQdrantClient.
+        """
+        client = cls._async_client
+        if client is None:
+            client = cls.initialize_async_client()
+        return await client.search(
+            collection_name=collection_name,
+            query_vector=query_vector,
+            query_filter=to_qdrant_filter(query_filter),
             limit=limit
         )
-        return results
\ No newline at end of file
+
+    @classmethod
+    def search_batch(cls, collection_name, query_vectors, limit=10, filters=None, batch_size=256, max_workers=4):
+        """
+        Searches many query vectors with batched requests instead of one round trip per query.
+        Args:
+            collection_name (str): Name of the collection.
+            query_vectors (list): The vectors to search for.
+            limit (int or list): Number of neighbors, for all queries or per query.
+            filters (list): Optional payload filter per query (None entries mean unfiltered).
+            batch_size (int): Queries sent per search_batch request.
+            max_workers (int): Batch requests in flight at once.
+        Returns:
+            List with one list of points per query, aligned with `query_vectors`.
+        """
+        client = cls._client
+        if client is None:
+            client = cls.initialize_client()
+        query_vectors = list(query_vectors)
+        limits = limit if isinstance(limit, (list, tuple)) else [limit] * len(query_vectors)
+        filters = filters if filters is not None else [None] * len(query_vectors)
+        if not (len(limits) == len(filters) == len(query_vectors)):
+            raise ValueError("limit and filters lists must have one entry per query vector.")
+
+        requests = [
+            SearchRequest(vector=list(vector), limit=query_limit, filter=to_qdrant_filter(query_filter),
+                          with_payload=True)
+            for vector, query_limit, query_filter in zip(query_vectors, limits, filters)
+        ]
+        batches = [requests[i:i + batch_size] for i in range(0, len(requests), batch_size)]
+        if not batches:
+            return []
+
+        def run(batch):
+            return client.search_batch(collection_name=collection_name, requests=batch)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            # map keeps batch order, so results stay aligned with the inputs
+            results = [hits for batch_results in executor.map(run, batches) for hits in batch_results]
+        elapsed = time.perf_counter() - start
+        print(f"Searched {len(requests)} queries in {len(batches)} batches "
+              f"({elapsed:.2f}s, {len(requests) / elapsed if elapsed > 0 else float('inf'):.1f} queries/s)")
+        return results
+
+    @classmethod
+    def retrieve(cls, collection_name, point_ids):
+        """
+        Fetches payloads of points by ID.
+        Returns:
+            dict: point ID -> payload.
+        """
+        client = cls._client
+        if client is None:
+            client = cls.initialize_client()
+        records = client.retrieve(collection_name=collection_name, ids=list(point_ids), with_payload=True)
+        return {record.id: record.payload for record in records}
+
+    @classmethod
+    async def aretrieve(cls, collection_name, point_ids):
+        """
+        Async counterpart of `retrieve`.
+        """
+        client = cls._async_client
+        if client is None:
+            client = cls.initialize_async_client()
+        records = await client.retrieve(collection_name=collection_name, ids=list(point_ids), with_payload=True)
+        return {record.id: record.payload for record in records}
+
+    @classmethod
+    def hybrid_search(cls, collection_name, query_vector, query_text, lexical_index, limit=10, candidates=50, rrf_k=60):
+        """
+        Combines vector search with BM25 search over `lexical_index` using reciprocal rank fusion,
+        so exact identifiers (names, API names) are found even when dense similarity misses them.
+        Args:
+            collection_name (str): Name of the collection.
+            query_vector (list): The embedded query.
+            query_text (str): The raw query, for the lexical side.
+            lexical_index (LexicalIndex): BM25 index built during ingestion.
+            limit (int): Number of fused results to return.
+            candidates (int): Results taken from each retriever before fusion.
+        Returns:
+            List of points with id, fused score and payload.
+        """
+        return hybrid_search(cls, collection_name, query_vector, query_text, lexical_index,
+                             limit=limit, candidates=candidates, rrf_k=rrf_k)
+
+    @classmethod
+    async def ahybrid_search(cls, collection_name, query_vector, query_text, lexical_index, limit=10, candidates=50,
+                             rrf_k=60):
+        """
+        Async counterpart of `hybrid_search`; the vector and BM25 searches run concurrently.
+        """
+        return await ahybrid_search(cls, collection_name, query_vector, query_text, lexical_index,
+                                    limit=limit, candidates=candidates, rrf_k=rrf_k)
@@ -0,0 +1,109 @@
+"""
+Recall@k and QPS of the IVF index against brute-force search on synthetic clustered vectors.
+With --compare-quantization, also times flat int8 and binary search against flat float32 search.
+
+Run from the Manual_RAG directory:
+    python -m LocalIndex.benchmark --points 200000 --dim 256 --nlist 512 --nprobe 4 8 16 32
+    python -m LocalIndex.benchmark --points 60000 --dim 1536 --compare-quantization
+"""
+import os
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from LocalIndex.main import LocalCollection, LocalIndexManager
+
+
+def make_vectors(n, dim, clusters, rng):
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    return centers[labels] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+
+
+def best_time(collection, queries, k, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows, _ = collection.top_k(queries, k)
+        times.append(time.perf_counter() - start)
+    return min(times), rows
+
+
+def compare_quantization(vectors, queries, k, path):
+    """
+    Flat search over float32, int8 and binary codes; quantized modes should not be slower than float32.
+    """
+    exact_rows = None
+    for quantization in (None, "int8", "binary"):
+        directory = os.path.join(path, f"flat-{quantization}")
+        os.makedirs(directory)
+        collection = LocalCollection(directory, vectors.shape[1], quantization=quantization)
+        collection.upsert([{"id": i, "vector": vector} for i, vector in enumerate(vectors)])
+        elapsed, rows = best_time(collection, queries, k)
+        if exact_rows is None:
+            exact_rows, baseline = rows, elapsed
+        hits = sum(len(set(a) & set(e)) for a, e in zip(rows.tolist(), exact_rows.tolist()))
+        print(f"flat {quantization or 'float32':<9} recall@{k}={hits / exact_rows.size:.3f}  "
+              f"{elapsed:.3f}s ({elapsed / baseline:.2f}x float32)")
+        collection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--quantization", choices=["int8", "binary"], default=None)
+    parser.add_argument("--compare-quantization", action="store_true",
+                        help="Also time flat int8/binary search against flat float32 search")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    clusters = max(args.nlist // 2, 1)
+    vectors = make_vectors(args.points, args.dim, clusters, rng)
+    queries = LocalCollection.normalize(make_vectors(args.queries, args.dim, clusters, rng))
+
+    with tempfile.TemporaryDirectory() as path:
+        LocalIndexManager.initialize_client(path)
+        LocalIndexManager.create_collection("bench", vector_size=args.dim, index="ivf", nlist=args.nlist,
+                                            quantization=args.quantization)
+        start = time.perf_counter()
+        batch = 10000
+        for i in range(0, args.points, batch):
+            LocalIndexManager.upload_data("bench", [
+                {"id": j, "vector": vectors[j]} for j in range(i, min(i + batch, args.points))
+            ])
+        print(f"Built index over {args.points} x {args.dim} vectors in {time.perf_counter() - start:.1f}s")
+
+        collection = LocalIndexManager._get("bench")
+        start = time.perf_counter()
+        exact_rows, _ = collection.top_k(queries, args.k, exact=True)
+        brute = time.perf_counter() - start
+        print(f"{'brute force':<14} recall@{args.k}=1.000  {args.queries / brute:10.1f} QPS (batched)")
+
+        start = time.perf_counter()
+        for query in queries:
+            collection.top_k(query[None, :], args.k, exact=True)
+        single = time.perf_counter() - start
+        print(f"{'brute force':<14} recall@{args.k}=1.000  {args.queries / single:10.1f} QPS (one at a time)")
+
+        for nprobe in args.nprobe:
+            start = time.perf_counter()
+            rows, _ = collection.top_k(queries, args.k, nprobe=nprobe)
+            elapsed = time.perf_counter() - start
+            hits = sum(len(set(a) & set(e)) for a, e in zip(rows.tolist(), exact_rows.tolist()))
+            print(f"ivf nprobe={nprobe:<4} recall@{args.k}={hits / exact_rows.size:.3f}  "
+                  f"{args.queries / elapsed:10.1f} QPS ({elapsed / args.queries * 1000:.2f} ms/query)")
+        collection.close()
+
+        if args.compare_quantization:
+            compare_quantization(vectors, queries, args.k, path)
+
+
+if __name__ == "__main__":
+    main()
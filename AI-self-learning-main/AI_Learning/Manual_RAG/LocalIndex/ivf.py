@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+
+
+class IVFIndex:
+    """
+    Inverted-file index over a LocalCollection: vectors are clustered with
+    spherical k-means into `nlist` lists, and a query only scores the rows in
+    its `nprobe` closest lists. Points added after training are assigned to
+    their nearest centroid, so the index grows incrementally with uploads.
+    Centroids are saved as ivf_centroids.npy (their count is the effective
+    nlist); row -> list assignments live in the collection's ivf_assign.i32 array.
+    """
+    def __init__(self, path, nlist=256, nprobe=8, train_size=None, kmeans_iterations=20, seed=0):
+        """
+        Args:
+            path (str): Collection directory the centroids are saved in.
+            nlist (int): Number of clusters (inverted lists).
+            nprobe (int): Lists scanned per query; higher means better recall, slower search.
+            train_size (int): Points needed before k-means is trained; until then search is exact.
+            kmeans_iterations (int): Lloyd iterations used for training.
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or nlist * 40
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self._centroids_path = os.path.join(path, "ivf_centroids.npy")
+        self.centroids = np.load(self._centroids_path) if os.path.exists(self._centroids_path) else None
+        if self.centroids is not None:
+            # Training may have used fewer lists than requested (small collections)
+            self.nlist = len(self.centroids)
+        self._lists = [set() for _ in range(self.nlist)]
+        self._arrays = {}
+
+    @property
+    def trained(self):
+        return self.centroids is not None
+
+    def load_assignments(self, assign, count):
+        """
+        Rebuilds the in-memory inverted lists from the saved row -> list array.
+        """
+        self._lists = [set() for _ in range(self.nlist)]
+        self._arrays = {}
+        if not self.trained:
+            return
+        assigned = assign[:count]
+        rows = np.flatnonzero(assigned >= 0)
+        order = np.argsort(assigned[rows], kind="stable")
+        rows = rows[order]
+        lists = assigned[rows]
+        bounds = np.searchsorted(lists, np.arange(self.nlist + 1))
+        for list_id in range(self.nlist):
+            self._lists[list_id] = set(rows[bounds[list_id]:bounds[list_id + 1]].tolist())
+
+    def _nearest(self, vectors, block_rows=65536):
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), block_rows):
+            block = np.asarray(vectors[start:start + block_rows], dtype=np.float32)
+            out[start:start + block_rows] = np.argmax(block @ self.centroids.T, axis=1)
+        return out
+
+    def train(self, matrix, live, count, assign, block_rows=65536):
+        """
+        Runs spherical k-means on (a sample of) the live vectors and assigns every row.
+        """
+        rows = np.flatnonzero(live[:count])
+        rng = np.random.default_rng(self.seed)
+        sample_rows = np.sort(rng.choice(rows, size=min(len(rows), self.nlist * 256), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        nlist = min(self.nlist, len(sample))
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            # Re-seed empty clusters with random samples
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = sums / norms
+        if nlist < self.nlist:
+            self.nlist = nlist
+        self.centroids = centroids.astype(np.float32)
+        np.save(self._centroids_path, self.centroids)
+
+        assign[:count] = -1
+        # Assign in blocks so only one block of the memory-mapped matrix is copied at a time
+        for start in range(0, len(rows), block_rows):
+            block = rows[start:start + block_rows]
+            assign[block] = self._nearest(matrix[block], block_rows)
+        self.load_assignments(assign, count)
+        print(f"Trained IVF index with {self.nlist} lists on {len(sample)} vectors")
+
+    def add(self, rows, vectors, assign):
+        """
+        Assigns newly upserted rows to their nearest list (re-upserted rows may move lists).
+        """
+        if not self.trained:
+            return
+        rows = np.asarray(rows)
+        old = assign[rows]
+        new = self._nearest(vectors)
+        assign[rows] = new
+        for row, old_list, new_list in zip(rows.tolist(), old.tolist(), new.tolist()):
+            if old_list == new_list:
+                continue
+            if old_list >= 0:
+                self._lists[old_list].discard(row)
+                self._arrays.pop(old_list, None)
+            self._lists[new_list].add(row)
+            self._arrays.pop(new_list, None)
+
+    def _list_array(self, list_id):
+        array = self._arrays.get(list_id)
+        if array is None:
+            # Sorted rows read the memory-mapped matrix in file order
+            array = np.fromiter(sorted(self._lists[list_id]), dtype=np.int64, count=len(self._lists[list_id]))
+            self._arrays[list_id] = array
+        return array
+
+    def candidates(self, query, nprobe=None):
+        """
+        Rows stored in the `nprobe` lists whose centroids are closest to `query`.
+        """
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        scores = self.centroids @ query
+        probes = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        parts = [self._list_array(list_id) for list_id in probes]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
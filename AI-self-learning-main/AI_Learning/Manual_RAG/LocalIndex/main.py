@@ -0,0 +1,646 @@
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from LexicalIndex.main import ahybrid_search, hybrid_search
+from LocalIndex.ivf import IVFIndex
+from Loader.filters import PAYLOAD_INDEXES, field_value, parse_condition
+
+# Same fields the code reads from Qdrant's ScoredPoint
+ScoredPoint = namedtuple("ScoredPoint", ["id", "score", "payload"])
+
+
+# Number of set bits in every byte value, for Hamming similarity on packed codes (numpy < 2.0)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+_bitwise_count = getattr(np, "bitwise_count", None)
+
+# int8 codes are widened to float32 this many rows at a time, so the scratch stays in cache
+_INT8_TILE_ROWS = 256
+# 1 bit per dimension ranks candidates coarsely; binary search rescores this many times more
+_BINARY_OVERSAMPLE = 8
+# Queries compared against a block of binary codes at once (bounds the temporary to tile x rows)
+_BINARY_QUERY_TILE = 16
+
+QUANTIZATION_MODES = (None, "int8", "binary")
+INDEX_TYPES = ("flat", "ivf")
+
+_RANGE_OPS = {"gt": np.greater, "gte": np.greater_equal, "lt": np.less, "lte": np.less_equal}
+
+
+class LocalCollection:
+    """
+    One collection stored on disk as a memory-mapped float32 matrix of
+    L2-normalised vectors (vectors.f32) plus a SQLite table mapping rows to
+    point IDs and payloads. Cosine similarity is a plain dot product.
+
+    With `quantization` set, compact codes are stored next to the vectors
+    (int8: 1 byte per dimension plus a per-vector scale; binary: 1 bit per
+    dimension). Search first ranks candidates on the codes, which are small
+    enough to stay in the page cache, then rescores only the best
+    `limit * rescore_multiplier` candidates against the full-precision rows
+    (`_BINARY_OVERSAMPLE` times more for binary codes).
+
+    With `index="ivf"` only the rows in the closest inverted lists are scored
+    (see IVFIndex); otherwise every row is scanned.
+
+    Payload fields listed in `payload_indexes` are kept as in-memory columns
+    (keyword codes or numbers per row). A filtered search evaluates the filter
+    on those columns first and scores only the matching rows.
+    """
+    def __init__(self, path, vector_size, quantization=None, rescore_multiplier=4, index="flat",
+                 nlist=256, nprobe=8, train_size=None, payload_indexes=None):
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}.")
+        if index not in INDEX_TYPES:
+            raise ValueError(f"Unknown index '{index}', expected one of {INDEX_TYPES}.")
+        self.path = path
+        self.vector_size = vector_size
+        self.quantization = quantization
+        self.rescore_multiplier = rescore_multiplier
+        self._lock = threading.RLock()
+        # file name -> (dtype, row width or None for one value per row, fill value for new rows)
+        self._arrays = {"vectors.f32": (np.float32, vector_size, 0)}
+        if quantization == "int8":
+            self._arrays["codes.i8"] = (np.int8, vector_size, 0)
+            self._arrays["scales.f32"] = (np.float32, None, 0)
+        elif quantization == "binary":
+            self._arrays["codes.bin"] = (np.uint8, (vector_size + 7) // 8, 0)
+        self._ivf = None
+        if index == "ivf":
+            self._arrays["ivf_assign.i32"] = (np.int32, None, -1)
+            self._ivf = IVFIndex(path, nlist=nlist, nprobe=nprobe, train_size=train_size)
+        self.payload_indexes = PAYLOAD_INDEXES if payload_indexes is None else payload_indexes
+        # field -> per-row keyword code (-1 if missing) or number (NaN if missing)
+        self._fields = {
+            field: np.empty(0, dtype=np.int32 if index_type == "keyword" else np.float64)
+            for field, index_type in self.payload_indexes.items()
+        }
+        self._keywords = {field: {} for field, index_type in self.payload_indexes.items() if index_type == "keyword"}
+        self._maps = {}
+        self._conn = sqlite3.connect(os.path.join(path, "points.sqlite"), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS points ("
+            " row INTEGER PRIMARY KEY,"
+            " id TEXT UNIQUE NOT NULL,"
+            " payload TEXT,"
+            " deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.commit()
+
+        self.count = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM points").fetchone()[0]
+        self._row_of = {}
+        self._live = np.zeros(self.count, dtype=bool)
+        for row, point_id, deleted in self._conn.execute("SELECT row, id, deleted FROM points"):
+            self._row_of[point_id] = row
+            self._live[row] = not deleted
+        self._map(max(self.count, 1024))
+        for row, payload in self._conn.execute("SELECT row, payload FROM points WHERE deleted = 0"):
+            self._index_payload(row, json.loads(payload))
+        if self._ivf is not None:
+            self._ivf.load_assignments(self._maps["ivf_assign.i32"], self.count)
+
+    def _map(self, capacity):
+        for name, (dtype, width, fill) in self._arrays.items():
+            file_path = os.path.join(self.path, name)
+            shape = (capacity, width) if width else (capacity,)
+            row_bytes = (width or 1) * np.dtype(dtype).itemsize
+            if not os.path.exists(file_path):
+                open(file_path, "wb").close()
+            old_rows = os.path.getsize(file_path) // row_bytes
+            if old_rows < capacity:
+                with open(file_path, "r+b") as f:
+                    f.truncate(capacity * row_bytes)
+            self._maps[name] = np.memmap(file_path, dtype=dtype, mode="r+", shape=shape)
+            if fill and old_rows < capacity:
+                self._maps[name][old_rows:] = fill
+        self.capacity = capacity
+        self._matrix = self._maps["vectors.f32"]
+        if len(self._live) < capacity:
+            self._live = np.concatenate([self._live, np.zeros(capacity - len(self._live), dtype=bool)])
+        for field, column in self._fields.items():
+            if len(column) < capacity:
+                missing = -1 if column.dtype == np.int32 else np.nan
+                self._fields[field] = np.concatenate([column, np.full(capacity - len(column), missing, column.dtype)])
+
+    def _index_payload(self, row, payload):
+        for field, index_type in self.payload_indexes.items():
+            value = field_value(payload or {}, field)
+            if index_type == "keyword":
+                codes = self._keywords[field]
+                self._fields[field][row] = codes.setdefault(value, len(codes)) if isinstance(value, str) else -1
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                self._fields[field][row] = value
+            else:
+                self._fields[field][row] = np.nan
+
+    def filter_rows(self, query_filter):
+        """
+        Live rows whose indexed payload fields satisfy `query_filter` (see Loader.filters).
+        """
+        mask = self._live[:self.count].copy()
+        for field, condition in query_filter.items():
+            index_type = self.payload_indexes.get(field)
+            if index_type is None:
+                raise ValueError(f"No payload index on '{field}'; indexed fields are {sorted(self.payload_indexes)}.")
+            kind, value = parse_condition(field, condition)
+            column = self._fields[field][:self.count]
+            if kind == "range":
+                if index_type == "keyword":
+                    raise ValueError(f"Range filter on keyword field '{field}'.")
+                for operator, bound in value.items():
+                    mask &= _RANGE_OPS[operator](column, bound)
+                continue
+            if index_type == "range":
+                # Like Qdrant, which keeps no lookup table for integer indexes created with lookup=False
+                raise ValueError(f"Match filter on range-only field '{field}'; use gt/gte/lt/lte.")
+            values = value if kind == "any" else [value]
+            if index_type == "keyword":
+                codes = self._keywords[field]
+                values = [codes[v] for v in values if v in codes]
+            mask &= np.isin(column, values)
+        return np.flatnonzero(mask)
+
+    def _flush(self):
+        for array in self._maps.values():
+            array.flush()
+
+    def _encode(self, rows, vectors):
+        if self.quantization == "int8":
+            scales = np.abs(vectors).max(axis=1)
+            scales[scales == 0] = 1.0
+            self._maps["codes.i8"][rows] = np.round(vectors / scales[:, None] * 127).astype(np.int8)
+            self._maps["scales.f32"][rows] = scales / 127
+        elif self.quantization == "binary":
+            self._maps["codes.bin"][rows] = np.packbits(vectors > 0, axis=1)
+
+    def memory_report(self):
+        """
+        Bytes needed to scan the collection with and without quantized codes.
+        """
+        full = self.count * self.vector_size * 4
+        quantized = sum(
+            self._maps[name][:self.count].nbytes for name in self._arrays if name.startswith(("codes", "scales"))
+        ) or full
+        return {"full_precision_bytes": full, "search_bytes": quantized,
+                "saved_bytes": full - quantized, "compression": full / quantized if quantized else 1.0}
+
+    @staticmethod
+    def _key(point_id):
+        # Keep int and str IDs apart (1 and "1" are different points)
+        return json.dumps(point_id)
+
+    @staticmethod
+    def normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def upsert(self, points):
+        with self._lock:
+            vectors = self.normalize([p["vector"] for p in points])
+            rows = []
+            new_rows = []
+            for point in points:
+                key = self._key(point["id"])
+                row = self._row_of.get(key)
+                if row is None:
+                    row = self.count
+                    self.count += 1
+                    self._row_of[key] = row
+                    new_rows.append(row)
+                rows.append(row)
+            if self.count > self.capacity:
+                self._flush()
+                self._map(max(self.capacity * 2, self.count))
+            self._matrix[rows] = vectors
+            self._encode(rows, vectors)
+            self._live[rows] = True
+            for row, point in zip(rows, points):
+                self._index_payload(row, point.get("payload"))
+            if self._ivf is not None:
+                assign = self._maps["ivf_assign.i32"]
+                if self._ivf.trained:
+                    self._ivf.add(rows, vectors, assign)
+                elif int(self._live[:self.count].sum()) >= self._ivf.train_size:
+                    self._ivf.train(self._matrix, self._live, self.count, assign)
+            self._flush()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO points (row, id, payload, deleted) VALUES (?, ?, ?, 0)",
+                [(row, self._key(p["id"]), json.dumps(p.get("payload"))) for row, p in zip(rows, points)]
+            )
+            self._conn.commit()
+            return len(new_rows)
+
+    def delete(self, point_ids):
+        with self._lock:
+            rows = [self._row_of[self._key(i)] for i in point_ids if self._key(i) in self._row_of]
+            self._live[rows] = False
+            self._conn.executemany("UPDATE points SET deleted = 1 WHERE row = ?", [(r,) for r in rows])
+            self._conn.commit()
+
+    def set_payloads(self, payloads):
+        with self._lock:
+            for point_id, fields in payloads.items():
+                found = self._conn.execute(
+                    "SELECT row, payload FROM points WHERE id = ?", (self._key(point_id),)
+                ).fetchone()
+                if found is None:
+                    continue
+                row, payload = found
+                payload = json.loads(payload) or {}
+                payload.update(fields)
+                self._index_payload(row, payload)
+                self._conn.execute("UPDATE points SET payload = ? WHERE id = ?",
+                                   (json.dumps(payload), self._key(point_id)))
+            self._conn.commit()
+
+    def payloads_by_id(self, point_ids):
+        keys = [self._key(i) for i in point_ids]
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        found = self._conn.execute(
+            f"SELECT id, payload FROM points WHERE deleted = 0 AND id IN ({placeholders})", keys
+        ).fetchall()
+        return {json.loads(point_id): json.loads(payload) for point_id, payload in found}
+
+    def payloads(self, rows):
+        rows = [int(r) for r in rows]
+        if not rows:
+            return {}
+        placeholders = ",".join("?" * len(rows))
+        found = self._conn.execute(
+            f"SELECT row, id, payload FROM points WHERE row IN ({placeholders})", rows
+        ).fetchall()
+        return {row: (json.loads(point_id), json.loads(payload)) for row, point_id, payload in found}
+
+    def _block_scores(self, queries, rows, exact):
+        # `rows` is a slice for full scans or an array of row numbers for IVF candidates
+        if exact or self.quantization is None:
+            return queries @ self._matrix[rows].T
+        if self.quantization == "int8":
+            return self._int8_scores(queries, rows)
+        return self._binary_scores(queries, rows)
+
+    def _int8_scores(self, queries, rows):
+        # Widening a whole block to float32 would cost more than the exact matmul it replaces;
+        # a small reused tile keeps the conversion in cache
+        codes = self._maps["codes.i8"][rows]
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        scratch = np.empty((min(_INT8_TILE_ROWS, len(codes)), self.vector_size), dtype=np.float32)
+        for start in range(0, len(codes), _INT8_TILE_ROWS):
+            tile = scratch[:min(_INT8_TILE_ROWS, len(codes) - start)]
+            np.copyto(tile, codes[start:start + len(tile)], casting="unsafe")
+            scores[:, start:start + len(tile)] = queries @ tile.T
+        scores *= self._maps["scales.f32"][rows]
+        return scores
+
+    def _binary_scores(self, queries, rows):
+        # Number of matching sign bits, for a small tile of queries at a time
+        codes = np.ascontiguousarray(self._maps["codes.bin"][rows])
+        query_bits = np.packbits(queries > 0, axis=1)
+        if _bitwise_count is None:
+            popcount = _POPCOUNT.__getitem__
+        else:
+            popcount = _bitwise_count
+            if codes.shape[1] % 8 == 0:
+                codes = codes.view(np.uint64)
+                query_bits = query_bits.view(np.uint64)
+        # Word-major layout, so every step below is one long vector operation
+        words = np.ascontiguousarray(codes.T)
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(queries), _BINARY_QUERY_TILE):
+            tile = query_bits[start:start + _BINARY_QUERY_TILE]
+            mismatches = np.zeros((len(tile), len(codes)), dtype=np.uint16)
+            for word, query_words in zip(words, tile.T):
+                mismatches += popcount(word[None, :] ^ query_words[:, None])
+            scores[start:start + len(tile)] = self.vector_size - mismatches
+        return scores
+
+    def _candidate_count(self, limit):
+        multiplier = self.rescore_multiplier * (_BINARY_OVERSAMPLE if self.quantization == "binary" else 1)
+        return limit * multiplier
+
+    def _scan(self, queries, limit, exact, block_rows, rows=None):
+        # Scans every row, or only the live `rows` selected by a filter
+        m = len(queries)
+        best_rows = np.empty((m, 0), dtype=np.int64)
+        best_scores = np.empty((m, 0), dtype=np.float32)
+        total = self.count if rows is None else len(rows)
+        for start in range(0, total, block_rows):
+            end = min(start + block_rows, total)
+            if rows is None:
+                scores = self._block_scores(queries, slice(start, end), exact)
+                scores[:, ~self._live[start:end]] = -np.inf
+            else:
+                scores = self._block_scores(queries, rows[start:end], exact)
+            k = min(limit, end - start)
+            idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            block_ids = idx + start if rows is None else rows[start:end][idx]
+            best_rows = np.concatenate([best_rows, block_ids], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, idx, axis=1)], axis=1)
+            if best_rows.shape[1] > limit:
+                keep = np.argpartition(-best_scores, limit - 1, axis=1)[:, :limit]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        return best_rows, best_scores
+
+    def _rescore(self, queries, rows, scores):
+        # Exact cosine for the quantized candidates, read from the full-precision rows
+        valid = np.isfinite(scores)
+        vectors = self._matrix[rows.ravel()].reshape(rows.shape + (self.vector_size,))
+        exact = np.einsum("md,mcd->mc", queries, vectors)
+        exact[~valid] = -np.inf
+        return exact
+
+    def _probe(self, queries, limit, nprobe):
+        # IVF search: score only the candidate rows of each query's closest lists
+        m = len(queries)
+        best_rows = np.full((m, limit), -1, dtype=np.int64)
+        best_scores = np.full((m, limit), -np.inf, dtype=np.float32)
+        for i, query in enumerate(queries):
+            rows = self._ivf.candidates(query, nprobe)
+            rows = rows[self._live[rows]]
+            if len(rows) == 0:
+                continue
+            scores = self._block_scores(query[None, :], rows, False)[0]
+            if self.quantization is not None:
+                k = min(self._candidate_count(limit), len(rows))
+                keep = np.argpartition(-scores, k - 1)[:k]
+                rows = rows[keep]
+                scores = self._matrix[rows] @ query
+            k = min(limit, len(rows))
+            keep = np.argpartition(-scores, k - 1)[:k]
+            best_rows[i, :k] = rows[keep]
+            best_scores[i, :k] = scores[keep]
+        return best_rows, best_scores
+
+    def top_k(self, queries, limit, exact=False, nprobe=None, block_rows=65536, candidates=None):
+        """
+        Cosine top-k for a (m, d) batch of normalised queries.
+        Scores rows in blocks so memory stays bounded for large collections.
+        Args:
+            exact (bool): Scan every full-precision vector, skipping the IVF lists and quantized codes.
+            nprobe (int): IVF lists scanned per query; defaults to the collection's setting.
+            candidates (np.ndarray): Only score these live rows (from `filter_rows`); IVF probing
+                is skipped so a selective filter cannot lose matches outside the probed lists.
+        Returns:
+            (rows, scores): two (m, k) arrays sorted by descending score.
+        """
+        if candidates is not None and len(candidates) == 0:
+            return (np.empty((len(queries), 0), dtype=np.int64),
+                    np.empty((len(queries), 0), dtype=np.float32))
+        if candidates is None and not exact and self._ivf is not None and self._ivf.trained:
+            rows, scores = self._probe(queries, limit, nprobe)
+        elif exact or self.quantization is None:
+            rows, scores = self._scan(queries, limit, True, block_rows, candidates)
+        else:
+            rows, scores = self._scan(queries, self._candidate_count(limit), False, block_rows, candidates)
+            scores = self._rescore(queries, rows, scores)
+            if rows.shape[1] > limit:
+                keep = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+                rows = np.take_along_axis(rows, keep, axis=1)
+                scores = np.take_along_axis(scores, keep, axis=1)
+        order = np.argsort(-scores, axis=1)
+        return np.take_along_axis(rows, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+
+class LocalIndexManager:
+    """
+    In-process vector store with the same surface as QdrantClientManager
+    (create_collection / upload_data / search), for small deployments, CI and
+    benchmarks. Needs no external service: collections live under `path`.
+    """
+    _path = None
+    _collections = {}
+
+    @classmethod
+    def initialize_client(cls, path=".local_index"):
+        if cls._path is None:
+            cls._path = path
+            os.makedirs(path, exist_ok=True)
+        return cls
+
+    @classmethod
+    def _collection_dir(cls, collection_name):
+        if cls._path is None:
+            cls.initialize_client()
+        return os.path.join(cls._path, collection_name)
+
+    @classmethod
+    def _get(cls, collection_name):
+        collection = cls._collections.get(collection_name)
+        if collection is None:
+            config_path = os.path.join(cls._collection_dir(collection_name), "config.json")
+            if not os.path.exists(config_path):
+                raise ValueError(f"Collection {collection_name} does not exist.")
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            options = {k: v for k, v in config.items() if k not in ("vector_size", "distance")}
+            collection = LocalCollection(cls._collection_dir(collection_name), config["vector_size"], **options)
+            cls._collections[collection_name] = collection
+        return collection
+
+    @classmethod
+    def collection_exists(cls, collection_name):
+        return os.path.exists(os.path.join(cls._collection_dir(collection_name), "config.json"))
+
+    @classmethod
+    def create_collection(cls, collection_name, vector_size=1536, quantization=None, rescore_multiplier=4,
+                          index="flat", nlist=256, nprobe=8, train_size=None, payload_indexes=None):
+        """
+        Args:
+            quantization (str): None, "int8" or "binary"; quantized codes are searched first
+                and the best candidates rescored against full-precision vectors.
+            rescore_multiplier (int): Candidates rescored per requested result.
+            index (str): "flat" for exact scans, "ivf" for an approximate inverted-file index.
+            nlist (int): IVF lists (clusters).
+            nprobe (int): IVF lists scanned per query by default; trades recall for latency.
+            train_size (int): Points uploaded before the IVF index is trained (default nlist * 40).
+            payload_indexes (dict): Field -> "keyword", "integer" or "range" usable in search filters
+                (default Loader.filters.PAYLOAD_INDEXES).
+        """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}.")
+        if index not in INDEX_TYPES:
+            raise ValueError(f"Unknown index '{index}', expected one of {INDEX_TYPES}.")
+        if cls.collection_exists(collection_name):
+            print(f"Collection {collection_name} already exists.")
+            return
+        print(f"Creating collection: {collection_name}")
+        path = cls._collection_dir(collection_name)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"vector_size": vector_size, "distance": "cosine",
+                       "quantization": quantization, "rescore_multiplier": rescore_multiplier,
+                       "index": index, "nlist": nlist, "nprobe": nprobe, "train_size": train_size,
+                       "payload_indexes": PAYLOAD_INDEXES if payload_indexes is None else payload_indexes}, f)
+
+    @classmethod
+    def delete_collection(cls, collection_name):
+        collection = cls._collections.pop(collection_name, None)
+        if collection is not None:
+            collection.close()
+        shutil.rmtree(cls._collection_dir(collection_name), ignore_errors=True)
+
+    @classmethod
+    def upload_data(cls, collection_name, data, batch_size=4096, **kwargs):
+        """
+        Uploads data (list of dicts) to the specified local collection.
+        Args:
+            collection_name (str): Name of the collection.
+            data (iterable): Points, each a dict with 'id', 'vector', and optionally 'payload'.
+            batch_size (int): Number of points written per batch.
+        Returns:
+            int: Number of points uploaded.
+        """
+        return cls.upload_stream(collection_name, data, batch_size=batch_size)
+
+    @classmethod
+    def upload_stream(cls, collection_name, points, batch_size=4096, **kwargs):
+        # Extra Qdrant options (max_workers, wait, retries) don't apply to a local store
+        collection = cls._get(collection_name)
+        total = 0
+        batch = []
+        for point in points:
+            batch.append(point)
+            if len(batch) >= batch_size:
+                collection.upsert(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            collection.upsert(batch)
+            total += len(batch)
+        print(f"Uploaded {total} points to collection '{collection_name}'.")
+        return total
+
+    @classmethod
+    def delete_points(cls, collection_name, point_ids, **kwargs):
+        point_ids = list(point_ids)
+        cls._get(collection_name).delete(point_ids)
+        if point_ids:
+            print(f"Deleted {len(point_ids)} points from collection '{collection_name}'.")
+
+    @classmethod
+    def set_payloads(cls, collection_name, payloads, **kwargs):
+        cls._get(collection_name).set_payloads(payloads)
+
+    @classmethod
+    def search_batch(cls, collection_name, query_vectors, limit=10, filters=None, exact=False, nprobe=None):
+        """
+        Searches many query vectors in one vectorised pass.
+        `limit` is an int for all queries or a list with one limit per query;
+        `filters` is an optional list with one payload filter (or None) per query.
+        `exact=True` bypasses the IVF index and quantized codes and scans full-precision vectors;
+        `nprobe` overrides the number of IVF lists scanned.
+        Returns:
+            List with one list of ScoredPoint per query, in input order.
+        """
+        collection = cls._get(collection_name)
+        if collection.count == 0 or len(query_vectors) == 0:
+            return [[] for _ in query_vectors]
+        limits = limit if isinstance(limit, (list, tuple)) else [limit] * len(query_vectors)
+        filters = filters if filters is not None else [None] * len(query_vectors)
+        if not (len(limits) == len(filters) == len(query_vectors)):
+            raise ValueError("limit and filters lists must have one entry per query vector.")
+        queries = LocalCollection.normalize(np.atleast_2d(query_vectors))
+
+        # Queries sharing a filter are scored together, against the rows that pass it
+        groups = {}
+        for i, query_filter in enumerate(filters):
+            groups.setdefault(json.dumps(query_filter, sort_keys=True), []).append(i)
+        per_query = [None] * len(query_vectors)
+        for key, members in groups.items():
+            query_filter = json.loads(key)
+            candidates = collection.filter_rows(query_filter) if query_filter else None
+            rows, scores = collection.top_k(queries[members], max(limits[i] for i in members),
+                                            exact=exact, nprobe=nprobe, candidates=candidates)
+            for i, query_rows, query_scores in zip(members, rows, scores):
+                per_query[i] = (query_rows, query_scores)
+        payloads = collection.payloads(np.unique(np.concatenate([r.ravel() for r, _ in per_query])))
+        results = []
+        for (query_rows, query_scores), query_limit in zip(per_query, limits):
+            hits = []
+            for row, score in zip(query_rows[:query_limit], query_scores[:query_limit]):
+                if not np.isfinite(score):
+                    continue
+                point_id, payload = payloads[int(row)]
+                hits.append(ScoredPoint(id=point_id, score=float(score), payload=payload))
+            results.append(hits)
+        return results
+
+    @classmethod
+    def search(cls, collection_name, query_vector, limit=10, query_filter=None, exact=False, nprobe=None):
+        """
+        Searches for the nearest neighbors of a query vector in the specified collection.
+        `query_filter` is an optional payload filter, e.g. {"meta.source": "pdf_text"} (see Loader.filters).
+        Returns:
+            List of ScoredPoint (id, score, payload), best first.
+        """
+        return cls.search_batch(collection_name, [query_vector], limit=limit, filters=[query_filter],
+                                exact=exact, nprobe=nprobe)[0]
+
+    @classmethod
+    async def asearch(cls, collection_name, query_vector, limit=10, query_filter=None, exact=False, nprobe=None):
+        """
+        Async `search`; the NumPy scan runs in a worker thread so the event loop stays free.
+        """
+        return await asyncio.to_thread(cls.search, collection_name, query_vector, limit=limit,
+                                       query_filter=query_filter, exact=exact, nprobe=nprobe)
+
+    @classmethod
+    def retrieve(cls, collection_name, point_ids):
+        """
+        Returns:
+            dict: point ID -> payload.
+        """
+        return cls._get(collection_name).payloads_by_id(list(point_ids))
+
+    @classmethod
+    async def aretrieve(cls, collection_name, point_ids):
+        return await asyncio.to_thread(cls.retrieve, collection_name, point_ids)
+
+    @classmethod
+    def hybrid_search(cls, collection_name, query_vector, query_text, lexical_index, limit=10, candidates=50, rrf_k=60):
+        """
+        Vector + BM25 search fused with reciprocal rank fusion; see QdrantClientManager.hybrid_search.
+        """
+        return hybrid_search(cls, collection_name, query_vector, query_text, lexical_index,
+                             limit=limit, candidates=candidates, rrf_k=rrf_k)
+
+    @classmethod
+    async def ahybrid_search(cls, collection_name, query_vector, query_text, lexical_index, limit=10, candidates=50,
+                             rrf_k=60):
+        return await ahybrid_search(cls, collection_name, query_vector, query_text, lexical_index,
+                                    limit=limit, candidates=candidates, rrf_k=rrf_k)
+
+    @classmethod
+    def quantization_report(cls, collection_name, query_vectors, limit=10):
+        """
+        Compares quantized search with exact search for sample queries.
+        Returns:
+            dict: Memory figures from `memory_report` plus `recall_at_k` of quantized vs exact results.
+        """
+        collection = cls._get(collection_name)
+        queries = LocalCollection.normalize(np.atleast_2d(query_vectors))
+        approx_rows, _ = collection.top_k(queries, limit)
+        exact_rows, _ = collection.top_k(queries, limit, exact=True)
+        hits = sum(len(set(a) & set(e)) for a, e in zip(approx_rows.tolist(), exact_rows.tolist()))
+        report = collection.memory_report()
+        report["recall_at_k"] = hits / exact_rows.size if exact_rows.size else 1.0
+        print(f"Quantization '{collection.quantization}': {report['search_bytes']} of "
+              f"{report['full_precision_bytes']} bytes scanned ({report['compression']:.1f}x smaller), "
+              f"recall@{limit} = {report['recall_at_k']:.3f}")
+        return report
@@ -0,0 +1,245 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from Loader.main import QdrantClientManager
+from Pipeline.manifest import ChunkManifest, chunk_hash, chunk_id
+
+_DONE = object()
+
+
+class IngestionPipeline:
+    """
+    Streams documents through load -> split -> embed -> upload.
+    Each stage runs in its own thread and hands items to the next one through a
+    bounded queue, so a slow stage blocks the ones before it (backpressure) and
+    memory use stays flat no matter how large the corpus is.
+
+    Point IDs are derived from the chunk content, and a per-source manifest of
+    chunk hashes is kept next to the collection. A re-run embeds and uploads only
+    new or changed chunks, and deletes the points of chunks that disappeared.
+    """
+    def __init__(self, doc_loader, text_splitter, embedding_manager, collection_name,
+                 queue_size=256, upload_batch_size=256, source="pdf_text", manifest_dir=".ingest_manifest",
+                 vector_store=QdrantClientManager, lexical_index=None, answer_cache=None, pdf_workers=0):
+        """
+        Args:
+            doc_loader (DocumentLoader): Source of page texts.
+            text_splitter (GetTextSplitters): Splits page texts into chunks.
+            embedding_manager (EmbeddingManager): Embeds chunks.
+            collection_name (str): Collection to upload into; created on the first point.
+            queue_size (int): Maximum number of items buffered between two stages.
+            upload_batch_size (int): Number of points per upsert request.
+            source (str): Value stored in `payload.meta.source`; also scopes the manifest and point IDs.
+            manifest_dir (str): Directory holding the per-source chunk manifests.
+            vector_store: Backend class with the QdrantClientManager surface (e.g. LocalIndexManager).
+            lexical_index (LexicalIndex): Optional BM25 index kept in sync with the uploaded chunks.
+            answer_cache (SemanticAnswerCache): Optional answer cache invalidated when the collection changes.
+            pdf_workers (int): Processes extracting PDF pages (DocumentLoader.iter_pdf_page_records);
+                None uses the CPU count. 0 (the default) reads the pages serially on the load thread,
+                which is cheaper for short documents.
+        """
+        self.doc_loader = doc_loader
+        self.text_splitter = text_splitter
+        self.embedding_manager = embedding_manager
+        self.collection_name = collection_name
+        self.queue_size = queue_size
+        self.upload_batch_size = upload_batch_size
+        self.source = source
+        self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self.answer_cache = answer_cache
+        self.pdf_workers = pdf_workers
+        self.manifest = ChunkManifest(collection_name, source, manifest_dir)
+        self._previous = {}
+        self._current = {}
+        self._moved = {}
+        self._reindex_all = False
+        self._stop = threading.Event()
+        self._errors = []
+
+    def _put(self, q, item):
+        # Retry with a timeout so a stage unblocks if a downstream stage failed
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _start_pdf_pool(self):
+        # Started before this run's stage threads: with the fork start method all workers are forked
+        # on the first submit, so none of them inherits a lock a stage thread held at that moment
+        executor = ProcessPoolExecutor(max_workers=self.pdf_workers or os.cpu_count() or 1)
+        executor.submit(os.getpid).result()
+        return executor
+
+    def _pages(self, executor):
+        if executor is None:
+            return self.doc_loader.iter_pdf_pages()
+        # Page order keeps chunk indexes (and so the manifest diff) stable between runs
+        records = self.doc_loader.iter_pdf_page_records(max_workers=self.pdf_workers, ordered=True,
+                                                        executor=executor)
+        return (record["text"] for record in records)
+
+    def _drain(self, q):
+        while True:
+            item = q.get()
+            if item is _DONE or self._stop.is_set():
+                return
+            yield item
+
+    def _run_stage(self, name, items, out_q):
+        try:
+            for item in items:
+                if not self._put(out_q, item):
+                    return
+        except Exception as e:
+            print(f"Ingestion stage '{name}' failed: {e}")
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            # The sentinel must always reach the consumer, even after a failure
+            while True:
+                try:
+                    out_q.put(_DONE, timeout=0.1)
+                    break
+                except queue.Full:
+                    if self._stop.is_set():
+                        try:
+                            out_q.get_nowait()
+                        except queue.Empty:
+                            pass
+
+    def _diff(self, chunks):
+        """
+        Assigns content-derived IDs and passes on only chunks that are not already stored.
+        Unchanged chunks whose position moved only get their position (`chunk_index`, `page`,
+        `start`) updated later.
+        """
+        occurrences = {}
+        for idx, (page, start, end, text) in enumerate(chunks):
+            text_hash = chunk_hash(text)
+            occurrence = occurrences.get(text_hash, 0)
+            occurrences[text_hash] = occurrence + 1
+            point_id = chunk_id(self.source, text_hash, occurrence)
+            position = {"chunk_index": idx, "page": page, "start": start}
+            self._current[point_id] = {"hash": text_hash, **position}
+            previous = self._previous.get(point_id)
+            if previous is not None and not self._reindex_all:
+                if any(previous.get(key) != value for key, value in position.items()):
+                    self._moved[point_id] = {"meta": self._meta(position, text)}
+                continue
+            yield {"id": point_id, "position": position, "text": text}
+
+    def _meta(self, position, text):
+        # page/start/end locate the chunk in its page, so the context assembler can
+        # remove exactly the text that overlapping chunks repeat
+        return {
+            "source": self.source,
+            **position,
+            "end": position["start"] + len(text),
+            "length": len(text)
+        }
+
+    def _to_points(self, embedded):
+        for chunk, vec in embedded:
+            yield {
+                "id": chunk["id"],
+                "vector": vec,
+                "payload": {
+                    "text": chunk["text"],
+                    "meta": self._meta(chunk["position"], chunk["text"])
+                }
+            }
+
+    def _index_lexical(self, points):
+        for point in points:
+            self.lexical_index.add(point["id"], point["payload"]["text"])
+            yield point
+
+    def run(self):
+        """
+        Runs all stages concurrently and blocks until the last point is uploaded.
+        Returns:
+            int: Number of new or changed points uploaded.
+        """
+        # A manifest is only trusted if the collection it describes still exists
+        if self.vector_store.collection_exists(self.collection_name):
+            self._previous = self.manifest.load()
+        else:
+            self._previous = {}
+        # A new lexical index needs every chunk re-uploaded; the embedding cache makes that cheap
+        self._reindex_all = self.lexical_index is not None and self.lexical_index.count == 0
+        self._current = {}
+        self._moved = {}
+
+        pages_q = queue.Queue(maxsize=self.queue_size)
+        chunks_q = queue.Queue(maxsize=self.queue_size)
+        points_q = queue.Queue(maxsize=self.queue_size)
+
+        executor = self._start_pdf_pool() if self.pdf_workers != 0 else None
+        stages = [
+            ("load", self._pages(executor), pages_q),
+            ("split", self._diff(self.text_splitter.iter_chunk_spans(self._drain(pages_q))), chunks_q),
+            ("embed", self._to_points(self.embedding_manager.embed_stream(
+                self._drain(chunks_q), get_text=lambda chunk: chunk["text"])), points_q),
+        ]
+        threads = [
+            threading.Thread(target=self._run_stage, args=stage, name=f"ingest-{stage[0]}", daemon=True)
+            for stage in stages
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        # Upload runs on the calling thread; the collection is created once the vector size is known
+        points = self._drain(points_q)
+        if self.lexical_index is not None:
+            points = self._index_lexical(points)
+        total = 0
+        try:
+            first = next(points, None)
+            if first is not None:
+                self.vector_store.initialize_client()
+                self.vector_store.create_collection(self.collection_name, vector_size=len(first["vector"]))
+                total = self.vector_store.upload_stream(
+                    self.collection_name, chain([first], points), batch_size=self.upload_batch_size
+                )
+        except Exception:
+            self._stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+            if executor is not None:
+                executor.shutdown()
+
+        if self._errors:
+            raise self._errors[0]
+
+        removed = [point_id for point_id in self._previous if point_id not in self._current]
+        if removed:
+            self.vector_store.delete_points(self.collection_name, removed)
+            if self.lexical_index is not None:
+                self.lexical_index.delete(removed)
+        if self.lexical_index is not None:
+            self.lexical_index.flush()
+        if self._moved:
+            self.vector_store.set_payloads(self.collection_name, self._moved)
+        if self.answer_cache is not None and (total or removed or self._moved):
+            # Cached answers may quote chunks that changed or no longer exist
+            invalidated = self.answer_cache.invalidate(self.collection_name)
+            print(f"Invalidated {invalidated} cached answers for '{self.collection_name}'")
+        # Saved last, so an interrupted run is simply redone on the next attempt
+        self.manifest.save(self._current)
+
+        elapsed = time.perf_counter() - start
+        unchanged = len(self._current) - total
+        print(f"Ingested '{self.source}' into '{self.collection_name}' in {elapsed:.2f}s: "
+              f"{total} new/changed, {unchanged} unchanged ({len(self._moved)} moved), {len(removed)} deleted")
+        return total
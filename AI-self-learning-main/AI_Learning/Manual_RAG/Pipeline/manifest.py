@@ -0,0 +1,44 @@
+import hashlib
+import json
+import os
+import re
+import uuid
+
+# Fixed namespace so the same chunk always maps to the same point ID
+CHUNK_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "manual-rag/chunk")
+
+
+def chunk_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(source, text_hash, occurrence=0):
+    """
+    Returns a stable, content-derived point ID (UUID string, as accepted by Qdrant).
+    `occurrence` tells apart identical chunks repeated within the same source.
+    """
+    return str(uuid.uuid5(CHUNK_NAMESPACE, f"{source}\0{text_hash}\0{occurrence}"))
+
+
+class ChunkManifest:
+    """
+    Per-source record of the chunks last ingested into a collection,
+    stored as JSON: {point_id: {"hash": ..., "chunk_index": ..., "page": ..., "start": ...}}.
+    """
+    def __init__(self, collection_name, source, manifest_dir=".ingest_manifest"):
+        safe_source = re.sub(r"[^A-Za-z0-9._-]", "_", source)
+        self.path = os.path.join(manifest_dir, collection_name, f"{safe_source}.json")
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, chunks):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(chunks, f)
+        # Atomic replace so a crash never leaves a half-written manifest
+        os.replace(tmp_path, self.path)
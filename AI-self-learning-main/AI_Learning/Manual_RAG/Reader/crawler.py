@@ -0,0 +1,198 @@
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import httpx
+from bs4 import BeautifulSoup
+
+
+class PageCache:
+    """
+    On-disk cache of crawled pages with their ETag/Last-Modified validators,
+    so unchanged pages can be revalidated with a conditional GET.
+    The crawler calls it from worker threads, so the connection is shared under a lock.
+    """
+    def __init__(self, path=".web_cache.sqlite"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " text TEXT NOT NULL,"
+            " links TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, text, links FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, text, links = row
+        return {"etag": etag, "last_modified": last_modified, "text": text, "links": json.loads(links)}
+
+    def put(self, url, etag, last_modified, text, links):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, text, links, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, text, json.dumps(links), time.time())
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _parse_html(url, html):
+    # CPU-bound; runs in a worker thread so it doesn't stall the event loop
+    soup = BeautifulSoup(html, "html.parser")
+    links = []
+    for a in soup.find_all("a", href=True):
+        link, _ = urldefrag(urljoin(url, a["href"]))
+        if urlparse(link).scheme in ("http", "https"):
+            links.append(link)
+    return soup.get_text(), links
+
+
+class WebCrawler:
+    """
+    Async crawler over a pooled HTTP connection with a per-host concurrency limit.
+    Pages are revalidated with If-None-Match/If-Modified-Since, so an unchanged
+    page costs a 304 response and no re-parse.
+    """
+    def __init__(self, cache_path=".web_cache.sqlite", max_depth=1, url_patterns=None, same_host=True,
+                 per_host_limit=4, max_connections=20, max_pages=500, timeout=30.0):
+        """
+        Args:
+            cache_path (str): SQLite file for the page cache.
+            max_depth (int): Link hops followed from the start URLs (0 fetches only the start URLs).
+            url_patterns (list): Regexes; when given, followed links must match at least one.
+            same_host (bool): Only follow links on the hosts of the start URLs.
+            per_host_limit (int): Maximum concurrent requests per host.
+            max_connections (int): Size of the shared connection pool.
+            max_pages (int): Stop after this many pages have been fetched (or revalidated).
+            timeout (float): Per-request timeout in seconds.
+        """
+        self.cache_path = cache_path
+        self.max_depth = max_depth
+        self.url_patterns = [re.compile(p) for p in (url_patterns or [])]
+        self.same_host = same_host
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.stats = {}
+
+    def _in_scope(self, url, hosts):
+        if self.same_host and urlparse(url).netloc not in hosts:
+            return False
+        if self.url_patterns and not any(p.search(url) for p in self.url_patterns):
+            return False
+        return True
+
+    async def _fetch(self, client, cache, semaphore, url):
+        # SQLite runs in a worker thread so it doesn't stall the other fetches
+        cached = await asyncio.to_thread(cache.get, url)
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        async with semaphore:
+            response = await client.get(url, headers=headers)
+
+        if response.status_code == 304 and cached:
+            self.stats["not_modified"] += 1
+            return {"source": url, "text": cached["text"], "status": 304}, cached["links"]
+        if response.status_code != 200:
+            self.stats["errors"] += 1
+            print(f"Skipping {url}: HTTP {response.status_code}")
+            return None, []
+        if "html" not in response.headers.get("content-type", "html"):
+            return None, []
+
+        text, links = await asyncio.to_thread(_parse_html, str(response.url), response.text)
+        await asyncio.to_thread(cache.put, url, response.headers.get("etag"), response.headers.get("last-modified"),
+                                text, links)
+        self.stats["fetched"] += 1
+        return {"source": url, "text": text, "status": 200}, links
+
+    async def acrawl(self, start_urls):
+        """
+        Crawls breadth-first from `start_urls`.
+        Returns:
+            list: Page records {"source": url, "text": page text, "status": 200 or 304}.
+        """
+        start_urls = [urldefrag(u)[0] for u in start_urls]
+        hosts = {urlparse(u).netloc for u in start_urls}
+        host_limits = {}
+        frontier = asyncio.Queue()
+        seen = set(start_urls)
+        records = []
+        # Pages fetched or being fetched; a slot is taken before the request, so concurrent
+        # workers cannot overshoot max_pages
+        reserved = 0
+        self.stats = {"fetched": 0, "not_modified": 0, "errors": 0}
+        for url in start_urls:
+            frontier.put_nowait((url, 0))
+
+        cache = PageCache(self.cache_path)
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        start = time.perf_counter()
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout, follow_redirects=True) as client:
+            async def worker():
+                nonlocal reserved
+                while True:
+                    url, depth = await frontier.get()
+                    try:
+                        if reserved >= self.max_pages:
+                            continue
+                        reserved += 1
+                        host = urlparse(url).netloc
+                        semaphore = host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+                        try:
+                            record, links = await self._fetch(client, cache, semaphore, url)
+                        except Exception as e:
+                            # One bad page (network, parsing, cache) must not kill the worker:
+                            # with every worker gone, frontier.join() would never return
+                            self.stats["errors"] += 1
+                            print(f"Error fetching {url}: {type(e).__name__}: {e}")
+                            reserved -= 1
+                            continue
+                        if record:
+                            records.append(record)
+                        else:
+                            reserved -= 1
+                        if depth < self.max_depth:
+                            for link in links:
+                                if link not in seen and self._in_scope(link, hosts):
+                                    seen.add(link)
+                                    frontier.put_nowait((link, depth + 1))
+                    finally:
+                        frontier.task_done()
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.max_connections)]
+            await frontier.join()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        cache.close()
+
+        elapsed = time.perf_counter() - start
+        print(f"Crawled {len(records)} pages in {elapsed:.2f}s "
+              f"({self.stats['fetched']} fetched, {self.stats['not_modified']} not modified, {self.stats['errors']} errors)")
+        return records
+
+    def crawl(self, start_urls):
+        return asyncio.run(self.acrawl(start_urls))
@@ -1,6 +1,22 @@
-
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_community.document_loaders import WebBaseLoader
+from Reader.crawler import WebCrawler
+
+
+def _count_pages(pdf_path):
+    from pypdf import PdfReader
+    return len(PdfReader(pdf_path).pages)
+
+
+def _extract_page_range(pdf_path, start, end):
+    # Runs in a worker process; each worker opens its own reader
+    from pypdf import PdfReader
+    reader = PdfReader(pdf_path)
+    return [(page_no, reader.pages[page_no].extract_text()) for page_no in range(start, end)]
+
 
 class DocumentLoader:
     def __init__(self, pdf_path=None, web_url=None):
@@ -15,6 +31,101 @@ class DocumentLoader:
         pages = loader.load()
         return "\n".join([page.page_content for page in pages])
 
+    def iter_pdf_pages(self):
+        """
+        Yields the text of the PDF one page at a time instead of joining the whole document.
+        """
+        if not self.pdf_path:
+            print("No PDF path provided.")
+            return
+        loader = PyPDFLoader(self.pdf_path)
+        for page in loader.lazy_load():
+            yield page.page_content
+
+    def iter_pdf_page_records(self, pdf_paths=None, max_workers=None, pages_per_task=16, ordered=False,
+                              executor=None):
+        """
+        Extracts PDF pages in parallel on a process pool, yielding page records as they finish.
+        Records arrive in completion order, not page order, unless `ordered` is set.
+        Args:
+            pdf_paths (list): PDFs to read; defaults to `pdf_path`.
+            max_workers (int): Number of worker processes; defaults to the CPU count.
+            pages_per_task (int): Number of consecutive pages parsed per task.
+            ordered (bool): Yield pages in file and page order (e.g. for stable chunk indexes).
+            executor (ProcessPoolExecutor): Pool to run on, left open; by default one is created
+                for the call and shut down at the end.
+        Yields:
+            dict: {"source": path, "page": 0-based page number, "text": page text}
+        """
+        pdf_paths = pdf_paths or ([self.pdf_path] if self.pdf_path else [])
+        if not pdf_paths:
+            print("No PDF path provided.")
+            return
+        max_workers = max_workers or os.cpu_count() or 1
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                yield from self._pool_page_records(executor, pdf_paths, max_workers, pages_per_task, ordered)
+        else:
+            yield from self._pool_page_records(executor, pdf_paths, max_workers, pages_per_task, ordered)
+
+    @staticmethod
+    def _pool_page_records(executor, pdf_paths, max_workers, pages_per_task, ordered):
+        page_counts = executor.map(_count_pages, pdf_paths)
+        tasks = (
+            (path, start, min(start + pages_per_task, page_count))
+            for path, page_count in zip(pdf_paths, page_counts)
+            for start in range(0, page_count, pages_per_task)
+        )
+        if ordered:
+            yield from DocumentLoader._ordered_page_records(executor, tasks, max_workers * 2)
+            return
+        pending = {}
+        # Keep a bounded number of tasks in flight so finished pages don't pile up in memory
+        for task in tasks:
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from DocumentLoader._page_records(done, pending)
+            pending[executor.submit(_extract_page_range, *task)] = task[0]
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from DocumentLoader._page_records(done, pending)
+
+    @staticmethod
+    def _ordered_page_records(executor, tasks, max_pending):
+        # Same bounded window, drained in submission order
+        pending = deque()
+        for task in tasks:
+            if len(pending) >= max_pending:
+                yield from DocumentLoader._page_records_of(*pending.popleft())
+            pending.append((executor.submit(_extract_page_range, *task), task[0]))
+        while pending:
+            yield from DocumentLoader._page_records_of(*pending.popleft())
+
+    @staticmethod
+    def _page_records_of(future, source):
+        for page_no, text in future.result():
+            yield {"source": source, "page": page_no, "text": text}
+
+    @staticmethod
+    def _page_records(done, pending):
+        for future in done:
+            yield from DocumentLoader._page_records_of(future, pending.pop(future))
+
+    def iter_pdf_directory(self, directory, max_workers=None, pages_per_task=16):
+        """
+        Extracts every PDF under `directory` in parallel, sharing one process pool across files.
+        """
+        pdf_paths = sorted(
+            os.path.join(root, name)
+            for root, _, files in os.walk(directory)
+            for name in files
+            if name.lower().endswith(".pdf")
+        )
+        if not pdf_paths:
+            print(f"No PDF files found in {directory}.")
+            return
+        yield from self.iter_pdf_page_records(pdf_paths, max_workers=max_workers, pages_per_task=pages_per_task)
+
     def load_web(self):
         if not self.web_url:
             print("No web URL provided.")
@@ -23,6 +134,22 @@ class DocumentLoader:
         docs = loader.load()
         return "\n".join([doc.page_content for doc in docs])
 
+    def crawl_web(self, start_urls=None, **crawler_options):
+        """
+        Crawls a documentation site asynchronously starting from `web_url` (or `start_urls`).
+        Unchanged pages are served from the on-disk ETag/Last-Modified cache.
+        Args:
+            start_urls (list): URLs to start from; defaults to `web_url`.
+            crawler_options: Passed to `WebCrawler` (max_depth, url_patterns, per_host_limit, ...).
+        Returns:
+            list: Page records {"source": url, "text": page text, "status": 200 or 304}.
+        """
+        start_urls = start_urls or ([self.web_url] if self.web_url else [])
+        if not start_urls:
+            print("No web URL provided.")
+            return []
+        return WebCrawler(**crawler_options).crawl(start_urls)
+
     def load_all(self):
         print("Loading PDF and web content...")
         return self.load_pdf(), self.load_web()
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark of the native offset splitter against LangChain's splitters.
+
+Run from the Manual_RAG directory:
+    python -m Splitter.benchmark --size-mb 8 --chunk-size 40
+"""
+import argparse
+import random
+import time
+
+from langchain_text_splitters import CharacterTextSplitter, RecursiveCharacterTextSplitter
+from Splitter.fast_splitter import OffsetTextSplitter
+
+
+def make_document(size_mb, seed=0):
+    rng = random.Random(seed)
+    words = ["employee", "manager", "department", "salary", "Aditya", "New", "Delhi", "MCP", "server",
+             "protocol", "the", "of", "and", "a", "to", "in", "is", "for", "on", "with"]
+    lines = []
+    size = 0
+    target = int(size_mb * 1024 * 1024)
+    while size < target:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(1, 12)))
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def timed(name, fn, text, repeat):
+    best = float("inf")
+    chunks = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = len(fn(text))
+        best = min(best, time.perf_counter() - start)
+    mb = len(text) / (1024 * 1024)
+    print(f"{name:<38} {best * 1000:9.1f} ms  {mb / best:8.1f} MB/s  {chunks:>9} chunks")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--chunk-size", type=int, default=40)
+    parser.add_argument("--chunk-overlap", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tokens", action="store_true", help="Also benchmark token-count sizing")
+    args = parser.parse_args()
+
+    text = make_document(args.size_mb)
+    print(f"Document: {len(text) / (1024 * 1024):.1f} MB, chunk_size={args.chunk_size}, chunk_overlap={args.chunk_overlap}")
+
+    char_splitter = CharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, separator="\n")
+    recursive_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, separators=["\n"]
+    )
+    offset_splitter = OffsetTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+
+    baseline = timed("langchain CharacterTextSplitter", char_splitter.split_text, text, args.repeat)
+    timed("langchain RecursiveCharacterTextSplitter", recursive_splitter.split_text, text, args.repeat)
+    offsets = timed("OffsetTextSplitter.split_offsets", offset_splitter.split_offsets, text, args.repeat)
+    timed("OffsetTextSplitter.split_text", offset_splitter.split_text, text, args.repeat)
+    print(f"Speed-up of offsets over CharacterTextSplitter: {baseline / offsets:.1f}x")
+
+    if args.tokens:
+        token_splitter = OffsetTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap,
+                                            length_unit="tokens")
+        timed("OffsetTextSplitter (tokens)", token_splitter.split_offsets, text, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
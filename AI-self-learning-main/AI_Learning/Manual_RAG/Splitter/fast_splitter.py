@@ -0,0 +1,164 @@
+from collections import deque
+
+
+class OffsetTextSplitter:
+    """
+    Single-pass splitter that returns (start, end) offsets into the source text
+    instead of copied strings. Chunks follow the same merge rules as LangChain's
+    CharacterTextSplitter: pieces between separators are packed greedily up to
+    `chunk_size`, and each new chunk starts with trailing pieces of the previous
+    one totalling at most `chunk_overlap`. Lengths are measured on the source
+    span, so runs of blank lines count towards the chunk size.
+    """
+    def __init__(self, chunk_size=26, chunk_overlap=4, separator="\n", length_unit="chars",
+                 encoding_name="cl100k_base"):
+        """
+        Args:
+            chunk_size (int): Maximum chunk length, in `length_unit`.
+            chunk_overlap (int): Maximum overlap between consecutive chunks, in `length_unit`.
+            separator (str): String the text is split on.
+            length_unit (str): "chars" to size by characters, "tokens" to size by tiktoken tokens.
+            encoding_name (str): tiktoken encoding used when `length_unit` is "tokens".
+        """
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) is larger than chunk_size ({chunk_size}).")
+        if not separator:
+            raise ValueError("separator must be a non-empty string.")
+        if length_unit not in ("chars", "tokens"):
+            raise ValueError(f"Unknown length_unit '{length_unit}', expected 'chars' or 'tokens'.")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separator = separator
+        self.length_unit = length_unit
+        if length_unit == "tokens":
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(encoding_name)
+            self._separator_length = len(self._encoding.encode(separator))
+        else:
+            self._encoding = None
+            self._separator_length = len(separator)
+
+    def _pieces(self, text):
+        # Yields non-empty (start, end) spans between separators
+        sep = self.separator
+        sep_len = len(sep)
+        start = 0
+        while True:
+            end = text.find(sep, start)
+            if end == -1:
+                if start < len(text):
+                    yield start, len(text)
+                return
+            if end > start:
+                yield start, end
+            start = end + sep_len
+
+    def _length(self, text, start, end):
+        if self._encoding is None:
+            return end - start
+        return len(self._encoding.encode(text[start:end]))
+
+    def _merge(self, text):
+        # Yields untrimmed (start, end) chunk spans
+        if self._encoding is None:
+            yield from self._merge_chars(text)
+            return
+        sep_len = self._separator_length
+        current = deque()
+        total = 0
+        for start, end in self._pieces(text):
+            length = self._length(text, start, end)
+            if current and total + length + sep_len > self.chunk_size:
+                yield current[0][0], current[-1][1]
+                while current and (total > self.chunk_overlap or
+                                   (total + length + sep_len > self.chunk_size and total > 0)):
+                    _, _, first_length = current.popleft()
+                    total -= first_length + (sep_len if current else 0)
+            total += length + (sep_len if current else 0)
+            current.append((start, end, length))
+        if current:
+            yield current[0][0], current[-1][1]
+
+    def _merge_chars(self, text):
+        # Character sizing: the length of a run of pieces is just its span, so only
+        # piece starts need to be kept and no per-piece lengths are computed
+        find = text.find
+        sep = self.separator
+        sep_len = len(sep)
+        chunk_size = self.chunk_size
+        overlap = self.chunk_overlap
+        text_len = len(text)
+        starts = deque()  # start offsets of the pieces in the current chunk
+        chunk_end = 0
+        pos = 0
+        while pos <= text_len:
+            end = find(sep, pos)
+            if end == -1:
+                end = text_len
+            if end > pos:
+                if starts and end - starts[0] > chunk_size:
+                    yield starts[0], chunk_end
+                    # Drop leading pieces until the carried-over text fits the overlap
+                    # and leaves room for the new piece
+                    while starts and (chunk_end - starts[0] > overlap or end - starts[0] > chunk_size):
+                        starts.popleft()
+                starts.append(pos)
+                chunk_end = end
+            pos = end + sep_len
+        if starts:
+            yield starts[0], chunk_end
+
+    @staticmethod
+    def _trim(text, start, end):
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    def iter_offsets(self, text):
+        """
+        Yields (start, end) offsets of each chunk, with surrounding whitespace trimmed.
+        """
+        for start, end in self._merge(text):
+            start, end = self._trim(text, start, end)
+            if end > start:
+                yield start, end
+
+    def split_offsets(self, text):
+        return list(self.iter_offsets(text))
+
+    def split_text(self, text):
+        return [text[start:end] for start, end in self.iter_offsets(text)]
+
+    def split_stream(self, texts):
+        """
+        Splits text that arrives incrementally (e.g. file blocks or pages), holding back
+        only the chunk that may still grow. Offsets are relative to the concatenated stream.
+        Yields:
+            tuple: (start, end, chunk_text)
+        """
+        buffer = ""
+        base = 0
+        for part in texts:
+            if not part:
+                continue
+            buffer += part
+            # Only pieces closed by a separator are final; the trailing piece may still grow
+            cut = buffer.rfind(self.separator)
+            if cut == -1:
+                continue
+            spans = list(self._merge(buffer[:cut]))
+            # The last chunk can still grow with the next part
+            for start, end in spans[:-1]:
+                start, end = self._trim(buffer, start, end)
+                if end > start:
+                    yield base + start, base + end, buffer[start:end]
+            if spans:
+                keep_from = spans[-1][0]
+                buffer = buffer[keep_from:]
+                base += keep_from
+        for start, end in self._merge(buffer):
+            start, end = self._trim(buffer, start, end)
+            if end > start:
+                yield base + start, base + end, buffer[start:end]
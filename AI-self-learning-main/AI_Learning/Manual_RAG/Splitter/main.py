@@ -1,12 +1,14 @@
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import CharacterTextSplitter, RecursiveCharacterTextSplitter
+from Splitter.fast_splitter import OffsetTextSplitter
 
 
 class GetTextSplitters:
-    def __init__(self, doc=None, chunk_size=26, chunk_overlap=4):
+    def __init__(self, doc=None, chunk_size=26, chunk_overlap=4, length_unit="chars"):
         self.doc = doc
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.length_unit = length_unit  # "chars" or "tokens"; used by the native offset splitter
 
     def splitByRecursiveCharacterTextSplitter(self):
         if not self.doc:
@@ -17,10 +19,54 @@ class GetTextSplitters:
         r_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.chunk_size,
             chunk_overlap=self.chunk_overlap,
-            separator="\n" 
+            separators=["\n"]
         )
         return r_splitter.split_text(self.doc)
 
+    def _offset_splitter(self):
+        return OffsetTextSplitter(
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+            separator="\n",
+            length_unit=self.length_unit
+        )
+
+    def splitByOffsets(self):
+        """
+        Splits the document with the native single-pass splitter.
+        Returns (start, end) offsets into `doc` instead of copied strings.
+        """
+        if not self.doc:
+            print("No document provided.")
+            return []
+        return self._offset_splitter().split_offsets(self.doc)
+
+    def iter_chunks(self, texts):
+        """
+        Splits an iterable of texts (e.g. PDF pages) lazily, yielding chunks as each text is split.
+        """
+        for _, _, _, chunk in self.iter_chunk_spans(texts):
+            yield chunk
+
+    def iter_chunk_spans(self, texts):
+        """
+        iter_chunks with positions: yields (text number, start, end, chunk_text), the offsets
+        being into that text. Consecutive chunks of one text overlap where start < previous end.
+        """
+        splitter = self._offset_splitter()
+        for number, text in enumerate(texts):
+            if not text:
+                continue
+            for start, end in splitter.iter_offsets(text):
+                yield number, start, end, text[start:end]
+
+    def iter_stream_chunks(self, parts):
+        """
+        Splits one logical document that arrives in parts (e.g. blocks read from a large file).
+        Yields (start, end, chunk_text) with offsets into the whole stream.
+        """
+        yield from self._offset_splitter().split_stream(parts)
+
     def splitByCharacterTextSplitter(self):
         if not self.doc:
             print("No document provided.")
@@ -1,23 +1,98 @@
 
 import os
-from langchain_openai import AzureChatOpenAI
-from Loader.main import QdrantClientManager
-from Embedding.main import EmbeddingManager
-from langchain.prompts import PromptTemplate
-from langchain.chains import RetrievalQA
-from langchain.memory import ConversationBufferMemory
-from langchain_community.vectorstores import Qdrant
-from dotenv import load_dotenv
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+# Startup is lazy: LangChain, the LLM, Qdrant and the vector store are only
+# built when first needed (the first question, or the background warm-up), so
+# the prompt appears immediately. Run with --eager for the old behaviour of
+# building and verifying everything before the prompt, and --startup-report
+# for a breakdown of where startup time went.
+_start = time.perf_counter()
+_timings = []  # (thread name, stage, self seconds, total seconds, offset from start)
+_local = threading.local()
+_background_output = []
+
+
+@contextmanager
+def _timed(stage):
+    # Stages nest (building the QA chain builds the LLM, ...); each one's self time
+    # excludes the stages timed inside it, like `python -X importtime`
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(0.0)
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - began
+        nested = stack.pop()
+        if stack:
+            stack[-1] += total
+        _timings.append((threading.current_thread().name, stage, total - nested, total, began - _start))
+
+
+def _say(message=""):
+    """
+    print() for the lazy builders. On the background thread the output is buffered
+    instead, so it does not interleave with the input() prompt; it is shown when the
+    health check fails and in the startup report.
+    """
+    sink = getattr(_local, "sink", None)
+    if sink is None:
+        print(message)
+    else:
+        sink(message)
+
+
+def print_startup_report():
+    """
+    Startup breakdown in the spirit of `python -X importtime`: one line per stage,
+    with the thread it ran on and when it started relative to process start.
+    """
+    print("\nstartup | thread           | start ms |  self ms | total ms | stage")
+    for thread_name, stage, self_seconds, seconds, offset in sorted(_timings, key=lambda t: t[4]):
+        print(f"startup | {thread_name:<16} | {offset * 1000:8.1f} | {self_seconds * 1000:8.1f} | "
+              f"{seconds * 1000:8.1f} | {stage}")
+    if _background_output:
+        print("\nbackground-init output:")
+        print("\n".join(_background_output))
+
+
+_init_lock = threading.RLock()
+_instances = {}
+
+
+def _lazy(builder):
+    """
+    Wraps `builder` so the component is built once, on first use, even when the
+    REPL and the background warm-up ask for it at the same time.
+    """
+    name = builder.__name__.lstrip("_").replace("build_", "")
+
+    def get():
+        if name not in _instances:
+            with _init_lock:
+                if name not in _instances:
+                    with _timed(name):
+                        _instances[name] = builder()
+        return _instances[name]
+    get.__name__ = f"get_{name}"
+    return get
+
+
 # Load environment variables from .env file
 current_dir = Path(__file__).parent
-env_path = current_dir / '.env'
-if env_path.exists():
-    print(f"Loading environment variables from {env_path}")
-    load_dotenv(env_path)
-else:
-    print(f".env file not found at {env_path}")
+with _timed("load .env"):
+    from dotenv import load_dotenv
+    env_path = current_dir / '.env'
+    if env_path.exists():
+        print(f"Loading environment variables from {env_path}")
+        load_dotenv(env_path)
+    else:
+        print(f".env file not found at {env_path}")
 
 # Check for Azure OpenAI settings
 azure_api_key = os.getenv("OPENAI_API_KEY")
@@ -38,46 +113,6 @@ if not all([azure_api_key, azure_api_base, azure_api_version, deployment_name]):
 print(f"Using Azure OpenAI with deployment: {deployment_name}")
 print(f"Azure endpoint: {azure_api_base}")
 
-# Initialize the LLM with Azure OpenAI
-try:
-    # Print debug information
-    print("Debug - Azure OpenAI configuration:")
-    print(f"API Key: {'*****' + azure_api_key[-5:] if azure_api_key else 'None'}")
-    print(f"API Base: {azure_api_base}")
-    print(f"API Version: {azure_api_version}")
-    print(f"Deployment Name: {deployment_name}")
-    
-    # Connect to Azure OpenAI with correct parameter names
-    llm = AzureChatOpenAI(
-        azure_deployment=deployment_name,
-        api_version=azure_api_version,
-        azure_endpoint=azure_api_base,
-        api_key=azure_api_key,
-        temperature=0
-    )
-    print("✅ Successfully initialized Azure OpenAI")
-except Exception as e:
-    print(f"Error initializing Azure OpenAI: {e}")
-    print(f"Error type: {type(e).__name__}")
-    import traceback
-    traceback.print_exc()
-    
-    # Fall back to a dummy LLM for testing if you have no API access
-    try:
-        # Try the new import path
-        from langchain_community.llms import FakeListLLM
-    except ImportError:
-        # Fall back to old import path if needed
-        from langchain.llms import FakeListLLM
-    
-    responses = [
-        "This is a test response from a dummy LLM. The real model couldn't be loaded due to configuration issues.",
-        "I found information about MCP servers. They are used for Model Context Protocol implementations.",
-        "Based on the context, I can't answer that question. Thanks for asking!"
-    ]
-    llm = FakeListLLM(responses=responses)
-    print("⚠️ Using FakeListLLM for testing only - your API key or model configuration has issues.")
-
 template = """Use the following pieces of context to answer the question at the end.
 If you don't know the answer, just say that you don't know, don't try to make up an answer.
 Use three sentences maximum. Keep the answer as concise as possible.
@@ -89,75 +124,263 @@ Question: {question}
 
 Helpful Answer:"""
 
-QA_CHAIN_PROMPT = PromptTemplate(input_variables=["context", "question"], template=template)
-
-# Setup Qdrant vector DB and embedding manager
-# Initialize the Qdrant client
-qdrant_client = QdrantClientManager.initialize_client()
-embedding_manager = EmbeddingManager()
-
-# Check available collections in Qdrant
-available_collections = [c.name for c in qdrant_client.get_collections().collections]
-print(f"Available collections: {available_collections}")
-
-# Use Employee_data collection if it exists, otherwise use the first available collection
-collection_name = "Employee_data"
-if collection_name not in available_collections and available_collections:
-    collection_name = available_collections[0]
-    print(f"Collection 'Employee_data' not found. Using '{collection_name}' instead.")
-elif not available_collections:
-    raise ValueError("No collections found in Qdrant. Please create and populate a collection first.")
-else:
-    print(f"Using collection: {collection_name}")
-
-# Create a Qdrant vector store using the client
-# Specify the content_payload_key to match your data structure
-vector_store = Qdrant(
-    client=qdrant_client,
-    collection_name=collection_name,
-    embeddings=embedding_manager.embeddings,
-    content_payload_key="text"  # This tells LangChain where to find the document content
-)
-
-# Setup conversation memory
-memory = ConversationBufferMemory(
-    memory_key="chat_history",
-    return_messages=True
-)
-
-# Create the QA chain with memory
-qa_chain = RetrievalQA.from_chain_type(
-    llm,
-    retriever=vector_store.as_retriever(),
-    return_source_documents=True,
-    chain_type_kwargs={"prompt": QA_CHAIN_PROMPT}
-)
-
-def chat_loop():
+
+def _build_llm():
+    # Initialize the LLM with Azure OpenAI
+    try:
+        with _timed("import langchain_openai + llm config"):
+            from utils.llm_config import AzureOpenAIConfig
+        # Print debug information
+        _say("Debug - Azure OpenAI configuration:")
+        _say(f"API Key: {'*****' + azure_api_key[-5:] if azure_api_key else 'None'}")
+        _say(f"API Base: {azure_api_base}")
+        _say(f"API Version: {azure_api_version}")
+        _say(f"Deployment Name: {deployment_name}")
+
+        # Connect to Azure OpenAI on the process-wide keep-alive connection pool (see llm_clients.py)
+        llm = AzureOpenAIConfig().get_chat_model(
+            temperature=0,
+            streaming=True  # Tokens reach the callbacks as they are generated
+        )
+        _say("✅ Successfully initialized Azure OpenAI")
+        return llm
+    except Exception as e:
+        _say(f"Error initializing Azure OpenAI: {e}")
+        _say(f"Error type: {type(e).__name__}")
+        import traceback
+        _say(traceback.format_exc())
+
+        # Fall back to a dummy LLM for testing if you have no API access
+        try:
+            # Try the new import path
+            from langchain_community.llms import FakeListLLM
+        except ImportError:
+            # Fall back to old import path if needed
+            from langchain.llms import FakeListLLM
+
+        responses = [
+            "This is a test response from a dummy LLM. The real model couldn't be loaded due to configuration issues.",
+            "I found information about MCP servers. They are used for Model Context Protocol implementations.",
+            "Based on the context, I can't answer that question. Thanks for asking!"
+        ]
+        _say("⚠️ Using FakeListLLM for testing only - your API key or model configuration has issues.")
+        return FakeListLLM(responses=responses)
+
+
+def _build_qdrant_client():
+    with _timed("import qdrant_client"):
+        from Loader.main import QdrantClientManager
+    # Initialize the Qdrant client
+    return QdrantClientManager.initialize_client()
+
+
+def _build_embedding_manager():
+    with _timed("import Embedding (langchain_openai)"):
+        from Embedding.main import EmbeddingManager
+    return EmbeddingManager()
+
+
+def _build_collection_name():
+    # Check available collections in Qdrant
+    available_collections = [c.name for c in get_qdrant_client().get_collections().collections]
+    _say(f"Available collections: {available_collections}")
+
+    # Use Employee_data collection if it exists, otherwise use the first available collection
+    collection_name = "Employee_data"
+    if collection_name not in available_collections and available_collections:
+        collection_name = available_collections[0]
+        _say(f"Collection 'Employee_data' not found. Using '{collection_name}' instead.")
+    elif not available_collections:
+        raise ValueError("No collections found in Qdrant. Please create and populate a collection first.")
+    else:
+        _say(f"Using collection: {collection_name}")
+    return collection_name
+
+
+def _build_vector_store():
+    with _timed("import langchain_community"):
+        from langchain_community.vectorstores import Qdrant
+    # Create a Qdrant vector store using the client
+    # Specify the content_payload_key to match your data structure
+    return Qdrant(
+        client=get_qdrant_client(),
+        collection_name=get_collection_name(),
+        embeddings=get_embedding_manager(),  # Goes through the persistent embedding cache
+        content_payload_key="text"  # This tells LangChain where to find the document content
+    )
+
+
+def _build_retriever():
+    # Use hybrid (vector + BM25) retrieval when ingestion built a lexical index for this collection
+    collection_name = get_collection_name()
+    lexical_index_path = current_dir / ".lexical_index" / f"{collection_name}.sqlite"
+    if lexical_index_path.exists():
+        _say(f"Using hybrid retrieval with lexical index {lexical_index_path}")
+        from Loader.main import QdrantClientManager
+        from LexicalIndex.main import LexicalIndex
+        from LexicalIndex.retriever import HybridRetriever
+        return HybridRetriever(
+            vector_store=QdrantClientManager,
+            collection_name=collection_name,
+            embeddings=get_embedding_manager(),
+            lexical_index=LexicalIndex(str(lexical_index_path))
+        )
+    return get_vector_store().as_retriever()
+
+
+def _build_memory():
+    from langchain.memory import ConversationBufferMemory
+    # Setup conversation memory
+    return ConversationBufferMemory(
+        memory_key="chat_history",
+        return_messages=True
+    )
+
+
+def _build_qa_chain():
+    with _timed("import langchain chains"):
+        from langchain.prompts import PromptTemplate
+        from langchain.chains import RetrievalQA
+    QA_CHAIN_PROMPT = PromptTemplate(input_variables=["context", "question"], template=template)
+    # Create the QA chain with memory
+    return RetrievalQA.from_chain_type(
+        get_llm(),
+        retriever=get_retriever(),
+        return_source_documents=True,
+        chain_type_kwargs={"prompt": QA_CHAIN_PROMPT}
+    )
+
+
+def _build_streaming_printer_class():
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class StreamingPrinter(BaseCallbackHandler):
+        """
+        Prints answer tokens as they arrive and records time to first token and total latency,
+        both measured from when the question was submitted.
+        """
+        def __init__(self):
+            self.start = time.perf_counter()
+            self.first_token_at = None
+            self.tokens = 0
+
+        def on_llm_new_token(self, token, **kwargs):
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+                print("\nAI: ", end="", flush=True)
+            self.tokens += 1
+            print(token, end="", flush=True)
+
+        def latency(self):
+            total = time.perf_counter() - self.start
+            ttft = (self.first_token_at - self.start) if self.first_token_at is not None else total
+            return {"ttft": ttft, "total": total, "tokens": self.tokens}
+
+    return StreamingPrinter
+
+
+get_llm = _lazy(_build_llm)
+get_qdrant_client = _lazy(_build_qdrant_client)
+get_embedding_manager = _lazy(_build_embedding_manager)
+get_collection_name = _lazy(_build_collection_name)
+get_vector_store = _lazy(_build_vector_store)
+get_retriever = _lazy(_build_retriever)
+get_memory = _lazy(_build_memory)
+get_qa_chain = _lazy(_build_qa_chain)
+get_streaming_printer_class = _lazy(_build_streaming_printer_class)
+
+# Components that used to be module globals are still available as attributes, built on first access
+_LAZY_ATTRIBUTES = {
+    "llm": get_llm,
+    "qdrant_client": get_qdrant_client,
+    "embedding_manager": get_embedding_manager,
+    "collection_name": get_collection_name,
+    "vector_store": get_vector_store,
+    "retriever": get_retriever,
+    "memory": get_memory,
+    "qa_chain": get_qa_chain,
+    "StreamingPrinter": get_streaming_printer_class,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_health = {"done": threading.Event(), "ok": None}
+
+
+def _background_check():
+    """
+    Builds the QA chain and runs the health check off the main thread, so the
+    first question finds everything warm. Output is held back and only shown
+    if the check fails (or in the startup report), to keep the prompt clean.
+    """
+    log = _background_output
+    _local.sink = log.append
+    try:
+        with _timed("warm-up (build qa_chain)"):
+            get_qa_chain()
+            get_streaming_printer_class()
+        with _timed("health check"):
+            _health["ok"] = verify_data_retrieval(log=log.append)
+    except Exception as e:
+        log.append(f"❌ Initialization failed: {e}")
+        _health["ok"] = False
+    finally:
+        _health["done"].set()
+    if not _health["ok"]:
+        print("\nWARNING: background health check failed:\n" + "\n".join(log))
+        print("\nYour question: ", end="", flush=True)
+
+
+def start_background_check():
+    thread = threading.Thread(target=_background_check, name="background-init", daemon=True)
+    thread.start()
+    return thread
+
+
+def chat_loop(startup_report=False):
     print("Welcome to the RAG-powered chat system! Type 'quit' to exit.")
     print("-----------------------------------------------------------")
-    
+    _timings.append(("MainThread", "prompt ready", 0.0, 0.0, time.perf_counter() - _start))
+    if startup_report:
+        print(f"Prompt ready after {(time.perf_counter() - _start) * 1000:.0f} ms (type 'startup' for the breakdown)")
+
     while True:
         user_question = input("\nYour question: ")
-        
+
         if user_question.lower() in ["quit", "exit", "q"]:
             print("Thank you for using the chat system. Goodbye!")
             break
-        
+
+        if user_question.strip().lower() == "startup":
+            print_startup_report()
+            continue
+
         if not user_question.strip():
             print("Please enter a valid question.")
             continue
-        
+
         try:
             # Debug: Print embedding information
             print(f"Generating embedding for query: {user_question}")
-            
-            # Run the query through the QA chain
-            result = qa_chain({"query": user_question})
+
+            # Run the query through the QA chain, streaming the answer to the terminal
+            printer = get_streaming_printer_class()()
+            result = get_qa_chain().invoke({"query": user_question}, config={"callbacks": [printer]})
             answer = result["result"]
-            
-            print("\nAI: " + answer)
-            
+
+            if printer.tokens:
+                print()
+            else:
+                # The LLM did not stream (e.g. the FakeListLLM fallback)
+                print("\nAI: " + answer)
+            latency = printer.latency()
+            print(f"(time to first token {latency['ttft']:.2f}s, total {latency['total']:.2f}s)")
+
             # Optional: Print sources if available
             if result.get("source_documents"):
                 print("\nSources:")
@@ -167,21 +390,21 @@ def chat_loop():
                     # Print a snippet of the content
                     content = doc.page_content[:150] + "..." if len(doc.page_content) > 150 else doc.page_content
                     print(f"Content: {content}")
-                    
+
                     # Print metadata if available
                     if hasattr(doc, "metadata"):
                         print(f"Metadata: {doc.metadata}")
-                    
+
                     if hasattr(doc, "metadata") and "source" in doc.metadata:
                         sources.add(doc.metadata["source"])
-                
+
                 if sources:
                     print("\nSource files:")
                     for i, source in enumerate(sources, 1):
                         print(f"{i}. {source}")
             else:
                 print("\nNo source documents were returned. The RAG system may not have relevant information.")
-                    
+
         except Exception as e:
             import traceback
             print(f"\nError: {str(e)}")
@@ -189,62 +412,67 @@ def chat_loop():
             traceback.print_exc()
             print("\nSorry, I couldn't process your question. Please try again.")
 
-def verify_data_retrieval():
+def verify_data_retrieval(log=print):
     """Check if we can retrieve data from the vector store"""
-    print("\n--- Testing Vector Store Retrieval ---")
-    
+    log("\n--- Testing Vector Store Retrieval ---")
+    collection_name = get_collection_name()
+
     # First, try a direct query to Qdrant to verify data exists
     try:
-        results = qdrant_client.scroll(collection_name=collection_name, limit=1)
+        results = get_qdrant_client().scroll(collection_name=collection_name, limit=1)
         points, next_offset = results
         if points:
             point = points[0]
-            print("✅ Data exists in Qdrant collection!")
+            log("✅ Data exists in Qdrant collection!")
             if point.payload and 'text' in point.payload:
-                print(f"Sample text: {point.payload['text'][:100]}...")
-            print(f"Payload structure: {list(point.payload.keys()) if point.payload else None}")
+                log(f"Sample text: {point.payload['text'][:100]}...")
+            log(f"Payload structure: {list(point.payload.keys()) if point.payload else None}")
         else:
-            print("❌ No points found in the Qdrant collection.")
+            log("❌ No points found in the Qdrant collection.")
             return False
     except Exception as e:
-        print(f"❌ Error accessing Qdrant directly: {str(e)}")
+        log(f"❌ Error accessing Qdrant directly: {str(e)}")
         return False
-    
+
     # Now try retrieving through the LangChain vector store
-    print("\n--- Testing LangChain Vector Store Integration ---")
+    log("\n--- Testing LangChain Vector Store Integration ---")
     try:
-        # Create a test query vector
+        # Search through the vector store (the query embedding goes through the embedding cache)
         query = "test query"
-        query_vector = embedding_manager.embed_query(query)
-        
-        # Try to search using the vector store
-        docs = vector_store.similarity_search(query, k=1)
-        
+        docs = get_vector_store().similarity_search(query, k=1)
+
         if docs:
-            print("✅ Successfully retrieved a document via LangChain!")
-            print(f"Document content: {docs[0].page_content[:100]}...")
+            log("✅ Successfully retrieved a document via LangChain!")
+            log(f"Document content: {docs[0].page_content[:100]}...")
             return True
         else:
-            print("❌ No documents returned from LangChain vector store.")
+            log("❌ No documents returned from LangChain vector store.")
             return False
     except Exception as e:
-        print(f"❌ Error with LangChain vector store: {str(e)}")
         import traceback
-        traceback.print_exc()
+        log(f"❌ Error with LangChain vector store: {str(e)}")
+        log(traceback.format_exc())
         return False
 
 # Run the chat loop if this script is executed directly
 if __name__ == "__main__":
-    # First verify data can be retrieved
-    data_available = verify_data_retrieval()
-    if data_available:
-        print("\nStarting chat interface...\n")
-        chat_loop()
-    else:
-        print("\nWARNING: Could not retrieve data from the vector store.")
-        user_choice = input("Do you want to continue with the chat interface anyway? (y/n): ")
-        if user_choice.lower() in ["y", "yes"]:
+    startup_report = "--startup-report" in sys.argv
+    if "--eager" in sys.argv:
+        # Build and verify everything before the prompt appears
+        data_available = verify_data_retrieval()
+        if data_available:
             print("\nStarting chat interface...\n")
-            chat_loop()
+            chat_loop(startup_report)
         else:
-            print("Exiting. Please check your data and try again.")
\ No newline at end of file
+            print("\nWARNING: Could not retrieve data from the vector store.")
+            user_choice = input("Do you want to continue with the chat interface anyway? (y/n): ")
+            if user_choice.lower() in ["y", "yes"]:
+                print("\nStarting chat interface...\n")
+                chat_loop(startup_report)
+            else:
+                print("Exiting. Please check your data and try again.")
+    else:
+        # Accept input right away; clients are warmed up and checked in the background
+        start_background_check()
+        print("\nStarting chat interface...\n")
+        chat_loop(startup_report)
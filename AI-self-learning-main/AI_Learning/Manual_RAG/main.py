@@ -3,64 +3,62 @@ import os
 from Reader.main import DocumentLoader
 from Splitter.main import GetTextSplitters
 from Loader.main import QdrantClientManager
+from LocalIndex.main import LocalIndexManager
+from LexicalIndex.main import LexicalIndex
 
 # Import embedding manager class
 from Embedding.main import EmbeddingManager
 from utils.llm_query_service import LLMQueryService
+from utils.semantic_cache import SemanticAnswerCache
+import llm_clients
 
-# Get the loaded documents in text format
-doc_loader = DocumentLoader("company_employees.pdf", "https://modelcontextprotocol.io/docs/getting-started/intro")
-pdf_text, web_text = doc_loader.load_all()
-print("completed loading documents")
-
-# Split the web text into chunks
-text_splitter = GetTextSplitters(doc=pdf_text, chunk_size=40)
-splitted_by_space = text_splitter.splitByCharacterTextSplitter()
-print("completed splitting text into chunks")
+from Pipeline.main import IngestionPipeline
 
-# Generate embeddings for each chunk using EmbeddingManager
+# Stream the PDF through load -> split -> embed -> upload; all stages run concurrently
+doc_loader = DocumentLoader("company_employees.pdf", "https://modelcontextprotocol.io/docs/getting-started/intro")
+text_splitter = GetTextSplitters(chunk_size=40)
 embedding_manager = EmbeddingManager()
-vectors = embedding_manager.embed_documents(splitted_by_space)
-# print("completed generating embeddings for chunks")
-
-# Prepare data for Qdrant (id, vector, payload)
-
-# Example meta-data: source, chunk_index, length
-data = [
-    {
-        "id": idx,
-        "vector": vec,
-        "payload": {
-            "text": text,
-            "meta": {
-                "source": "pdf_text",
-                "chunk_index": idx,
-                "length": len(text)
-            }
-        }
-    }
-    for idx, (vec, text) in enumerate(zip(vectors, splitted_by_space))
-]
-
-# Initialize the QdrantClient and upload the embeddings to Qdrant
-qdrant_client = QdrantClientManager.initialize_client()
 collection_name = "Employee_data"
-QdrantClientManager.create_collection(collection_name, vector_size=len(vectors[0]))
-QdrantClientManager.upload_data(collection_name, data)
+# VECTOR_BACKEND=local keeps vectors in an in-process NumPy index instead of a Qdrant server
+vector_store = LocalIndexManager if os.getenv("VECTOR_BACKEND") == "local" else QdrantClientManager
+# BM25 index built next to the vectors, so exact names and identifiers are found too
+lexical_index = LexicalIndex(f".lexical_index/{collection_name}.sqlite")
+# Answers to near-identical questions over the same context are served without an LLM call
+answer_cache = SemanticAnswerCache(".answer_cache.sqlite", threshold=0.95)
+# Exact replays of a temperature-0 request are answered from disk
+llm_clients.install_response_cache(".llm_response_cache.sqlite")
+
+# Example meta-data stored with each point: source, chunk_index, length
+pipeline = IngestionPipeline(doc_loader, text_splitter, embedding_manager, collection_name,
+                             source="pdf_text", vector_store=vector_store, lexical_index=lexical_index,
+                             answer_cache=answer_cache)
+pipeline.run()
+print("completed loading, splitting, embedding and uploading documents")
 
 # Example search query
 query = "What do you know about httpstreamable MCP servers?, help me write a mcp server with fastapi , give me detailed answer"
 query_vector = embedding_manager.embed_query(query)
-search_results = QdrantClientManager.search(collection_name, query_vector, limit=5)
+search_results = vector_store.hybrid_search(collection_name, query_vector, query, lexical_index, limit=5)
 
 # print(f"Search results for query '{query}':")
 # for result in search_results:
 #     print(f"ID: {result.id}, Score: {result.score}, Payload: {result.payload}")
 
-llm_service = LLMQueryService()
-llm_response = llm_service.query_llm(query, search_results)
+# Temperature 0 makes the answer reproducible, so the LLM response cache can replay it
+llm_service = LLMQueryService(answer_cache=answer_cache, temperature=0)
 print("LLM Response:")
-print(llm_response)
+# Tokens are printed as they arrive instead of after the whole completion
+for token in llm_service.stream_llm(query, search_results, query_vector=query_vector, collection_name=collection_name):
+    print(token, end="", flush=True)
+print()
+latency = llm_service.last_latency
+print(f"Time to first token: {latency['ttft']:.2f}s, total: {latency['total']:.2f}s")
+report = llm_service.last_context_report
+if report:
+    print(f"Context: {report['segments']} segments from {report['chunks']} chunks, "
+          f"{report['tokens_after']} prompt tokens ({report['tokens_saved']} saved)")
+print(f"Answer cache: {answer_cache.stats()}")
+print(f"LLM response cache: {llm_clients.response_cache_stats()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+import hashlib
+import os
+import sys
+
+import pytest
+
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# Manual_RAG packages, and the shared modules one level up (llm_clients.py, llm_response_cache.py)
+for path in (root, os.path.dirname(root)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+class FakeEmbeddings:
+    """
+    Stands in for AzureOpenAIEmbeddings: deterministic vectors derived from the text,
+    with every embedded text recorded.
+    """
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.embedded = []
+
+    def _vector(self, text):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        # Multiples of 1/128 survive the cache's float32 round trip exactly
+        return [(b - 128) / 128 for b in digest[:self.dim]]
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+@pytest.fixture
+def embedding_manager(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_MODEL", "test-embedding")
+    monkeypatch.setenv("EMBEDDING_OPENAI_API_BASE", "https://example.invalid/")
+    monkeypatch.setenv("EMBEDDING_OPENAI_API_KEY", "test")
+    monkeypatch.setenv("EMBEDDING_OPENAI_API_VERSION", "2024-02-01")
+    from Embedding.main import EmbeddingManager
+    manager = EmbeddingManager(batch_size=4, cache_path=str(tmp_path / "embeddings.sqlite"))
+    manager.embeddings = FakeEmbeddings()
+    return manager
+
+
+def write_pdf(path, page_texts):
+    """
+    Writes a minimal PDF with one line of Helvetica text per page.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    return lambda name, page_texts: write_pdf(tmp_path / name, page_texts)
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pytest
+
+from LocalIndex.main import LocalIndexManager
+from utils.async_benchmark import FakeAsyncClient, FakeEmbeddings, FakeVectorStore
+from utils.context_assembly import ContextAssembler
+from utils.llm_query_service import LLMQueryService, QueryResult
+
+DELAY = 0.05
+
+
+class InFlight:
+    """
+    Wraps an async function and records how many calls were running at once.
+    """
+    def __init__(self, function):
+        self.function = function
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            return await self.function(*args, **kwargs)
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture(autouse=True)
+def word_counts(monkeypatch):
+    # Word counts stand in for tiktoken, which needs to download its encodings
+    monkeypatch.setattr(ContextAssembler, "count_tokens", lambda self, text: len(text.split()))
+
+
+def test_aquery_overlaps_concurrent_questions(monkeypatch):
+    monkeypatch.setattr(FakeVectorStore, "delay", DELAY)
+    client = FakeAsyncClient(DELAY)
+    client.chat.completions.create = completions = InFlight(client.chat.completions.create)
+    service = LLMQueryService(client=object(), async_client=client)
+    questions = [f"Question {i} about the handbook?" for i in range(20)]
+
+    async def run():
+        return await asyncio.gather(*(service.aquery(q, FakeEmbeddings(DELAY), FakeVectorStore, "handbook", limit=3)
+                                      for q in questions))
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+
+    assert all(isinstance(result, QueryResult) and result.answer == "A generated answer." for result in results)
+    assert all(result.context_report["chunks"] == 3 for result in results)
+    assert completions.peak == len(questions)
+    # One at a time: 20 x (embed + search + completion) = 3 s
+    assert elapsed < len(questions) * 3 * DELAY / 4
+
+
+def test_aembed_query_and_asearch_run_concurrently(tmp_path, embedding_manager, monkeypatch):
+    monkeypatch.setattr(LocalIndexManager, "_path", None)
+    monkeypatch.setattr(LocalIndexManager, "_collections", {})
+    LocalIndexManager.initialize_client(str(tmp_path / "index"))
+    texts = [f"policy {i}" for i in range(50)]
+    LocalIndexManager.create_collection("handbook", vector_size=8)
+    LocalIndexManager.upload_data("handbook", [
+        {"id": i, "vector": vector, "payload": {"text": text}}
+        for i, (text, vector) in enumerate(zip(texts, embedding_manager.embed_documents(texts)))
+    ])
+
+    fake = embedding_manager.embeddings
+    embed_query = fake.aembed_query
+
+    async def slow_embed_query(text):
+        await asyncio.sleep(DELAY)
+        return await embed_query(text)
+
+    fake.aembed_query = embeds = InFlight(slow_embed_query)
+    questions = [f"question {i}" for i in range(10)]
+
+    async def search(question):
+        vector = await embedding_manager.aembed_query(question)
+        return vector, await LocalIndexManager.asearch("handbook", vector, limit=3)
+
+    async def run():
+        return await asyncio.gather(*(search(q) for q in questions))
+
+    results = asyncio.run(run())
+
+    assert embeds.peak == len(questions)
+    for vector, found in results:
+        expected = LocalIndexManager.search("handbook", vector, limit=3)
+        assert [point.id for point in found] == [point.id for point in expected]
+    # Cached: the second round does not reach the deployment
+    asyncio.run(run())
+    assert len(fake.embedded) == len(texts) + len(questions)
@@ -0,0 +1,64 @@
+from collections import namedtuple
+
+import pytest
+
+from Splitter.fast_splitter import OffsetTextSplitter
+from utils.context_assembly import ContextAssembler
+
+ScoredPoint = namedtuple("ScoredPoint", ["id", "score", "payload"])
+
+PAGE = "\n".join(f"Line {i}: employees in team {i % 3} report to manager {i % 5}." for i in range(12))
+
+
+@pytest.fixture
+def assembler(monkeypatch):
+    # Word counts stand in for tiktoken, which needs to download its encodings
+    monkeypatch.setattr(ContextAssembler, "count_tokens", lambda self, text: len(text.split()))
+    return ContextAssembler(max_tokens=10000)
+
+
+def chunk_points(text, page=0, with_offsets=True):
+    splitter = OffsetTextSplitter(chunk_size=120, chunk_overlap=60, separator="\n")
+    points = []
+    for index, (start, end) in enumerate(splitter.iter_offsets(text)):
+        meta = {"source": "handbook", "chunk_index": index}
+        if with_offsets:
+            meta.update(page=page, start=start, end=end)
+        points.append(ScoredPoint(id=index, score=1.0 - index / 100, payload={"text": text[start:end], "meta": meta}))
+    return points
+
+
+def test_overlapping_chunks_merge_back_into_the_page(assembler):
+    points = chunk_points(PAGE)
+    assert len(points) > 3
+    context, report = assembler.assemble(points)
+    assert context == PAGE
+    assert report["segments"] == 1
+
+
+def test_repeated_text_without_real_overlap_is_kept(assembler):
+    # Two consecutive chunks where the second starts with the words the first ends with,
+    # but the offsets show they do not overlap: nothing may be deleted
+    first = {"source": "faq", "chunk_index": 0, "page": 0, "start": 0, "end": 20}
+    second = {"source": "faq", "chunk_index": 1, "page": 0, "start": 21, "end": 41}
+    points = [
+        ScoredPoint(id="a", score=0.9, payload={"text": "Ask HR. Ask HR.", "meta": first}),
+        ScoredPoint(id="b", score=0.8, payload={"text": "Ask HR. Then wait.", "meta": second}),
+    ]
+    context, _ = assembler.assemble(points)
+    assert context == "Ask HR. Ask HR.\nAsk HR. Then wait."
+
+
+def test_chunks_without_offsets_use_bounded_text_match(assembler, monkeypatch):
+    points = chunk_points(PAGE, with_offsets=False)
+    assert assembler.assemble(points)[0] != PAGE  # No offsets and no chunk_overlap: text kept as is
+
+    bounded = ContextAssembler(max_tokens=10000, chunk_overlap=60)
+    assert bounded.assemble(points)[0].replace("\n", " ") == PAGE.replace("\n", " ")
+
+    points = [
+        ScoredPoint(id="a", score=0.9, payload={"text": "policy one two three", "meta": {"source": "s", "chunk_index": 0}}),
+        ScoredPoint(id="b", score=0.8, payload={"text": "one two three four", "meta": {"source": "s", "chunk_index": 1}}),
+    ]
+    # A repeat longer than chunk_overlap is not treated as overlap
+    assert ContextAssembler(chunk_overlap=5).assemble(points)[0] == "policy one two three\none two three four"
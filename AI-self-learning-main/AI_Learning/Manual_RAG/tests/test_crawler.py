@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import Reader.crawler
+from Reader.crawler import WebCrawler
+
+SITE = {
+    "https://docs.example/": ["https://docs.example/a", "https://docs.example/broken", "https://docs.example/b"],
+    "https://docs.example/a": [],
+    "https://docs.example/b": [],
+}
+
+
+async def fake_fetch(self, client, cache, semaphore, url):
+    await asyncio.sleep(0)
+    if url.endswith("broken"):
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+    return {"source": url, "text": url, "status": 200}, SITE[url]
+
+
+def test_crawl_survives_page_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(WebCrawler, "_fetch", fake_fetch)
+    # One worker: if the error escaped, nobody would be left to drain the frontier
+    crawler = WebCrawler(cache_path=str(tmp_path / "web.sqlite"), max_connections=1)
+
+    records = asyncio.run(asyncio.wait_for(crawler.acrawl(["https://docs.example/"]), timeout=5))
+
+    assert sorted(r["source"] for r in records) == sorted(SITE)
+    assert crawler.stats["errors"] == 1
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """
+    Serves `pages` (path -> HTML) with an ETag and answers 304 when If-None-Match matches.
+    """
+    pages = {}
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        html = self.pages.get(self.path)
+        if html is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = '"' + hashlib.sha1(html.encode("utf-8")).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    handler = type("Handler", (SiteHandler,), {"pages": {}, "requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", handler
+    server.shutdown()
+    server.server_close()
+
+
+def test_unchanged_pages_are_revalidated_without_reparsing(tmp_path, site, monkeypatch):
+    base, handler = site
+    handler.pages.update({
+        "/": '<a href="/a">A</a> <a href="/b#part">B</a>',
+        "/a": "<p>Page A</p>",
+        "/b": "<p>Page B</p>",
+    })
+    crawler = WebCrawler(cache_path=str(tmp_path / "web.sqlite"))
+
+    first = crawler.crawl([base + "/"])
+    assert sorted((r["source"], r["status"]) for r in first) == [
+        (base + "/", 200), (base + "/a", 200), (base + "/b", 200)]
+
+    parse_html = Reader.crawler._parse_html
+    parsed = []
+    monkeypatch.setattr(Reader.crawler, "_parse_html", lambda url, html: parsed.append(url) or parse_html(url, html))
+    second = crawler.crawl([base + "/"])
+
+    assert parsed == []
+    assert crawler.stats == {"fetched": 0, "not_modified": 3, "errors": 0}
+    assert sorted((r["source"], r["text"]) for r in second) == sorted((r["source"], r["text"]) for r in first)
+    # Every request of the second crawl was conditional
+    assert all(etag for _, etag in handler.requests[3:]) and len(handler.requests) == 6
+
+
+def test_concurrent_workers_stop_at_max_pages(tmp_path, site):
+    base, handler = site
+    handler.pages["/"] = " ".join(f'<a href="/page{i}">{i}</a>' for i in range(30))
+    handler.pages.update({f"/page{i}": f"<p>Page {i}</p>" for i in range(30)})
+    crawler = WebCrawler(cache_path=str(tmp_path / "web.sqlite"), max_connections=10, max_pages=5)
+
+    records = crawler.crawl([base + "/"])
+
+    assert len(records) == 5
+    assert len(handler.requests) == 5
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from conftest import FakeEmbeddings
+
+
+class SlowFakeEmbeddings(FakeEmbeddings):
+    """
+    Records the size of every batch and how many were in flight at once. Earlier batches
+    take longer, so the batches finish in reverse order.
+    """
+    def __init__(self, delays):
+        super().__init__()
+        self.delays = list(delays)
+        self.batch_sizes = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            delay = self.delays[len(self.batch_sizes)]
+            self.batch_sizes.append(len(texts))
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(delay)
+        with self._lock:
+            self.running -= 1
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def manager(embedding_manager):
+    embedding_manager.cache = None
+    embedding_manager.max_workers = 3
+    return embedding_manager
+
+
+def test_documents_are_batched_and_kept_in_order(manager):
+    texts = [f"chunk {i}" for i in range(10)]
+    manager.embeddings = fake = SlowFakeEmbeddings(delays=[0.15, 0.1, 0.05])
+
+    vectors = manager.embed_documents(texts)
+
+    assert sorted(fake.batch_sizes) == [2, 4, 4]
+    assert fake.peak == 3
+    # Batches finished last to first, yet every vector belongs to its own text
+    assert fake.embedded[:2] == ["chunk 8", "chunk 9"]
+    assert vectors == [FakeEmbeddings()._vector(text) for text in texts]
+
+
+def test_last_stats_report_throughput(manager):
+    manager.embeddings = fake = SlowFakeEmbeddings(delays=[0.1, 0.1, 0.1])
+
+    manager.embed_documents([f"chunk {i}" for i in range(10)])
+
+    stats = manager.last_stats
+    assert (stats["chunks"], stats["batches"]) == (10, 3)
+    assert fake.peak == 3 and stats["seconds"] >= 0.1
+    assert stats["chunks_per_second"] == pytest.approx(10 / stats["seconds"])
+
+
+def test_failed_batch_is_retried(manager):
+    manager.retry_backoff = 0
+    fake = manager.embeddings
+    embed_documents = fake.embed_documents
+    failures = []
+
+    def flaky(texts):
+        if not failures:
+            failures.append(texts)
+            raise ConnectionError("reset by peer")
+        return embed_documents(texts)
+
+    fake.embed_documents = flaky
+
+    vectors = manager.embed_documents(["alpha", "beta"])
+
+    assert failures == [["alpha", "beta"]]
+    assert vectors == [fake._vector("alpha"), fake._vector("beta")]
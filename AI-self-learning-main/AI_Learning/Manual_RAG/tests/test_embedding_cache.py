@@ -0,0 +1,41 @@
+import asyncio
+
+from Embedding.cache import EmbeddingCache
+
+
+def test_round_trip_and_counters(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+    key = EmbeddingCache.make_key("deployment", "hello")
+    assert key != EmbeddingCache.make_key("other-deployment", "hello")
+
+    cache.put_many([(key, [0.5, -1.25, 3.0])])
+    assert cache.get_many([key, key, "missing"]) == {key: [0.5, -1.25, 3.0]}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (2, 1, 1, 12)
+    cache.close()
+
+    reopened = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+    assert reopened.get_many([key]) == {key: [0.5, -1.25, 3.0]}
+
+
+def test_least_recently_used_vectors_are_evicted(tmp_path):
+    # Room for two 4-dimensional float32 vectors
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"), max_bytes=32)
+    cache.put_many([("a", [1.0] * 4)])
+    cache.put_many([("b", [2.0] * 4)])
+    cache.get_many(["a"])
+    cache.put_many([("c", [3.0] * 4)])
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+
+def test_manager_embeds_only_new_texts(embedding_manager):
+    texts = ["alpha", "beta", "alpha", "gamma"]
+    first = embedding_manager.embed_documents(texts)
+    assert embedding_manager.embeddings.embedded == ["alpha", "beta", "gamma"]
+
+    second = embedding_manager.embed_documents(["gamma", "delta", "alpha"])
+    assert embedding_manager.embeddings.embedded[3:] == ["delta"]
+    assert second[0] == first[3] and second[2] == first[0]
+
+    assert asyncio.run(embedding_manager.aembed_query("beta")) == first[1]
+    assert embedding_manager.embeddings.embedded[4:] == []
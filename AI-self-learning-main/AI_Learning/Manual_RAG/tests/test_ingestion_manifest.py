@@ -0,0 +1,104 @@
+import pytest
+
+from LexicalIndex.main import LexicalIndex
+from LocalIndex.main import LocalIndexManager
+from Pipeline.main import IngestionPipeline
+from Pipeline.manifest import ChunkManifest, chunk_hash, chunk_id
+from Reader.main import DocumentLoader
+from Splitter.main import GetTextSplitters
+
+PAGES = [
+    "Vacation requests go to your manager.\nApproved requests are logged in the HR portal.",
+    "Expenses above 500 EUR need a receipt.\nReceipts are uploaded within 30 days.",
+    "Remote work is allowed two days a week.\nTeams agree on their office days.",
+]
+
+
+class PageLoader:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def iter_pdf_pages(self):
+        yield from self.pages
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(LocalIndexManager, "_path", None)
+    monkeypatch.setattr(LocalIndexManager, "_collections", {})
+    LocalIndexManager.initialize_client(str(tmp_path / "index"))
+    return LocalIndexManager
+
+
+def ingest(pages, embedding_manager, store, lexical_index=None):
+    pipeline = IngestionPipeline(PageLoader(pages), GetTextSplitters(chunk_size=60, chunk_overlap=20),
+                                 embedding_manager, "handbook", vector_store=store, lexical_index=lexical_index)
+    return pipeline.run(), pipeline
+
+
+def stored_payloads(store):
+    collection = store._get("handbook")
+    rows = [row for row in range(collection.count) if collection._live[row]]
+    return dict(collection.payloads(rows).values())
+
+
+def stored_texts(store):
+    return sorted(payload["text"] for payload in stored_payloads(store).values())
+
+
+def test_chunk_ids_are_content_derived():
+    first = chunk_id("pdf_text", chunk_hash("same text"))
+    assert first == chunk_id("pdf_text", chunk_hash("same text"))
+    assert first != chunk_id("pdf_text", chunk_hash("same text"), occurrence=1)
+    assert first != chunk_id("other_source", chunk_hash("same text"))
+
+
+def test_rerun_uploads_only_changed_chunks(tmp_path, embedding_manager, store):
+    lexical_index = LexicalIndex(str(tmp_path / "bm25.sqlite"))
+    uploaded, _ = ingest(PAGES, embedding_manager, store, lexical_index)
+    assert uploaded > 0
+    embedded = len(embedding_manager.embeddings.embedded)
+
+    # Unchanged input: nothing embedded or uploaded
+    assert ingest(PAGES, embedding_manager, store, lexical_index)[0] == 0
+    assert len(embedding_manager.embeddings.embedded) == embedded
+
+    # One page edited, one page dropped: only the new chunk is uploaded, the dropped ones deleted
+    edited = [PAGES[0], "Expenses above 800 EUR need a receipt.\nReceipts are uploaded within 30 days."]
+    uploaded, _ = ingest(edited, embedding_manager, store, lexical_index)
+    expected = sorted(GetTextSplitters(chunk_size=60, chunk_overlap=20).iter_chunks(edited))
+    assert uploaded == 1
+    assert stored_texts(store) == expected
+    assert {point_id for point_id, _ in lexical_index.search("remote work", limit=10)} == set()
+
+    manifest = ChunkManifest("handbook", "pdf_text").load()
+    assert sorted(entry["page"] for entry in manifest.values()) == sorted(
+        page for page, _, _, _ in GetTextSplitters(chunk_size=60, chunk_overlap=20).iter_chunk_spans(edited))
+
+
+def test_moved_chunks_get_their_position_updated(embedding_manager, store):
+    ingest(PAGES, embedding_manager, store)
+    # The same chunks, one page later: no re-upload, only new positions in the payload
+    pages = ["A new first page."] + PAGES
+    uploaded, pipeline = ingest(pages, embedding_manager, store)
+    assert uploaded == 1
+    assert pipeline._moved
+
+    payloads = stored_payloads(store)
+    for point_id in pipeline._moved:
+        meta = payloads[point_id]["meta"]
+        assert pages[meta["page"]][meta["start"]:meta["end"]] == payloads[point_id]["text"]
+
+
+def test_pdf_pages_read_on_process_pool(make_pdf, embedding_manager, store):
+    pages = [f"Policy {i} applies to every employee." for i in range(30)]
+    pipeline = IngestionPipeline(DocumentLoader(make_pdf("handbook.pdf", pages)),
+                                 GetTextSplitters(chunk_size=60, chunk_overlap=20), embedding_manager, "handbook",
+                                 vector_store=store, pdf_workers=2)
+
+    assert pipeline.run() == 30
+    assert stored_texts(store) == sorted(pages)
+    manifest = ChunkManifest("handbook", "pdf_text").load()
+    # Pages arrive in order, so chunk indexes follow the page numbers
+    assert sorted((entry["chunk_index"], entry["page"]) for entry in manifest.values()) == [(i, i) for i in range(30)]
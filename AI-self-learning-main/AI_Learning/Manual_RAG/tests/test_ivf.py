@@ -0,0 +1,40 @@
+import numpy as np
+
+from LocalIndex.benchmark import make_vectors
+from LocalIndex.main import LocalCollection
+
+
+def recall(rows, expected):
+    return np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(rows.tolist(), expected.tolist())])
+
+
+def test_ivf_recall_and_incremental_adds(tmp_path):
+    rng = np.random.default_rng(3)
+    vectors = make_vectors(6000, 64, 32, rng)
+    collection = LocalCollection(str(tmp_path), 64, index="ivf", nlist=32, nprobe=8, train_size=4000)
+    collection.upsert([{"id": i, "vector": v} for i, v in enumerate(vectors[:4000])])
+    collection.upsert([{"id": i, "vector": v} for i, v in enumerate(vectors[4000:], start=4000)])
+    # Re-upserting moves points between lists
+    collection.upsert([{"id": i, "vector": vectors[i + 1]} for i in range(100)])
+    assert collection._ivf.trained
+    assert sum(len(rows) for rows in collection._ivf._lists) == 6000
+
+    queries = LocalCollection.normalize(vectors[rng.choice(6000, 30)] + 0.3 * rng.normal(size=(30, 64)))
+    expected, _ = collection.top_k(queries, 10, exact=True)
+    rows, _ = collection.top_k(queries, 10)
+    assert recall(rows, expected) >= 0.9
+
+
+def test_ivf_reopen_uses_trained_nlist(tmp_path):
+    rng = np.random.default_rng(4)
+    vectors = rng.normal(size=(50, 16)).astype(np.float32)
+    collection = LocalCollection(str(tmp_path), 16, index="ivf", nlist=256, train_size=50)
+    collection.upsert([{"id": i, "vector": v} for i, v in enumerate(vectors)])
+    assert collection._ivf.nlist == 50
+    collection.close()
+
+    reopened = LocalCollection(str(tmp_path), 16, index="ivf", nlist=256, train_size=50)
+    assert reopened._ivf.nlist == 50
+    assert sum(len(rows) for rows in reopened._ivf._lists) == 50
+    rows, _ = reopened.top_k(LocalCollection.normalize(vectors[:3]), 1)
+    assert rows[:, 0].tolist() == [0, 1, 2]
@@ -0,0 +1,89 @@
+import math
+import sqlite3
+from collections import Counter
+
+import pytest
+
+from LexicalIndex.main import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+DOCS = {
+    "a": "the cat sat on the mat",
+    "b": "the dog chased the cat",
+    "c": "dogs and cats living together",
+    "d": "get_current_weather returns the weather for a location",
+    "e": "the weather in Boston is cold",
+}
+
+
+def reference_bm25(docs, query, k1=1.5, b=0.75):
+    tokens = {key: tokenize(text) for key, text in docs.items()}
+    avg_length = sum(len(t) for t in tokens.values()) / len(tokens)
+    scores = {}
+    for key, doc in tokens.items():
+        tf = Counter(doc)
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in t for t in tokens.values())
+            if not tf[term]:
+                continue
+            idf = math.log(1 + (len(tokens) - df + 0.5) / (df + 0.5))
+            score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * len(doc) / avg_length))
+        if score:
+            scores[key] = score
+    return scores
+
+
+def assert_matches_reference(index, docs, query):
+    expected = reference_bm25(docs, query)
+    results = index.search(query, limit=10)
+    assert [point_id for point_id, _ in results] == sorted(expected, key=expected.get, reverse=True)
+    for point_id, score in results:
+        assert score == pytest.approx(expected[point_id], rel=1e-5)
+
+
+@pytest.mark.parametrize("query", ["cat", "the weather", "get_current_weather", "dog cat mat"])
+def test_search_matches_reference_bm25(tmp_path, query):
+    index = LexicalIndex(str(tmp_path / "bm25.sqlite"), flush_every=2)
+    for point_id, text in DOCS.items():
+        index.add(point_id, text)
+    assert_matches_reference(index, DOCS, query)
+
+
+def test_reindex_and_delete_are_compacted_away(tmp_path):
+    path = str(tmp_path / "bm25.sqlite")
+    index = LexicalIndex(path, flush_every=1, max_segments=4)
+    docs = dict(DOCS)
+    for point_id, text in docs.items():
+        index.add(point_id, text)
+    docs["a"] = "a mat without any animals"
+    index.add("a", docs["a"])
+    index.delete(["b"])
+    del docs["b"]
+    assert_matches_reference(index, docs, "cat mat dog")
+
+    index.compact()
+    assert index.count == len(docs)
+    assert_matches_reference(index, docs, "cat mat dog")
+    index.close()
+
+    reopened = LexicalIndex(path)
+    assert reopened.count == len(docs)
+    assert_matches_reference(reopened, docs, "cat mat dog the weather")
+    segments = sqlite3.connect(path).execute("SELECT COUNT(DISTINCT segment) FROM postings").fetchone()[0]
+    assert segments == 1
+
+
+def test_flushes_append_segments_until_merged(tmp_path):
+    path = str(tmp_path / "bm25.sqlite")
+    index = LexicalIndex(path, flush_every=1, max_segments=3)
+    for i in range(10):
+        index.add(i, f"shared term{i}")
+        segments = sqlite3.connect(path).execute("SELECT COUNT(DISTINCT segment) FROM postings").fetchone()[0]
+        assert segments <= 3
+    assert len(index.search("shared", limit=20)) == 10
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+    assert [point_id for point_id, _ in fused] == ["a", "c", "b"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
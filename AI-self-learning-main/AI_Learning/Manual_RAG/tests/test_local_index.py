@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, VectorParams
+
+from Loader.main import to_qdrant_filter
+from LocalIndex.benchmark import make_vectors
+from LocalIndex.main import LocalCollection
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(1)
+    vectors = make_vectors(8000, 256, 32, rng)
+    # Queries are noisy copies of stored points, like a question close to one chunk
+    picks = rng.choice(len(vectors), 40, replace=False)
+    queries = LocalCollection.normalize(vectors[picks] + 0.5 * rng.normal(size=(40, 256)).astype(np.float32))
+    return vectors, queries
+
+
+def build(path, vectors, quantization):
+    path.mkdir(exist_ok=True)
+    collection = LocalCollection(str(path), vectors.shape[1], quantization=quantization)
+    collection.upsert([{"id": i, "vector": vector} for i, vector in enumerate(vectors)])
+    return collection
+
+
+@pytest.mark.parametrize("quantization", ["int8", "binary"])
+def test_quantized_search_matches_exact(tmp_path, data, quantization):
+    vectors, queries = data
+    exact = build(tmp_path / "exact", vectors, None)
+    quantized = build(tmp_path / quantization, vectors, quantization)
+
+    expected, _ = exact.top_k(queries, 10)
+    rows, scores = quantized.top_k(queries, 10)
+
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(rows.tolist(), expected.tolist())])
+    assert recall >= 0.9
+    # Rescored with the original vectors, so the scores are exact cosine similarities
+    np.testing.assert_allclose(scores[:, 0], np.sum(vectors[rows[:, 0]] / np.linalg.norm(vectors[rows[:, 0]], axis=1,
+                               keepdims=True) * queries, axis=1), rtol=1e-4)
+
+
+def test_binary_scores_count_matching_bits(tmp_path):
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(size=(100, 72)).astype(np.float32)  # 9 bytes: not a whole number of 64-bit words
+    collection = build(tmp_path, vectors, "binary")
+    queries = LocalCollection.normalize(rng.normal(size=(20, 72)).astype(np.float32))
+
+    scores = collection._binary_scores(queries, slice(0, 100))
+
+    expected = ((queries[:, None, :] > 0) == (vectors[None, :, :] > 0)).sum(axis=2)
+    np.testing.assert_array_equal(scores, expected)
+
+
+@pytest.fixture
+def tagged_points():
+    rng = np.random.default_rng(2)
+    sources = ["pdf_text", "web_text", "pdf_table"]
+    return [{"id": i, "vector": rng.normal(size=16).tolist(),
+             "payload": {"text": f"chunk {i}", "meta": {"source": sources[i % 3], "chunk_index": i % 7,
+                                                        "length": 100 + 37 * i % 500}}}
+            for i in range(60)]
+
+
+@pytest.mark.parametrize("query_filter", [
+    {"meta.source": "pdf_text"},
+    {"meta.source": ["web_text", "pdf_table"], "meta.chunk_index": {"gte": 2, "lt": 5}},
+    {"meta.chunk_index": 3, "meta.length": {"gt": 250}},
+    {"meta.source": "missing"},
+])
+def test_filters_agree_with_qdrant(tmp_path, tagged_points, query_filter):
+    local = LocalCollection(str(tmp_path), 16)
+    local.upsert(tagged_points)
+    qdrant = QdrantClient(location=":memory:")
+    qdrant.create_collection("chunks", vectors_config=VectorParams(size=16, distance="Cosine"))
+    qdrant.upsert("chunks", [PointStruct(**point) for point in tagged_points])
+
+    found, _ = qdrant.scroll("chunks", scroll_filter=to_qdrant_filter(query_filter), limit=100)
+
+    # Ids were inserted in order, so rows and ids coincide
+    assert local.filter_rows(query_filter).tolist() == sorted(point.id for point in found)
+
+
+def test_match_on_range_only_field_is_rejected(tmp_path, tagged_points):
+    local = LocalCollection(str(tmp_path), 16)
+    local.upsert(tagged_points)
+
+    for condition in (137, [100, 137]):
+        with pytest.raises(ValueError, match="range-only"):
+            local.filter_rows({"meta.length": condition})
+    assert len(local.filter_rows({"meta.length": {"gte": 137, "lte": 137}})) == 1
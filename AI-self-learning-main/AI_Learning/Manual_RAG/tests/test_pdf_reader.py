@@ -0,0 +1,26 @@
+from Reader.main import DocumentLoader
+
+
+def page_texts(name, count):
+    return [f"{name} page {i}" for i in range(count)]
+
+
+def test_ordered_records_follow_page_order(make_pdf):
+    path = make_pdf("handbook.pdf", page_texts("handbook", 40))
+
+    records = list(DocumentLoader(path).iter_pdf_page_records(max_workers=2, pages_per_task=3, ordered=True))
+
+    assert [record["page"] for record in records] == list(range(40))
+    assert [record["text"].strip() for record in records] == page_texts("handbook", 40)
+    assert {record["source"] for record in records} == {path}
+
+
+def test_unordered_records_cover_every_page_of_every_file(make_pdf):
+    first = make_pdf("first.pdf", page_texts("first", 7))
+    second = make_pdf("second.pdf", page_texts("second", 12))
+
+    records = DocumentLoader().iter_pdf_page_records([first, second], max_workers=3, pages_per_task=2)
+
+    found = {(record["source"], record["page"]): record["text"].strip() for record in records}
+    assert found == {**{(first, i): f"first page {i}" for i in range(7)},
+                     **{(second, i): f"second page {i}" for i in range(12)}}
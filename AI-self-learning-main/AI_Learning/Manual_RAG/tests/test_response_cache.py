@@ -0,0 +1,128 @@
+import asyncio
+import warnings
+from types import SimpleNamespace
+
+import pytest
+
+from llm_response_cache import CachedClient, ResponseCache, langchain_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_store_round_trip(cache):
+    key = cache.make_key("chat.completions", {"model": "gpt", "messages": [{"role": "user", "content": "hi"}]})
+    assert cache.get(key) is None
+    cache.put(key, '{"answer": 42}', 1.5)
+    assert cache.get(key) == '{"answer": 42}'
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["latency_saved_seconds"] == pytest.approx(1.5)
+
+
+def test_langchain_cache_round_trip(cache):
+    from langchain_core.outputs import ChatGeneration, Generation
+    from langchain_core.messages import AIMessage
+
+    lc_cache = langchain_cache(cache)
+    assert lc_cache.lookup("prompt", "llm") is None
+    message = AIMessage(content="cached answer", tool_calls=[{"name": "Tagging", "args": {"language": "en"}, "id": "1"}],
+                        usage_metadata={"input_tokens": 5, "output_tokens": 3, "total_tokens": 8})
+    lc_cache.update("prompt", "llm", [ChatGeneration(message=message, generation_info={"finish_reason": "stop"})])
+    with warnings.catch_warnings():
+        # Stored as plain message dicts, so no beta or deprecation warnings from langchain_core.load
+        warnings.simplefilter("error")
+        generation = lc_cache.lookup("prompt", "llm")[0]
+    assert generation.message == message
+    assert generation.generation_info == {"finish_reason": "stop"}
+    assert cache.stats()["hits"] == 1
+
+    lc_cache.update("completion prompt", "llm", [Generation(text="plain text")])
+    assert lc_cache.lookup("completion prompt", "llm")[0].text == "plain text"
+
+
+def test_langchain_cache_times_concurrent_misses_separately(cache):
+    from langchain_core.outputs import ChatGeneration
+    from langchain_core.messages import AIMessage
+
+    lc_cache = langchain_cache(cache)
+
+    async def run(delay):
+        await lc_cache.alookup("prompt", "llm")
+        await asyncio.sleep(delay)
+        await lc_cache.aupdate("prompt", "llm", [ChatGeneration(message=AIMessage(content=str(delay)))])
+
+    async def main():
+        await asyncio.gather(run(0.2), run(0.01))
+
+    asyncio.run(main())
+    latency = cache._conn.execute("SELECT latency FROM responses").fetchone()[0]
+    # The slow run wrote last; its own start time is used, not the fast run's
+    assert latency == pytest.approx(0.2, abs=0.1)
+
+
+class FakeCompletions:
+    def __init__(self, completion):
+        self.completion = completion
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return self.completion
+
+
+def test_cached_completion_replays_tool_calls_to_streaming_callers(cache):
+    chat = pytest.importorskip("openai.types.chat")
+    completion = chat.ChatCompletion.model_validate({
+        "id": "c1", "object": "chat.completion", "created": 0, "model": "gpt",
+        "choices": [{"index": 0, "finish_reason": "tool_calls", "message": {
+            "role": "assistant", "content": None,
+            "tool_calls": [{"id": "call_1", "type": "function",
+                            "function": {"name": "get_current_weather", "arguments": '{"location": "Boston"}'}}],
+        }}],
+    })
+    completions = FakeCompletions(completion)
+    client = CachedClient(SimpleNamespace(chat=SimpleNamespace(completions=completions)), cache)
+    request = {"model": "gpt", "messages": [{"role": "user", "content": "weather?"}], "temperature": 0}
+
+    assert client.chat.completions.create(**request) is completion
+    chunks = list(client.chat.completions.create(stream=True, **request))
+
+    assert completions.calls == 1
+    choice = chunks[0].choices[0]
+    assert choice.finish_reason == "tool_calls"
+    assert choice.delta.tool_calls[0].function.name == "get_current_weather"
+    assert choice.delta.tool_calls[0].function.arguments == '{"location": "Boston"}'
+
+
+def test_streamed_tool_calls_are_recorded(cache):
+    chat = pytest.importorskip("openai.types.chat")
+
+    def chunk(delta, finish_reason=None):
+        return chat.ChatCompletionChunk.model_validate({
+            "id": "s1", "object": "chat.completion.chunk", "created": 0, "model": "gpt",
+            "choices": [{"index": 0, "finish_reason": finish_reason, "delta": delta}],
+        })
+
+    stream = [
+        chunk({"role": "assistant", "tool_calls": [
+            {"index": 0, "id": "call_1", "type": "function", "function": {"name": "lookup", "arguments": ""}}]}),
+        chunk({"tool_calls": [{"index": 0, "function": {"arguments": '{"q": '}}]}),
+        chunk({"tool_calls": [{"index": 0, "function": {"arguments": '"x"}'}}]}),
+        chunk({}, finish_reason="tool_calls"),
+    ]
+    completions = FakeCompletions(iter(stream))
+    client = CachedClient(SimpleNamespace(chat=SimpleNamespace(completions=completions)), cache)
+    request = {"model": "gpt", "messages": [{"role": "user", "content": "find x"}], "temperature": 0}
+
+    assert len(list(client.chat.completions.create(stream=True, **request))) == 4
+    replayed = client.chat.completions.create(**request)
+
+    assert completions.calls == 1
+    assert replayed.choices[0].finish_reason == "tool_calls"
+    call = replayed.choices[0].message.tool_calls[0]
+    assert (call.id, call.function.name, call.function.arguments) == ("call_1", "lookup", '{"q": "x"}')
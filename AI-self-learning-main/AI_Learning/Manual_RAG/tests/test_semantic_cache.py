@@ -0,0 +1,82 @@
+import sqlite3
+import time
+
+import numpy as np
+
+from utils.semantic_cache import SemanticAnswerCache
+
+
+def count_rows(path):
+    return sqlite3.connect(path).execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+
+def test_similar_question_hits_same_context_only(tmp_path):
+    cache = SemanticAnswerCache(str(tmp_path / "answers.sqlite"), threshold=0.95)
+    context = cache.fingerprint([3, 1, 2])
+    cache.put("docs", context, "What is MCP?", [1.0, 0.0, 0.1], "A protocol.")
+
+    assert cache.get("docs", cache.fingerprint([1, 2, 3]), [1.0, 0.01, 0.1]) == "A protocol."
+    assert cache.get("docs", cache.fingerprint([1, 2]), [1.0, 0.01, 0.1]) is None
+    assert cache.get("docs", context, [0.0, 1.0, 0.0]) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_expired_answers_are_skipped_then_purged_on_put(tmp_path):
+    path = str(tmp_path / "answers.sqlite")
+    cache = SemanticAnswerCache(path, ttl_seconds=60)
+    context = cache.fingerprint([1])
+    vector = np.array([1.0, 0.0])
+    cache.put("docs", context, "q", vector, "old answer")
+    cache._conn.execute("UPDATE answers SET created = ?", (time.time() - 120,))
+    cache._conn.commit()
+
+    assert cache.get("docs", context, vector) is None
+    # The lookup did not write: the expired row is still there
+    assert count_rows(path) == 1
+
+    cache.put("docs", cache.fingerprint([2]), "q2", vector, "new answer")
+    assert count_rows(path) == 1
+    assert cache.get("docs", cache.fingerprint([2]), vector) == "new answer"
+
+
+def test_least_recently_used_answers_are_evicted(tmp_path):
+    cache = SemanticAnswerCache(str(tmp_path / "answers.sqlite"), max_entries=2)
+    for i in range(3):
+        cache.put("docs", cache.fingerprint([i]), f"q{i}", [1.0, float(i)], f"a{i}")
+    assert cache.evictions == 1
+    assert cache.get("docs", cache.fingerprint([0]), [1.0, 0.0]) is None
+    assert cache.get("docs", cache.fingerprint([2]), [1.0, 2.0]) == "a2"
+
+
+def test_answers_of_another_embedding_dimension_are_skipped_then_evicted(tmp_path):
+    path = str(tmp_path / "answers.sqlite")
+    cache = SemanticAnswerCache(path)
+    context = cache.fingerprint([1])
+    cache.put("docs", context, "q", [1.0, 0.0, 0.0], "3-dimensional answer")
+    cache.put("other", context, "q", [1.0, 0.0, 0.0], "kept")
+
+    # A lookup with a 4-dimensional embedding must not try to stack it with the stored 3-dimensional one
+    assert cache.get("docs", context, [1.0, 0.0, 0.0, 0.0]) is None
+    assert count_rows(path) == 2
+
+    cache.put("docs", context, "q", [1.0, 0.0, 0.0, 0.0], "4-dimensional answer")
+    assert count_rows(path) == 2
+    assert cache.get("docs", context, [1.0, 0.0, 0.0, 0.0]) == "4-dimensional answer"
+    assert cache.get("other", context, [1.0, 0.0, 0.0]) == "kept"
+
+
+def test_cache_without_dimension_column_is_upgraded(tmp_path):
+    path = str(tmp_path / "answers.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE answers (id INTEGER PRIMARY KEY, collection TEXT NOT NULL, context TEXT NOT NULL,"
+                 " question TEXT NOT NULL, vector BLOB NOT NULL, answer TEXT NOT NULL, created REAL NOT NULL,"
+                 " last_used REAL NOT NULL)")
+    conn.execute("INSERT INTO answers (collection, context, question, vector, answer, created, last_used) "
+                 "VALUES ('docs', 'c', 'q', ?, 'old answer', ?, ?)",
+                 (np.array([0.0, 1.0], dtype=np.float32).tobytes(), time.time(), time.time()))
+    conn.commit()
+    conn.close()
+
+    cache = SemanticAnswerCache(path)
+    assert cache.get("docs", "c", [0.0, 1.0]) == "old answer"
+    assert cache.get("docs", "c", [0.0, 1.0, 0.0]) is None
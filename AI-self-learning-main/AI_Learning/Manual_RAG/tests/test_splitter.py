@@ -0,0 +1,48 @@
+import random
+
+import pytest
+from langchain_text_splitters import CharacterTextSplitter
+
+from Splitter.fast_splitter import OffsetTextSplitter
+
+
+def make_text(lines, seed=0):
+    rng = random.Random(seed)
+    words = ["employee", "manager", "team", "report", "policy", "the", "of", "a", "leave", "salary"]
+    return "\n".join(" ".join(rng.choice(words) for _ in range(rng.randint(1, 9))) for _ in range(lines))
+
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(26, 4), (40, 10), (120, 30), (200, 0)])
+def test_matches_character_text_splitter(chunk_size, chunk_overlap):
+    text = make_text(300, seed=chunk_size)
+    expected = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                                     separator="\n").split_text(text)
+
+    assert OffsetTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap).split_text(text) == expected
+
+
+def test_offsets_point_into_the_source():
+    text = make_text(100)
+    splitter = OffsetTextSplitter(chunk_size=40, chunk_overlap=10)
+
+    offsets = splitter.split_offsets(text)
+
+    assert [text[start:end] for start, end in offsets] == splitter.split_text(text)
+    assert all(start < end for start, end in offsets)
+    assert [start for start, _ in offsets] == sorted(start for start, _ in offsets)
+
+
+def test_stream_matches_whole_text():
+    text = make_text(200, seed=3)
+    splitter = OffsetTextSplitter(chunk_size=60, chunk_overlap=12)
+    parts = [text[i:i + 97] for i in range(0, len(text), 97)]
+
+    streamed = list(splitter.split_stream(parts))
+
+    assert [(start, end) for start, end, _ in streamed] == splitter.split_offsets(text)
+    assert all(text[start:end] == chunk for start, end, chunk in streamed)
+
+
+def test_overlap_larger_than_chunk_size():
+    with pytest.raises(ValueError):
+        OffsetTextSplitter(chunk_size=10, chunk_overlap=11)
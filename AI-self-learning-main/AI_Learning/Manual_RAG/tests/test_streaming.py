@@ -0,0 +1,170 @@
+import asyncio
+import builtins
+import importlib
+import re
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.llm_query_service import LLMQueryService
+from utils.semantic_cache import SemanticAnswerCache
+
+TOKENS = ["Leave ", "requests ", "go ", "to ", "your ", "manager."]
+RESULTS = [SimpleNamespace(id=1, score=0.9, payload={"text": "Vacation requests go to your manager."})]
+
+
+def chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+def chunks():
+    # Azure sends a first chunk without choices (content-filter results) and role-only deltas
+    yield SimpleNamespace(choices=[])
+    yield chunk(None)
+    yield from (chunk(token) for token in TOKENS)
+
+
+class FakeCompletions:
+    """
+    Streams TOKENS with a short delay before each, logging every chunk it sends.
+    """
+    def __init__(self, log, delay=0.01):
+        self.log = log
+        self.delay = delay
+        self.calls = 0
+
+    def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        self.calls += 1
+        return self._stream()
+
+    def _stream(self):
+        for item in chunks():
+            time.sleep(self.delay)
+            self.log.append(("sent", item.choices[0].delta.content if item.choices else None))
+            yield item
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    async def create(self, **kwargs):
+        return FakeCompletions.create(self, **kwargs)
+
+    async def _stream(self):
+        for item in chunks():
+            await asyncio.sleep(self.delay)
+            self.log.append(("sent", item.choices[0].delta.content if item.choices else None))
+            yield item
+
+
+class FakeAssembler:
+    def assemble(self, search_results):
+        return "\n".join(result.payload["text"] for result in search_results), {"chunks": len(search_results)}
+
+
+@pytest.fixture
+def service(tmp_path):
+    log = []
+    completions, async_completions = FakeCompletions(log), FakeAsyncCompletions(log)
+    service = LLMQueryService(
+        answer_cache=SemanticAnswerCache(str(tmp_path / "answers.sqlite")),
+        context_assembler=FakeAssembler(),
+        client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+        async_client=SimpleNamespace(chat=SimpleNamespace(completions=async_completions)),
+    )
+    service.log, service.completions, service.async_completions = log, completions, async_completions
+    return service
+
+
+def consume(tokens, log):
+    received = []
+    for token in tokens:
+        log.append(("received", token))
+        received.append(token)
+    return received
+
+
+def sent_then_received():
+    # Each token is received before the next one is sent
+    expected = [("sent", None), ("sent", None)]
+    for token in TOKENS:
+        expected += [("sent", token), ("received", token)]
+    return expected
+
+
+def test_stream_llm_yields_tokens_as_they_arrive(service):
+    tokens = consume(service.stream_llm("Who approves leave?", RESULTS), service.log)
+
+    assert tokens == TOKENS
+    assert service.log == sent_then_received()
+    latency = service.last_latency
+    assert 0 < latency["ttft"] <= latency["total"]
+    assert latency["tokens"] == len(TOKENS) and not latency["cached"]
+    assert service.last_context_report == {"chunks": 1}
+
+
+def test_stream_llm_replays_cached_answer(service):
+    vector = [1.0, 0.0, 0.2]
+    list(service.stream_llm("Who approves leave?", RESULTS, query_vector=vector, collection_name="docs"))
+
+    tokens = list(service.stream_llm("Who approves leave?", RESULTS, query_vector=vector, collection_name="docs"))
+
+    assert tokens == ["".join(TOKENS)]
+    assert service.completions.calls == 1
+    latency = service.last_latency
+    assert latency["cached"] and latency["ttft"] <= latency["total"]
+
+
+def test_astream_llm_yields_tokens_as_they_arrive(service):
+    async def run(stats):
+        received = []
+        async for token in service.astream_llm("Who approves leave?", RESULTS, query_vector=[1.0, 0.0],
+                                               collection_name="docs", stats=stats):
+            service.log.append(("received", token))
+            received.append(token)
+        return received
+
+    stats = {}
+    assert asyncio.run(run(stats)) == TOKENS
+    assert service.log == sent_then_received()
+    assert 0 < stats["latency"]["ttft"] <= stats["latency"]["total"]
+    assert stats["context_report"] == {"chunks": 1}
+
+    cached = {}
+    assert asyncio.run(run(cached)) == ["".join(TOKENS)]
+    assert cached["latency"]["cached"] and cached["context_report"] is None
+    assert service.async_completions.calls == 1
+
+
+class FakeQAChain:
+    """
+    Calls the LLM callbacks with TOKENS like a streaming chat model inside RetrievalQA.
+    """
+    def invoke(self, inputs, config):
+        for token in TOKENS:
+            time.sleep(0.01)
+            for callback in config["callbacks"]:
+                callback.on_llm_new_token(token)
+        return {"result": "".join(TOKENS), "source_documents": []}
+
+
+@pytest.fixture
+def lanchain_chat(monkeypatch):
+    for name, value in [("OPENAI_API_KEY", "test"), ("OPENAI_API_BASE", "https://example.invalid/"),
+                        ("OPENAI_API_VERSION", "2024-02-01"), ("DOCUMENT_MODEL", "gpt")]:
+        monkeypatch.setenv(name, value)
+    module = importlib.import_module("lanchain_chat")
+    monkeypatch.setattr(module, "get_qa_chain", lambda: FakeQAChain())
+    return module
+
+
+def test_chat_loop_prints_streamed_answer_and_latency(lanchain_chat, monkeypatch, capsys):
+    answers = iter(["Who approves leave?", "quit"])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+
+    lanchain_chat.chat_loop()
+
+    output = capsys.readouterr().out
+    assert "\nAI: " + "".join(TOKENS) + "\n" in output
+    ttft, total = map(float, re.search(r"time to first token ([\d.]+)s, total ([\d.]+)s", output).groups())
+    assert 0 < ttft <= total
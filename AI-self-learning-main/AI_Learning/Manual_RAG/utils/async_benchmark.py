@@ -0,0 +1,102 @@
+"""
+Latency of the async query path (LLMQueryService.aquery) under concurrent load.
+Embedding, vector search and chat completion are replaced by local fakes that
+only sleep for a configurable time, so the numbers show how well the path
+overlaps I/O rather than the speed of any service.
+
+Run from the Manual_RAG directory:
+    python -m utils.async_benchmark --questions 500 --concurrency 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import namedtuple
+from types import SimpleNamespace
+
+from utils.llm_query_service import LLMQueryService
+
+ScoredPoint = namedtuple("ScoredPoint", ["id", "score", "payload"])
+
+
+class FakeEmbeddings:
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def aembed_query(self, query):
+        await asyncio.sleep(self.delay)
+        return [float(len(query)), 1.0]
+
+
+class FakeVectorStore:
+    delay = 0.0
+
+    @classmethod
+    async def asearch(cls, collection_name, query_vector, limit=10, query_filter=None):
+        await asyncio.sleep(cls.delay)
+        return [
+            ScoredPoint(id=i, score=1.0 - i / 100,
+                        payload={"text": f"chunk {i} of the employee handbook", "meta": {"source": "pdf_text", "chunk_index": i}})
+            for i in range(limit)
+        ]
+
+
+class FakeCompletions:
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def create(self, model, messages, max_tokens, **kwargs):
+        await asyncio.sleep(self.delay)
+        message = SimpleNamespace(content="A generated answer.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeAsyncClient:
+    def __init__(self, delay):
+        self.chat = SimpleNamespace(completions=FakeCompletions(delay))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run(service, embeddings, questions, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(question):
+        async with semaphore:
+            start = time.perf_counter()
+            await service.aquery(question, embeddings, FakeVectorStore, "benchmark", limit=5)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in questions))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--embed-ms", type=float, default=30)
+    parser.add_argument("--search-ms", type=float, default=10)
+    parser.add_argument("--llm-ms", type=float, default=800)
+    args = parser.parse_args()
+
+    FakeVectorStore.delay = args.search_ms / 1000
+    embeddings = FakeEmbeddings(args.embed_ms / 1000)
+    service = LLMQueryService(client=object(), async_client=FakeAsyncClient(args.llm_ms / 1000))
+    questions = [f"Question {i} about the handbook?" for i in range(args.questions)]
+
+    elapsed, latencies = asyncio.run(run(service, embeddings, questions, args.concurrency))
+    sequential = args.questions * (args.embed_ms + args.search_ms + args.llm_ms) / 1000
+    print(f"{args.questions} questions, concurrency {args.concurrency}: {elapsed:.2f}s "
+          f"({args.questions / elapsed:.1f} questions/s; one at a time would take about {sequential:.1f}s)")
+    print(f"latency p50 {statistics.median(latencies) * 1000:.0f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.0f} ms, p99 {percentile(latencies, 0.99) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import re
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class ContextAssembler:
+    """
+    Turns search results into a prompt context that fits a token budget.
+    1. Chunks from the same source with consecutive `chunk_index` are merged
+       into one segment, dropping the text the splitter repeated as overlap.
+       The overlap is taken from the chunk offsets (`page`, `start`, `end` in
+       the payload meta); chunks stored without offsets are only de-overlapped
+       when `chunk_overlap` is given, by matching at most that many characters.
+    2. Segments whose text is contained in, or nearly the same as (word-set
+       Jaccard >= `duplicate_threshold`), a better-scored segment are dropped.
+    3. Segments are taken by score, or by maximal marginal relevance when
+       `mmr=True`, until `max_tokens` is reached.
+    Tokens are counted locally with tiktoken, so no request is spent on it.
+    """
+    def __init__(self, max_tokens=3000, mmr=False, mmr_lambda=0.7, duplicate_threshold=0.9,
+                 separator="\n", encoding_name="cl100k_base", chunk_overlap=None):
+        """
+        Args:
+            max_tokens (int): Token budget for the assembled context.
+            mmr (bool): Order segments by maximal marginal relevance instead of score.
+            mmr_lambda (float): MMR trade-off; 1.0 is pure relevance, lower values favour diversity.
+            duplicate_threshold (float): Word-set Jaccard similarity above which two segments are duplicates.
+            separator (str): Joins the selected segments.
+            encoding_name (str): tiktoken encoding used to count tokens.
+            chunk_overlap (int): Characters the splitter repeats between chunks, for chunks without
+                offsets; None keeps their text as is.
+        """
+        self.max_tokens = max_tokens
+        self.mmr = mmr
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_threshold = duplicate_threshold
+        self.separator = separator
+        self.encoding_name = encoding_name
+        self.chunk_overlap = chunk_overlap
+        self._encoding = None
+
+    def count_tokens(self, text):
+        if self._encoding is None:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+        return len(self._encoding.encode(text))
+
+    def _overlap(self, previous, following):
+        """
+        Number of leading characters of `following` that repeat the end of `previous`
+        (consecutive chunks, as dicts with text and meta).
+        """
+        a, b = previous["meta"], following["meta"]
+        if all(isinstance(meta.get(key), int) for meta in (a, b) for key in ("page", "start", "end")):
+            if a["page"] != b["page"]:
+                return 0
+            return min(max(0, a["end"] - b["start"]), len(following["text"]))
+        if not self.chunk_overlap:
+            return 0
+        return self._text_overlap(previous["text"], following["text"], self.chunk_overlap)
+
+    @staticmethod
+    def _text_overlap(previous, following, limit):
+        # Length of the longest suffix of `previous`, at most `limit` long, that starts `following`,
+        # cut at whitespace
+        start = previous.find(following[:1], max(0, len(previous) - limit))
+        while start != -1:
+            tail = previous[start:]
+            boundary = start == 0 or previous[start - 1].isspace()
+            rest = following[len(tail):]
+            if boundary and following.startswith(tail) and (not rest or rest[0].isspace()):
+                return len(tail)
+            start = previous.find(following[:1], start + 1)
+        return 0
+
+    def _merge_adjacent(self, results):
+        """
+        Returns segments as dicts with text, score and the IDs of the chunks they cover.
+        """
+        located = []
+        loose = []
+        for result in results:
+            payload = result.payload or {}
+            meta = payload.get("meta") or {}
+            item = {"text": payload.get("text", ""), "score": result.score, "ids": [result.id], "meta": meta}
+            if isinstance(meta.get("chunk_index"), int):
+                located.append((meta.get("source"), meta["chunk_index"], item))
+            else:
+                loose.append(item)
+
+        segments = []
+        last_source = last_index = last_item = None
+        for source, index, item in sorted(located, key=lambda x: (str(x[0]), x[1])):
+            if segments and source == last_source and index == last_index:
+                # The same chunk retrieved twice (e.g. by two retrievers)
+                segments[-1]["score"] = max(segments[-1]["score"], item["score"])
+                continue
+            if segments and source == last_source and index == last_index + 1:
+                current = segments[-1]
+                overlap = self._overlap(last_item, item)
+                joiner = "" if overlap else self.separator
+                current["text"] = current["text"] + joiner + item["text"][overlap:]
+                current["score"] = max(current["score"], item["score"])
+                current["ids"].extend(item["ids"])
+            else:
+                segments.append(dict(item, ids=list(item["ids"])))
+            last_source, last_index, last_item = source, index, item
+        return segments + loose
+
+    @staticmethod
+    def _words(text):
+        return frozenset(_WORD_RE.findall(text.lower()))
+
+    @staticmethod
+    def _jaccard(a, b):
+        if not a and not b:
+            return 1.0
+        return len(a & b) / len(a | b)
+
+    def _deduplicate(self, segments):
+        kept = []
+        for segment in sorted(segments, key=lambda s: s["score"], reverse=True):
+            normalized = " ".join(segment["text"].lower().split())
+            words = self._words(normalized)
+            duplicate = any(
+                normalized in other["normalized"] or self._jaccard(words, other["words"]) >= self.duplicate_threshold
+                for other in kept
+            )
+            if not duplicate:
+                kept.append(dict(segment, normalized=normalized, words=words))
+        return kept
+
+    def _mmr_order(self, segments):
+        if not segments:
+            return segments
+        scores = [s["score"] for s in segments]
+        low, high = min(scores), max(scores)
+        relevance = [(score - low) / (high - low) if high > low else 1.0 for score in scores]
+        remaining = list(range(len(segments)))
+        order = []
+        while remaining:
+            def mmr_score(i):
+                redundancy = max((self._jaccard(segments[i]["words"], segments[j]["words"]) for j in order),
+                                 default=0.0)
+                return self.mmr_lambda * relevance[i] - (1 - self.mmr_lambda) * redundancy
+            best = max(remaining, key=mmr_score)
+            order.append(best)
+            remaining.remove(best)
+        return [segments[i] for i in order]
+
+    def assemble(self, results):
+        """
+        Args:
+            results (list): Search results with `id`, `score` and a payload holding `text` and `meta`.
+        Returns:
+            (str, dict): The context text and a report with token counts before and after assembly.
+        """
+        results = list(results)
+        naive = self.separator.join((r.payload or {}).get("text", "") for r in results)
+        segments = self._deduplicate(self._merge_adjacent(results))
+        if self.mmr:
+            segments = self._mmr_order(segments)
+
+        separator_tokens = self.count_tokens(self.separator)
+        selected = []
+        used = 0
+        for segment in segments:
+            cost = self.count_tokens(segment["text"]) + (separator_tokens if selected else 0)
+            if used + cost > self.max_tokens:
+                # A smaller segment further down may still fit
+                continue
+            selected.append(segment)
+            used += cost
+
+        context = self.separator.join(segment["text"] for segment in selected)
+        tokens_before = self.count_tokens(naive)
+        tokens_after = self.count_tokens(context)
+        report = {
+            "chunks": len(results),
+            "segments": len(selected),
+            "chunk_ids": [point_id for segment in selected for point_id in segment["ids"]],
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": tokens_before - tokens_after,
+        }
+        return context, report
@@ -1,7 +1,13 @@
 
 import os
+import sys
 from pathlib import Path
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, AzureOpenAI
+# The shared client factory lives in the AI_Learning root
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+import llm_clients
 from dotenv import load_dotenv
 
 class AzureOpenAIConfig:
@@ -29,11 +35,18 @@ class AzureOpenAIConfig:
             raise ValueError("DOCUMENT_MODEL not set in environment.")
 
     def get_client(self) -> AzureOpenAI:
-        """Get configured Azure OpenAI client."""
+        """Get the shared Azure OpenAI client (pooled keep-alive connections)."""
         self.validate()
         # print(f"Using Azure OpenAI endpoint: {self.endpoint} with deployment: {self.deployment_name}")
-        return AzureOpenAI(
-            api_key=self.api_key,
-            api_version=self.api_version,
-            azure_endpoint=self.endpoint
-        )
+        return llm_clients.get_openai_client(self.api_key, self.endpoint, self.api_version)
+
+    def get_async_client(self) -> AsyncAzureOpenAI:
+        """Get the shared async Azure OpenAI client of the running event loop."""
+        self.validate()
+        return llm_clients.get_async_openai_client(self.api_key, self.endpoint, self.api_version)
+
+    def get_chat_model(self, **kwargs):
+        """Get a LangChain AzureChatOpenAI for this deployment on the shared connection pools."""
+        self.validate()
+        return llm_clients.get_chat_model(self.deployment_name, self.api_key, self.endpoint, self.api_version,
+                                          **kwargs)
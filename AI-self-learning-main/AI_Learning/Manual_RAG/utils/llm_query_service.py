@@ -1,26 +1,222 @@
+import asyncio
 import sys
 import os
+import time
+from collections import namedtuple
 # Add the root directory to the path (which contains llm_config.py)
 root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 from utils.llm_config import AzureOpenAIConfig
+from utils.context_assembly import ContextAssembler
+
+SYSTEM_PROMPT = "You are a helpful assistant, only answer the question using the context provided."
+
+# What the async methods return: concurrent queries cannot share `last_*` fields
+QueryResult = namedtuple("QueryResult", ["answer", "context_report", "latency"])
 
 class LLMQueryService:
-    def __init__(self):
+    def __init__(self, answer_cache=None, context_assembler=None, client=None, async_client=None, temperature=None):
+        """
+        Args:
+            answer_cache (SemanticAnswerCache): Optional cache that serves answers to near-identical questions.
+            context_assembler (ContextAssembler): Builds the prompt context; defaults to a 3000-token
+                budget with overlapping and duplicate chunks removed.
+            client (AzureOpenAI): Chat client; built from the environment if not given.
+            async_client (AsyncAzureOpenAI): Client for the async methods; built on first use if not given.
+            temperature (float): Sampling temperature; None leaves the deployment's default. Pass 0
+                for reproducible answers that the LLM response cache can serve (see llm_response_cache.py).
+        """
         self.config = AzureOpenAIConfig()
-        self.client = self.config.get_client()
+        self.client = client or self.config.get_client()
+        self._async_client = async_client
         self.deployment_id = self.config.deployment_name
+        self.temperature = temperature
+        self.answer_cache = answer_cache
+        self.context_assembler = context_assembler or ContextAssembler()
+        self.last_context_report = None
+        self.last_latency = None
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = self.config.get_async_client()
+        return self._async_client
 
-    def query_llm(self, user_query, search_results, max_tokens=1000):
-        top_context = "\n".join([result.payload['text'] for result in search_results])
+    def build_context(self, search_results):
+        top_context, report = self.context_assembler.assemble(search_results)
+        self.last_context_report = report
+        return top_context
+
+    def _prompt(self, user_query, search_results):
+        """
+        Returns (messages, context report) without touching `last_context_report`.
+        """
+        top_context, report = self.context_assembler.assemble(search_results)
         llm_prompt = f"User question: {user_query}\nRelevant context:\n{top_context}\nAnswer the user's question using the context above."
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": llm_prompt}
+        ], report
+
+    def _sampling(self):
+        # Without an explicit temperature the API default applies (and the response cache is bypassed)
+        return {} if self.temperature is None else {"temperature": self.temperature}
+
+    def _cached_answer(self, search_results, max_tokens, query_vector, collection_name):
+        """
+        Returns (cache key or None, cached answer or None).
+        """
+        if self.answer_cache is None or query_vector is None:
+            return None, None
+        context = self.answer_cache.fingerprint(
+            [result.id for result in search_results], extra=[self.deployment_id, max_tokens]
+        )
+        return context, self.answer_cache.get(collection_name, context, query_vector)
+
+    def _messages(self, user_query, search_results):
+        messages, self.last_context_report = self._prompt(user_query, search_results)
+        return messages
+
+    def _remember(self, context, collection_name, user_query, query_vector, answer):
+        if context is not None and answer:
+            self.answer_cache.put(collection_name, context, user_query, query_vector, answer)
+
+    def query_llm(self, user_query, search_results, max_tokens=1000, query_vector=None, collection_name=""):
+        """
+        Answers `user_query` from the retrieved context.
+        With an answer cache, pass the `query_vector` used for retrieval (and the
+        `collection_name` it came from) so repeated questions skip the LLM call.
+        """
+        context, cached = self._cached_answer(search_results, max_tokens, query_vector, collection_name)
+        if cached is not None:
+            return cached
         response = self.client.chat.completions.create(
             model=self.deployment_id,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant, only answer the question using the context provided."},
-                {"role": "user", "content": llm_prompt}
-            ],
-            max_tokens=max_tokens
+            messages=self._messages(user_query, search_results),
+            max_tokens=max_tokens,
+            **self._sampling()
+        )
+        answer = response.choices[0].message.content
+        self._remember(context, collection_name, user_query, query_vector, answer)
+        return answer
+
+    async def aquery_llm(self, user_query, search_results, max_tokens=1000, query_vector=None, collection_name=""):
+        """
+        Async counterpart of `query_llm`, using AsyncAzureOpenAI. The answer cache (SQLite) and
+        context assembly (tiktoken) run on worker threads, so they do not stall other queries.
+        Returns:
+            QueryResult: The answer with its context report (None for cached answers) and latency.
+        """
+        start = time.perf_counter()
+        context, cached = await asyncio.to_thread(self._cached_answer, search_results, max_tokens, query_vector,
+                                                  collection_name)
+        if cached is not None:
+            return QueryResult(cached, None, self._latency(start, None, 1, cached=True))
+        messages, report = await asyncio.to_thread(self._prompt, user_query, search_results)
+        response = await self.async_client.chat.completions.create(
+            model=self.deployment_id,
+            messages=messages,
+            max_tokens=max_tokens,
+            **self._sampling()
         )
-        return response.choices[0].message.content
+        answer = response.choices[0].message.content
+        latency = self._latency(start, None, 1)
+        await asyncio.to_thread(self._remember, context, collection_name, user_query, query_vector, answer)
+        return QueryResult(answer, report, latency)
+
+    @staticmethod
+    def _latency(start, first_token_at, tokens, cached=False):
+        total = time.perf_counter() - start
+        ttft = (first_token_at - start) if first_token_at is not None else total
+        return {"ttft": ttft, "total": total, "tokens": tokens, "cached": cached}
+
+    def _record_latency(self, start, first_token_at, tokens, cached=False):
+        self.last_latency = self._latency(start, first_token_at, tokens, cached)
+
+    def stream_llm(self, user_query, search_results, max_tokens=1000, query_vector=None, collection_name=""):
+        """
+        Streaming `query_llm`: yields pieces of the answer as the deployment produces them.
+        Time to first token and total latency are kept in `last_latency` once the stream ends.
+        """
+        start = time.perf_counter()
+        context, cached = self._cached_answer(search_results, max_tokens, query_vector, collection_name)
+        if cached is not None:
+            self._record_latency(start, None, 1, cached=True)
+            yield cached
+            return
+        stream = self.client.chat.completions.create(
+            model=self.deployment_id,
+            messages=self._messages(user_query, search_results),
+            max_tokens=max_tokens,
+            stream=True,
+            **self._sampling()
+        )
+        parts = []
+        first_token_at = None
+        for chunk in stream:
+            # Azure sends chunks without choices (e.g. content-filter results)
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            parts.append(chunk.choices[0].delta.content)
+            yield parts[-1]
+        self._record_latency(start, first_token_at, len(parts))
+        self._remember(context, collection_name, user_query, query_vector, "".join(parts))
+
+    async def astream_llm(self, user_query, search_results, max_tokens=1000, query_vector=None, collection_name="",
+                          stats=None):
+        """
+        Async counterpart of `stream_llm`. Pass a dict as `stats` to get the context report and
+        latency of this stream ("context_report", "latency") once it ends.
+        """
+        stats = {} if stats is None else stats
+        start = time.perf_counter()
+        context, cached = await asyncio.to_thread(self._cached_answer, search_results, max_tokens, query_vector,
+                                                  collection_name)
+        if cached is not None:
+            stats.update(context_report=None, latency=self._latency(start, None, 1, cached=True))
+            yield cached
+            return
+        messages, stats["context_report"] = await asyncio.to_thread(self._prompt, user_query, search_results)
+        stream = await self.async_client.chat.completions.create(
+            model=self.deployment_id,
+            messages=messages,
+            max_tokens=max_tokens,
+            stream=True,
+            **self._sampling()
+        )
+        parts = []
+        first_token_at = None
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            parts.append(chunk.choices[0].delta.content)
+            yield parts[-1]
+        stats["latency"] = self._latency(start, first_token_at, len(parts))
+        await asyncio.to_thread(self._remember, context, collection_name, user_query, query_vector, "".join(parts))
+
+    async def aquery(self, user_query, embedding_manager, vector_store, collection_name, lexical_index=None,
+                     limit=5, max_tokens=1000):
+        """
+        Full async RAG query: embed -> search -> generate, without blocking the event loop,
+        so one process can serve many questions concurrently (e.g. with asyncio.gather).
+        Args:
+            embedding_manager (EmbeddingManager): Provides `aembed_query`.
+            vector_store: QdrantClientManager or LocalIndexManager.
+            lexical_index (LexicalIndex): Optional BM25 index for hybrid retrieval.
+            limit (int): Number of chunks retrieved.
+        Returns:
+            QueryResult: The answer, its context report and the latency of the generation step.
+        """
+        query_vector = await embedding_manager.aembed_query(user_query)
+        if lexical_index is not None:
+            search_results = await vector_store.ahybrid_search(collection_name, query_vector, user_query,
+                                                               lexical_index, limit=limit)
+        else:
+            search_results = await vector_store.asearch(collection_name, query_vector, limit=limit)
+        return await self.aquery_llm(user_query, search_results, max_tokens=max_tokens,
+                                     query_vector=query_vector, collection_name=collection_name)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    Cache of LLM answers looked up by meaning rather than exact text.
+    An entry is keyed by the question embedding plus a fingerprint of the
+    retrieved context IDs: a new question reuses an answer when it retrieved
+    the same context and its embedding is within `threshold` cosine similarity
+    of the cached question. Entries expire after `ttl_seconds` (lookups skip
+    them; they are deleted on the next `put`), the least recently used are
+    evicted above `max_entries`, and `invalidate` drops the answers of a
+    collection once it is re-ingested. Answers stored with an embedding of
+    another dimension (a different embedding model) are never served and are
+    deleted by the next `put` to their collection.
+    """
+    def __init__(self, path=".answer_cache.sqlite", threshold=0.95, ttl_seconds=24 * 3600, max_entries=10000):
+        """
+        Args:
+            path (str): SQLite file holding the cache.
+            threshold (float): Minimum cosine similarity between questions for a hit.
+            ttl_seconds (float): Age after which an answer is no longer served (None keeps answers forever).
+            max_entries (int): Size cap; least recently used answers are evicted above it.
+        """
+        self.path = path
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " id INTEGER PRIMARY KEY,"
+            " collection TEXT NOT NULL,"
+            " context TEXT NOT NULL,"
+            " question TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " answer TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(answers)")]
+        if "dim" not in columns:
+            # Caches written before the dimension was stored
+            self._conn.execute("ALTER TABLE answers ADD COLUMN dim INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE answers SET dim = length(vector) / 4")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_context ON answers(collection, context)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_last_used ON answers(last_used)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_created ON answers(created)")
+        self._conn.commit()
+
+    @staticmethod
+    def fingerprint(point_ids, extra=None):
+        """
+        Order-insensitive hash of the retrieved point IDs (and any prompt settings in `extra`).
+        """
+        ids = sorted(json.dumps(point_id) for point_id in point_ids)
+        return hashlib.sha256(json.dumps([ids, extra]).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def get(self, collection_name, context, query_vector):
+        """
+        Returns the cached answer closest to `query_vector` for this context, or None.
+        """
+        query = self._normalize(query_vector)
+        now = time.time()
+        # Expired answers are filtered out here and only deleted by put, so a miss writes nothing
+        oldest = now - self.ttl_seconds if self.ttl_seconds is not None else float("-inf")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, vector, answer FROM answers "
+                "WHERE collection = ? AND context = ? AND dim = ? AND created >= ?",
+                (collection_name, context, len(query), oldest)
+            ).fetchall()
+            best = None
+            if rows:
+                vectors = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob, _ in rows])
+                scores = vectors @ query
+                i = int(np.argmax(scores))
+                if scores[i] >= self.threshold:
+                    best = rows[i]
+            if best is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (now, best[0]))
+            self._conn.commit()
+            self.hits += 1
+            return best[2]
+
+    def put(self, collection_name, context, question, query_vector, answer):
+        now = time.time()
+        vector = self._normalize(query_vector)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO answers (collection, context, question, vector, dim, answer, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (collection_name, context, question, vector.tobytes(), len(vector), answer, now, now)
+            )
+            # Written with another embedding model; they can no longer match any question
+            self._conn.execute("DELETE FROM answers WHERE collection = ? AND dim != ?", (collection_name, len(vector)))
+            if self.ttl_seconds is not None:
+                self._conn.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl_seconds,))
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM answers WHERE id IN (SELECT id FROM answers ORDER BY last_used ASC LIMIT ?)", (excess,)
+        )
+        self.evictions += excess
+
+    def invalidate(self, collection_name=None):
+        """
+        Drops the answers of one collection (or all of them), e.g. after it was re-ingested.
+        Returns:
+            int: Number of answers removed.
+        """
+        with self._lock:
+            if collection_name is None:
+                cursor = self._conn.execute("DELETE FROM answers")
+            else:
+                cursor = self._conn.execute("DELETE FROM answers WHERE collection = ?", (collection_name,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
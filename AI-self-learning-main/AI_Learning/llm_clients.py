@@ -0,0 +1,203 @@
+"""
+Process-wide Azure OpenAI clients on pooled keep-alive HTTP connections.
+
+Every client built here (raw AzureOpenAI / AsyncAzureOpenAI and LangChain's
+AzureChatOpenAI) goes through one shared httpx pool, so a process pays for
+the TLS handshake once per host instead of once per message. Clients are
+cached by credentials; async clients are cached per event loop because httpx
+connections cannot move between loops. Reconfiguring the pools or installing
+the response cache only affects clients handed out afterwards: clients that
+callers already hold keep working on their old pool.
+
+Pool limits and timeouts come from the environment (or `configure`):
+    LLM_HTTP_MAX_CONNECTIONS     total connections (default 100)
+    LLM_HTTP_MAX_KEEPALIVE       idle connections kept open (default 20)
+    LLM_HTTP_KEEPALIVE_EXPIRY    seconds an idle connection is kept (default 30)
+    LLM_HTTP_TIMEOUT             read/write timeout in seconds (default 60)
+    LLM_HTTP_CONNECT_TIMEOUT     connect timeout in seconds (default 5)
+
+Setting LLM_RESPONSE_CACHE=<sqlite path> (or calling install_response_cache)
+puts a disk-backed exact-match response cache in front of every client; see
+llm_response_cache.py.
+"""
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from openai import AsyncAzureOpenAI, AzureOpenAI
+
+from llm_response_cache import CachedClient, ResponseCache, is_cacheable, langchain_cache
+
+_settings = {
+    "max_connections": int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+    "keepalive_expiry": float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "30")),
+    "timeout": float(os.getenv("LLM_HTTP_TIMEOUT", "60")),
+    "connect_timeout": float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "5")),
+}
+
+_lock = threading.Lock()
+_http_client = None
+_openai_clients = {}
+# event loop (or None outside a loop) -> {"http": AsyncClient, credentials -> AsyncAzureOpenAI}
+_async_clients = weakref.WeakKeyDictionary()
+_async_clients_no_loop = {}
+_response_cache = None
+_langchain_cache = None
+# Raw client -> the CachedClient wrapping it for the installed response cache
+_cached_clients = weakref.WeakKeyDictionary()
+
+
+def install_response_cache(path=".llm_response_cache.sqlite"):
+    """
+    Routes every client handed out from now on through a persistent response cache.
+    The pooled clients are kept; they are wrapped for the cache when handed out.
+    Returns:
+        ResponseCache: The cache, e.g. for `stats()`.
+    """
+    global _response_cache, _langchain_cache
+    with _lock:
+        if _response_cache is None or _response_cache.path != path:
+            _response_cache = ResponseCache(path)
+            _langchain_cache = None
+            _cached_clients.clear()
+        return _response_cache
+
+
+def response_cache_stats():
+    """
+    Hit rate and latency saved by the response cache, or None if it is not installed.
+    """
+    return _response_cache.stats() if _response_cache is not None else None
+
+
+def configure(**settings):
+    """
+    Overrides pool limits / timeouts (keys as in the module docstring, lower-case, without the
+    LLM_HTTP_ prefix: max_connections, max_keepalive_connections, keepalive_expiry, timeout,
+    connect_timeout). Clients created afterwards use the new settings.
+    The old pools are not closed, since clients handed out earlier still use them; they
+    are released once the last of those clients is gone.
+    """
+    global _http_client
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown client settings: {sorted(unknown)}")
+    with _lock:
+        _settings.update(settings)
+        _http_client = None
+        _openai_clients.clear()
+        _async_clients.clear()
+        _async_clients_no_loop.clear()
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=_settings["max_connections"],
+        max_keepalive_connections=_settings["max_keepalive_connections"],
+        keepalive_expiry=_settings["keepalive_expiry"],
+    )
+
+
+def _timeout():
+    return httpx.Timeout(_settings["timeout"], connect=_settings["connect_timeout"])
+
+
+def get_http_client():
+    """
+    The shared synchronous httpx pool.
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_limits(), timeout=_timeout())
+        return _http_client
+
+
+def _async_cache():
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _async_clients_no_loop
+    return _async_clients.setdefault(loop, {})
+
+
+def get_async_http_client():
+    """
+    The shared async httpx pool of the running event loop.
+    """
+    with _lock:
+        cache = _async_cache()
+        if "http" not in cache:
+            cache["http"] = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+        return cache["http"]
+
+
+def _with_cache(client, is_async=False):
+    # Called with _lock held
+    if _response_cache is None:
+        return client
+    cached = _cached_clients.get(client)
+    if cached is None:
+        cached = _cached_clients[client] = CachedClient(client, _response_cache, is_async=is_async)
+    return cached
+
+
+def get_openai_client(api_key, endpoint, api_version):
+    key = (api_key, endpoint, api_version)
+    http_client = get_http_client()
+    with _lock:
+        client = _openai_clients.get(key)
+        if client is None:
+            client = AzureOpenAI(api_key=api_key, api_version=api_version, azure_endpoint=endpoint,
+                                 http_client=http_client)
+            _openai_clients[key] = client
+        return _with_cache(client)
+
+
+def get_async_openai_client(api_key, endpoint, api_version):
+    key = (api_key, endpoint, api_version)
+    http_client = get_async_http_client()
+    with _lock:
+        cache = _async_cache()
+        client = cache.get(key)
+        if client is None:
+            client = AsyncAzureOpenAI(api_key=api_key, api_version=api_version, azure_endpoint=endpoint,
+                                      http_client=http_client)
+            cache[key] = client
+        return _with_cache(client, is_async=True)
+
+
+def get_chat_model(deployment, api_key, endpoint, api_version, **kwargs):
+    """
+    LangChain AzureChatOpenAI on the shared pools; `kwargs` are passed through (temperature, streaming, ...).
+    With a response cache installed, models with temperature 0 read and fill it.
+    The async pool is bound to an event loop, so it is only shared when the model is built
+    inside the loop that will use it; otherwise LangChain creates its own.
+    """
+    global _langchain_cache
+    from langchain_openai import AzureChatOpenAI
+    if _response_cache is not None and "cache" not in kwargs and is_cacheable(kwargs.get("temperature")):
+        if _langchain_cache is None:
+            _langchain_cache = langchain_cache(_response_cache)
+        kwargs["cache"] = _langchain_cache
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        kwargs.setdefault("http_async_client", get_async_http_client())
+    return AzureChatOpenAI(
+        azure_deployment=deployment,
+        api_version=api_version,
+        azure_endpoint=endpoint,
+        api_key=api_key,
+        http_client=get_http_client(),
+        **kwargs
+    )
+
+
+if os.getenv("LLM_RESPONSE_CACHE"):
+    install_response_cache(os.getenv("LLM_RESPONSE_CACHE"))
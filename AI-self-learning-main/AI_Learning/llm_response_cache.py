@@ -0,0 +1,345 @@
+"""
+Disk-backed exact-match cache of chat completions.
+
+Replays of the same request (deployment, messages, tools, temperature,
+max_tokens and every other request option) are answered from SQLite instead
+of the model. Only deterministic requests are cached: anything with a
+temperature above 0, or without an explicit temperature (the API default is
+1), bypasses the cache.
+
+Install it once per process with llm_clients.install_response_cache(), or by
+setting LLM_RESPONSE_CACHE=<sqlite path>; every client the factory hands out
+afterwards (raw AzureOpenAI / AsyncAzureOpenAI and LangChain chat models) uses it.
+"""
+import asyncio
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+# Request options that do not change the completion
+_TRANSPORT_OPTIONS = {"stream", "stream_options", "timeout", "extra_headers", "extra_query", "extra_body"}
+
+
+def _jsonable(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def is_cacheable(temperature):
+    return temperature is not None and temperature <= 0
+
+
+class ResponseCache:
+    """
+    SQLite store shared by the raw-client and LangChain adapters, with hit-rate and
+    latency-saved counters. Each entry remembers how long the model took to produce it.
+    """
+    def __init__(self, path=".llm_response_cache.sqlite"):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.latency_saved = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " latency REAL NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(namespace, request):
+        payload = json.dumps([namespace, request], sort_keys=True, default=_jsonable)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT response, latency FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.latency_saved += row[1]
+            return row[0]
+
+    def put(self, key, response, latency):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, latency, created) VALUES (?, ?, ?, ?)",
+                (key, response, latency, time.time())
+            )
+            self._conn.commit()
+
+    def bypass(self):
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "latency_saved_seconds": self.latency_saved,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# --- raw openai clients -------------------------------------------------------
+
+def _request_key(cache, kwargs):
+    request = {k: v for k, v in kwargs.items() if k not in _TRANSPORT_OPTIONS}
+    return cache.make_key("chat.completions", request)
+
+
+def _completion_from_stream(text, tool_calls, finish_reason, model):
+    from openai.types.chat import ChatCompletion
+    message = {"role": "assistant", "content": text}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return ChatCompletion.model_validate({
+        "id": "cached", "object": "chat.completion", "created": int(time.time()), "model": model or "",
+        "choices": [{"index": 0, "finish_reason": finish_reason or "stop", "message": message}],
+    })
+
+
+def _chunk_from_completion(completion):
+    # A cache hit on a streaming request is replayed as a single chunk holding the whole answer,
+    # with the tool calls and finish reason of the cached completion
+    from openai.types.chat import ChatCompletionChunk
+    choice = completion.choices[0]
+    delta = {"role": "assistant", "content": choice.message.content}
+    if choice.message.tool_calls:
+        delta["tool_calls"] = [
+            {"index": i, "id": call.id, "type": "function",
+             "function": {"name": call.function.name, "arguments": call.function.arguments}}
+            for i, call in enumerate(choice.message.tool_calls)
+        ]
+    return ChatCompletionChunk.model_validate({
+        "id": completion.id, "object": "chat.completion.chunk", "created": completion.created,
+        "model": completion.model,
+        "choices": [{"index": 0, "finish_reason": choice.finish_reason, "delta": delta}],
+    })
+
+
+def _load(cached):
+    from openai.types.chat import ChatCompletion
+    return ChatCompletion.model_validate_json(cached)
+
+
+class _StreamRecorder:
+    """
+    Collects the text, tool calls and finish reason of a streamed completion; it is stored
+    once the stream ends cleanly.
+    """
+    def __init__(self, cache, key, model, start):
+        self.cache, self.key, self.model, self.start = cache, key, model, start
+        self.parts = []
+        self.tool_calls = {}
+        self.finish_reason = None
+        self.cacheable = True
+
+    def add(self, chunk):
+        for choice in chunk.choices or []:
+            if choice.index != 0 or getattr(choice.delta, "function_call", None):
+                # Several choices (n > 1) or legacy function calls are not replayed
+                self.cacheable = False
+            if choice.finish_reason:
+                self.finish_reason = choice.finish_reason
+            if choice.delta.content:
+                self.parts.append(choice.delta.content)
+            for delta in getattr(choice.delta, "tool_calls", None) or []:
+                # The id and name arrive with the first fragment of a call, the arguments in pieces
+                call = self.tool_calls.setdefault(
+                    delta.index, {"id": None, "type": "function", "function": {"name": "", "arguments": ""}})
+                if delta.id:
+                    call["id"] = delta.id
+                if delta.function is not None:
+                    call["function"]["name"] += delta.function.name or ""
+                    call["function"]["arguments"] += delta.function.arguments or ""
+
+    def finish(self):
+        if self.cacheable and self.finish_reason and (self.parts or self.tool_calls):
+            tool_calls = [self.tool_calls[i] for i in sorted(self.tool_calls)]
+            completion = _completion_from_stream("".join(self.parts) or None, tool_calls, self.finish_reason,
+                                                 self.model)
+            self.cache.put(self.key, completion.model_dump_json(), time.perf_counter() - self.start)
+
+
+class _CachedCompletions:
+    def __init__(self, completions, cache):
+        self._completions = completions
+        self._cache = cache
+
+    def create(self, **kwargs):
+        if not is_cacheable(kwargs.get("temperature")):
+            self._cache.bypass()
+            return self._completions.create(**kwargs)
+        key = _request_key(self._cache, kwargs)
+        cached = self._cache.get(key)
+        if cached is not None:
+            completion = _load(cached)
+            return iter([_chunk_from_completion(completion)]) if kwargs.get("stream") else completion
+        start = time.perf_counter()
+        response = self._completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return self._record(response, _StreamRecorder(self._cache, key, kwargs.get("model"), start))
+        self._cache.put(key, response.model_dump_json(), time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def _record(stream, recorder):
+        for chunk in stream:
+            recorder.add(chunk)
+            yield chunk
+        recorder.finish()
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+
+class _AsyncCachedCompletions(_CachedCompletions):
+    async def create(self, **kwargs):
+        if not is_cacheable(kwargs.get("temperature")):
+            self._cache.bypass()
+            return await self._completions.create(**kwargs)
+        key = _request_key(self._cache, kwargs)
+        cached = self._cache.get(key)
+        if cached is not None:
+            completion = _load(cached)
+            return self._replay(completion) if kwargs.get("stream") else completion
+        start = time.perf_counter()
+        response = await self._completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return self._arecord(response, _StreamRecorder(self._cache, key, kwargs.get("model"), start))
+        self._cache.put(key, response.model_dump_json(), time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    async def _replay(completion):
+        yield _chunk_from_completion(completion)
+
+    @staticmethod
+    async def _arecord(stream, recorder):
+        async for chunk in stream:
+            recorder.add(chunk)
+            yield chunk
+        recorder.finish()
+
+
+class CachedClient:
+    """
+    Wraps an AzureOpenAI (or AsyncAzureOpenAI) client so chat.completions.create goes
+    through the cache; everything else is passed to the wrapped client.
+    """
+    def __init__(self, client, cache, is_async=False):
+        self._client = client
+        completions_class = _AsyncCachedCompletions if is_async else _CachedCompletions
+        self.chat = SimpleNamespace(completions=completions_class(client.chat.completions, cache))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# --- LangChain ----------------------------------------------------------------
+
+def langchain_cache(cache):
+    """
+    LangChain BaseCache over the same store, set on chat models with temperature 0
+    (LangChain keys it on the prompt and the model's llm_string, which includes the
+    deployment, temperature, max_tokens and bound tools).
+    """
+    from langchain_core.caches import BaseCache
+    from langchain_core.messages import message_to_dict, messages_from_dict
+    from langchain_core.outputs import ChatGeneration, Generation
+
+    class LangChainResponseCache(BaseCache):
+        """
+        The latency of a miss is measured from the lookup to the matching update. LangChain
+        does not pass the run_id to caches, but it calls lookup and update from the same
+        run, so the start time is kept in a context variable of that run: concurrent runs of
+        the same prompt each time their own call.
+        """
+        def __init__(self):
+            self._miss = contextvars.ContextVar("llm_response_cache_miss", default=None)
+
+        @staticmethod
+        def _dump(generation):
+            # Plain dicts rather than langchain_core.load.dumps: reading them back cannot
+            # instantiate arbitrary serializable classes
+            if isinstance(generation, ChatGeneration):
+                return {"message": message_to_dict(generation.message), "generation_info": generation.generation_info}
+            return {"text": generation.text, "generation_info": generation.generation_info}
+
+        @staticmethod
+        def _load(generation):
+            if "message" in generation:
+                message = messages_from_dict([generation["message"]])[0]
+                return ChatGeneration(message=message, generation_info=generation["generation_info"])
+            return Generation(text=generation["text"], generation_info=generation["generation_info"])
+
+        def _get(self, key):
+            cached = cache.get(key)
+            if cached is None:
+                return None
+            generations = json.loads(cached)
+            if not all(isinstance(generation, dict) for generation in generations):
+                # Written by an earlier version in the langchain_core.load format
+                return None
+            return [self._load(generation) for generation in generations]
+
+        def _put(self, key, return_val):
+            miss = self._miss.get()
+            latency = time.perf_counter() - miss[1] if miss is not None and miss[0] == key else 0.0
+            self._miss.set(None)
+            return json.dumps([self._dump(generation) for generation in return_val]), latency
+
+        def lookup(self, prompt, llm_string):
+            key = cache.make_key("langchain", [prompt, llm_string])
+            result = self._get(key)
+            if result is None:
+                self._miss.set((key, time.perf_counter()))
+            return result
+
+        def update(self, prompt, llm_string, return_val):
+            key = cache.make_key("langchain", [prompt, llm_string])
+            cache.put(key, *self._put(key, return_val))
+
+        async def alookup(self, prompt, llm_string):
+            # The context variable is set here, in the run's task, not in the worker thread
+            key = cache.make_key("langchain", [prompt, llm_string])
+            result = await asyncio.to_thread(self._get, key)
+            if result is None:
+                self._miss.set((key, time.perf_counter()))
+            return result
+
+        async def aupdate(self, prompt, llm_string, return_val):
+            key = cache.make_key("langchain", [prompt, llm_string])
+            await asyncio.to_thread(cache.put, key, *self._put(key, return_val))
+
+        def clear(self, **kwargs):
+            cache.clear()
+
+    return LangChainResponseCache()